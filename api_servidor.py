@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+API REST de Predição do Sistema de Manutenção Preditiva
+Servidor HTTP assíncrono (asyncio) que carrega o pipeline treinado uma única vez
+e agrupa requisições concorrentes em micro-lotes antes de chamar predict_proba
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from artefato_modelo import carregar_artefato
+from avaliacao import LIMIAR_PADRAO, carregar_limiares
+from cache_predicoes import CachePredicoes, versao_modelo
+from config_file import obter_configuracao
+from inferencia import criar_pontuador, montar_entrada
+from registro_modelos import RegistroModelos, registro_existe
+
+MENSAGENS_STATUS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'
+}
+
+
+class LoteadorPredicoes:
+    """Agrupa leituras concorrentes em micro-lotes antes de chamar o modelo"""
+
+    def __init__(self, pontuar: Callable[[List[Dict]], np.ndarray],
+                 max_lote: int = 64, espera_max_s: float = 0.005):
+        self.pontuar = pontuar
+        self.max_lote = max_lote
+        self.espera_max_s = espera_max_s
+
+        self._fila = None
+        self._tarefa = None
+        # Um único thread de inferência: lotes são processados em ordem, sem disputa pelo modelo
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+        self.total_lotes = 0
+        self.total_leituras = 0
+        self.tempo_inferencia = 0.0
+
+    def iniciar(self):
+        """Iniciar a tarefa de agrupamento no loop de eventos atual"""
+        self._fila = asyncio.Queue()
+        self._tarefa = asyncio.get_running_loop().create_task(self._processar())
+
+    async def parar(self):
+        """Encerrar a tarefa de agrupamento e o executor de inferência"""
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=True)
+
+    async def prever(self, leitura: Dict) -> np.ndarray:
+        """Enfileirar uma leitura e aguardar suas probabilidades"""
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((leitura, futuro))
+        return await futuro
+
+    async def _coletar_lote(self) -> List[Tuple[Dict, asyncio.Future]]:
+        """Aguardar a primeira leitura e completar o lote até o tamanho ou tempo máximo"""
+        loop = asyncio.get_running_loop()
+        lote = [await self._fila.get()]
+        limite = loop.time() + self.espera_max_s
+
+        while len(lote) < self.max_lote:
+            if not self._fila.empty():
+                lote.append(self._fila.get_nowait())
+                continue
+
+            restante = limite - loop.time()
+            if restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(self._fila.get(), restante))
+            except asyncio.TimeoutError:
+                break
+
+        return lote
+
+    async def _processar(self):
+        """Laço principal: formar lotes e pontuá-los fora do loop de eventos"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            lote = await self._coletar_lote()
+            leituras = [leitura for leitura, _ in lote]
+
+            inicio = time.perf_counter()
+            try:
+                resultado = await loop.run_in_executor(self._executor, self.pontuar, leituras)
+            except Exception as e:
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+
+            self.tempo_inferencia += time.perf_counter() - inicio
+            self.total_lotes += 1
+            self.total_leituras += len(lote)
+
+            for i, (_, futuro) in enumerate(lote):
+                if not futuro.done():
+                    futuro.set_result(resultado[i])
+
+    def estatisticas(self) -> Dict:
+        """Métricas de agrupamento acumuladas"""
+        return {
+            'lotes': self.total_lotes,
+            'leituras': self.total_leituras,
+            'tamanho_medio_lote': self.total_leituras / self.total_lotes if self.total_lotes else 0.0,
+            'tempo_inferencia_s': round(self.tempo_inferencia, 4),
+            'max_lote': self.max_lote,
+            'espera_max_ms': self.espera_max_s * 1000
+        }
+
+
+class ServidorPredicao:
+    """Servidor HTTP/1.1 mínimo com endpoints de saúde, métricas e predição"""
+
+    def __init__(self, modelo, config, max_lote: int, espera_max_ms: float, limiares: Optional[np.ndarray] = None,
+                 cache: Optional[CachePredicoes] = None):
+        self.modelo = modelo
+        self.cache = cache
+        self.config = config
+        # Com o registro por segmento, colunas de segmento que não são features (ex.: 'site') também são exigidas
+        self.colunas = list(config.FEATURES)
+        if isinstance(modelo, RegistroModelos):
+            self.colunas += [col for col in modelo.colunas if col not in self.colunas]
+        self._pontuar_modelo = criar_pontuador(modelo, config.FEATURES)
+        if cache is not None:
+            cache.pontuar = self._pontuar_modelo
+            self._pontuar_modelo = cache.prever
+        self.limiares = limiares if limiares is not None else np.full(len(config.COLUNAS_TARGET), LIMIAR_PADRAO)
+        self.loteador = LoteadorPredicoes(self._pontuar, max_lote, espera_max_ms / 1000.0)
+
+    def _pontuar(self, leituras: List[Dict]) -> np.ndarray:
+        """Pontuar um micro-lote de leituras com o pipeline, artefato compilado ou registro por segmento"""
+        return self._pontuar_modelo(montar_entrada(leituras, self.colunas))
+
+    def _validar_leitura(self, corpo: bytes) -> Dict:
+        """Validar o JSON de uma leitura de sensores"""
+        try:
+            dados = json.loads(corpo)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise ValueError("Corpo da requisição não é um JSON válido")
+
+        if not isinstance(dados, dict):
+            raise ValueError("Esperado um objeto JSON com uma leitura de sensores")
+
+        faltantes = [f for f in self.colunas if f not in dados]
+        if faltantes:
+            raise ValueError(f"Campos obrigatórios ausentes: {faltantes}")
+
+        leitura = {}
+        for campo in self.colunas:
+            if campo not in self.config.FEATURES_NUMERICAS:
+                leitura[campo] = str(dados[campo])
+        for campo in self.config.FEATURES_NUMERICAS:
+            try:
+                valor = float(dados[campo])
+            except (TypeError, ValueError):
+                raise ValueError(f"Campo '{campo}' deve ser numérico")
+            if not math.isfinite(valor):
+                raise ValueError(f"Campo '{campo}' deve ser finito")
+            leitura[campo] = valor
+
+        return leitura
+
+    async def _rotear(self, metodo: str, caminho: str, corpo: bytes) -> Tuple[int, Dict]:
+        """Despachar a requisição para o endpoint correspondente"""
+        if caminho == '/saude':
+            return (200, {'status': 'ok'}) if metodo == 'GET' else (405, {'erro': 'Use GET'})
+
+        if caminho == '/metricas':
+            if metodo != 'GET':
+                return 405, {'erro': 'Use GET'}
+            metricas = self.loteador.estatisticas()
+            if isinstance(self.modelo, RegistroModelos):
+                metricas['registro'] = self.modelo.estatisticas()
+            if self.cache is not None:
+                metricas['cache_predicoes'] = self.cache.estatisticas()
+            return 200, metricas
+
+        if caminho == '/prever':
+            if metodo != 'POST':
+                return 405, {'erro': 'Use POST'}
+            try:
+                leitura = self._validar_leitura(corpo)
+            except ValueError as e:
+                return 400, {'erro': str(e)}
+
+            try:
+                probabilidades = await self.loteador.prever(leitura)
+            except Exception as e:
+                return 500, {'erro': f"Falha na predição: {e}"}
+
+            return 200, {
+                'probabilidades': dict(zip(self.config.COLUNAS_TARGET, map(float, probabilidades))),
+                'falhas': dict(zip(self.config.COLUNAS_TARGET, map(bool, probabilidades > self.limiares)))
+            }
+
+        return 404, {'erro': f"Endpoint não encontrado: {caminho}"}
+
+    @staticmethod
+    def _escrever_resposta(writer, status: int, corpo: Dict, manter_conexao: bool):
+        """Serializar uma resposta HTTP com corpo JSON"""
+        conteudo = json.dumps(corpo, ensure_ascii=False).encode('utf-8')
+        cabecalho = (
+            f"HTTP/1.1 {status} {MENSAGENS_STATUS.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(conteudo)}\r\n"
+            f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n\r\n"
+        )
+        writer.write(cabecalho.encode('latin-1') + conteudo)
+
+    async def tratar_conexao(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atender requisições de uma conexão (com keep-alive)"""
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+
+                try:
+                    metodo, caminho, versao = linha.decode('latin-1').split()
+                    cabecalhos = {}
+                    while True:
+                        linha_cabecalho = await reader.readline()
+                        if linha_cabecalho in (b'\r\n', b'\n', b''):
+                            break
+                        nome, valor = linha_cabecalho.decode('latin-1').split(':', 1)
+                        cabecalhos[nome.strip().lower()] = valor.strip()
+                    tamanho = int(cabecalhos.get('content-length', 0))
+                    if tamanho < 0:
+                        raise ValueError(f"Content-Length negativo: {tamanho}")
+                except ValueError:
+                    self._escrever_resposta(writer, 400, {'erro': 'Requisição HTTP malformada'}, False)
+                    await writer.drain()
+                    break
+
+                # O corpo só é lido até o limite configurado; acima dele a conexão é encerrada sem lê-lo
+                if tamanho > self.config.API_MAX_CORPO_BYTES:
+                    self._escrever_resposta(writer, 413, {
+                        'erro': f"Corpo de {tamanho} bytes acima do limite de {self.config.API_MAX_CORPO_BYTES}"
+                    }, False)
+                    await writer.drain()
+                    break
+
+                corpo = await reader.readexactly(tamanho) if tamanho else b''
+                status, resposta = await self._rotear(metodo, caminho.split('?', 1)[0], corpo)
+
+                manter_conexao = (versao == 'HTTP/1.1'
+                                  and cabecalhos.get('connection', '').lower() != 'close')
+                self._escrever_resposta(writer, status, resposta, manter_conexao)
+                await writer.drain()
+
+                if not manter_conexao:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def servir(servidor: ServidorPredicao, host: str, porta: int):
+    """Iniciar o servidor e atender até ser interrompido"""
+    servidor.loteador.iniciar()
+    srv = await asyncio.start_server(servidor.tratar_conexao, host, porta)
+
+    print(f"API de predição em http://{host}:{porta} "
+          f"(lote máx. {servidor.loteador.max_lote}, "
+          f"espera máx. {servidor.loteador.espera_max_s * 1000:.1f} ms)")
+
+    try:
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        await servidor.loteador.parar()
+
+
+def main():
+    """Função principal da API"""
+    config = obter_configuracao()
+
+    parser = argparse.ArgumentParser(description="API REST de predição com micro-lotes")
+    parser.add_argument('--host', default=config.API_HOST)
+    parser.add_argument('--porta', type=int, default=config.API_PORT)
+    parser.add_argument('--modelo', default=config.CAMINHO_MODELO)
+    parser.add_argument('--artefato', default=None,
+                        help="Diretório do artefato compilado (mapeado em memória) em vez do --modelo")
+    parser.add_argument('--registro', default=config.DIR_REGISTRO_MODELOS if config.MODELOS_POR_SEGMENTO else None,
+                        help="Registro de modelos por segmento (o --modelo/--artefato atende os demais segmentos)")
+    parser.add_argument('--cache-modelos-mb', type=float, default=config.CACHE_MODELOS_MB)
+    parser.add_argument('--cache-predicoes', action=argparse.BooleanOptionalAction, default=config.CACHE_PREDICOES,
+                        help="Memorizar as probabilidades de leituras repetidas")
+    parser.add_argument('--cache-predicoes-max', type=int, default=config.CACHE_PREDICOES_MAX)
+    parser.add_argument('--casas-decimais', type=int, default=config.CACHE_PREDICOES_CASAS,
+                        help="Arredondamento das features na chave do cache (ausente = valores exatos)")
+    parser.add_argument('--limiares', default=config.CAMINHO_LIMIARES,
+                        help="Limiares de decisão por tipo de falha (ausente = 0,5 para todos)")
+    parser.add_argument('--max-lote', type=int, default=config.API_MAX_LOTE)
+    parser.add_argument('--espera-ms', type=float, default=config.API_ESPERA_MAX_MS)
+    args = parser.parse_args()
+
+    if args.artefato:
+        print(f"Carregando artefato de '{args.artefato}' (memory mapping)...")
+        modelo = carregar_artefato(args.artefato, config.FEATURES, config.COLUNAS_TARGET)
+    else:
+        print(f"Carregando modelo de '{args.modelo}'...")
+        modelo = joblib.load(args.modelo)
+
+    if args.registro and registro_existe(args.registro):
+        modelo = RegistroModelos(args.registro, config.FEATURES, config.COLUNAS_TARGET, args.cache_modelos_mb,
+                                 pontuar_padrao=criar_pontuador(modelo, config.FEATURES))
+        print(f"Registro de {len(modelo.segmentos)} modelos por segmento ({', '.join(modelo.colunas)}) "
+              f"de '{args.registro}', cache de até {args.cache_modelos_mb:g} MB")
+
+    limiares = None
+    if os.path.exists(args.limiares):
+        limiares = carregar_limiares(args.limiares, config.COLUNAS_TARGET)
+        print(f"Limiares de decisão de '{args.limiares}': "
+              f"{dict(zip(config.COLUNAS_TARGET, np.round(limiares, 3).tolist()))}")
+
+    cache = None
+    if args.cache_predicoes:
+        # A versão liga o cache ao arquivo do modelo (e ao registro): outro modelo nunca reaproveita entradas
+        versao = versao_modelo(caminho=args.artefato or args.modelo)
+        colunas_categoricas = list(config.FEATURES_CATEGORICAS)
+        if isinstance(modelo, RegistroModelos):
+            versao += versao_modelo(caminho=args.registro)
+            colunas_categoricas += [col for col in modelo.colunas if col not in config.FEATURES]
+        cache = CachePredicoes(None, config.FEATURES_NUMERICAS, colunas_categoricas, len(config.COLUNAS_TARGET),
+                               versao, args.cache_predicoes_max, args.casas_decimais)
+        print(f"Cache de predições: até {args.cache_predicoes_max} entradas, "
+              f"{'valores exatos' if args.casas_decimais is None else f'{args.casas_decimais} casas decimais'}")
+
+    servidor = ServidorPredicao(modelo, config, args.max_lote, args.espera_ms, limiares, cache)
+    try:
+        asyncio.run(servir(servidor, args.host, args.porta))
+    except KeyboardInterrupt:
+        print("\nAPI encerrada.")
+
+
+if __name__ == "__main__":
+    main()
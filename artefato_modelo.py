@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Artefato de Modelo do Sistema de Manutenção Preditiva
+Diretório versionado com os arrays do modelo compilado em blocos .npy sem compressão, carregados
+com memory mapping (vários processos compartilham uma única cópia pelo page cache), e um
+manifesto com esquema, hash dos dados, versões das bibliotecas e checksums
+"""
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from inferencia_compilada import FlorestaCompilada
+
+# Versão do layout do diretório (alterar torna artefatos antigos incompatíveis)
+VERSAO_ARTEFATO = 1
+
+ARQUIVO_MANIFESTO = 'manifesto.json'
+
+
+def _sha256_arquivo(caminho: Path, tamanho_bloco: int = 1 << 20) -> str:
+    """Calcular o hash SHA-256 do conteúdo de um arquivo"""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _versoes_bibliotecas() -> Dict[str, str]:
+    """Versões das bibliotecas que produziram o artefato"""
+    versoes = {'python': platform.python_version(), 'numpy': np.__version__}
+    try:
+        import sklearn
+        versoes['sklearn'] = sklearn.__version__
+    except ImportError:
+        pass
+    return versoes
+
+
+def salvar_artefato(modelo: FlorestaCompilada, diretorio: str, features: List[str], alvos: List[str],
+                    hash_dados: Optional[str] = None) -> Dict:
+    """Gravar o modelo compilado como diretório de arrays .npy + manifesto (troca atômica do diretório)"""
+    destino = Path(diretorio)
+    temporario = destino.with_name(destino.name + '.tmp')
+    shutil.rmtree(temporario, ignore_errors=True)
+    temporario.mkdir(parents=True)
+
+    # 'folha' também é gravada para que os workers não recalculem (e dupliquem) o array
+    arrays = {campo: getattr(modelo, campo) for campo in FlorestaCompilada.CAMPOS}
+    arrays['folha'] = modelo.folha
+
+    arquivos = {}
+    for nome, array in arrays.items():
+        caminho = temporario / f"{nome}.npy"
+        np.save(caminho, np.ascontiguousarray(array), allow_pickle=False)
+        arquivos[nome] = {
+            'arquivo': caminho.name,
+            'dtype': str(array.dtype),
+            'shape': list(array.shape),
+            'bytes': caminho.stat().st_size,
+            'sha256': _sha256_arquivo(caminho),
+        }
+
+    manifesto = {
+        'versao_artefato': VERSAO_ARTEFATO,
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'features': list(features),
+        'alvos': list(alvos),
+        'hash_dados': hash_dados,
+        'versoes': _versoes_bibliotecas(),
+        'meta_modelo': modelo.meta,
+        'arquivos': arquivos,
+    }
+    with open(temporario / ARQUIVO_MANIFESTO, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2, ensure_ascii=False)
+
+    antigo = destino.with_name(destino.name + '.antigo')
+    if destino.exists():
+        os.replace(destino, antigo)
+    os.replace(temporario, destino)
+    shutil.rmtree(antigo, ignore_errors=True)
+
+    return manifesto
+
+
+def ler_manifesto(diretorio: str) -> Dict:
+    """Ler o manifesto de um artefato"""
+    caminho = Path(diretorio) / ARQUIVO_MANIFESTO
+    if not caminho.exists():
+        raise ValueError(f"Manifesto não encontrado em '{diretorio}'")
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def validar_manifesto(manifesto: Dict, features: Optional[List[str]] = None,
+                      alvos: Optional[List[str]] = None, hash_dados: Optional[str] = None):
+    """Conferir versão do formato, bibliotecas e esquema esperado; ValueError na primeira divergência"""
+    if manifesto.get('versao_artefato') != VERSAO_ARTEFATO:
+        raise ValueError(f"Versão de artefato incompatível: {manifesto.get('versao_artefato')} "
+                         f"(esperada {VERSAO_ARTEFATO})")
+
+    versao_numpy = manifesto['versoes']['numpy']
+    if versao_numpy.split('.')[0] != np.__version__.split('.')[0]:
+        raise ValueError(f"Artefato gravado com numpy {versao_numpy}, incompatível com {np.__version__}")
+
+    if features is not None and manifesto['features'] != list(features):
+        raise ValueError(f"Features do artefato {manifesto['features']} diferem das esperadas {list(features)}")
+    if alvos is not None and manifesto['alvos'] != list(alvos):
+        raise ValueError(f"Alvos do artefato {manifesto['alvos']} diferem dos esperados {list(alvos)}")
+    if hash_dados is not None and manifesto['hash_dados'] != hash_dados:
+        raise ValueError(f"Artefato treinado com dados de hash {manifesto['hash_dados']}, esperado {hash_dados}")
+
+
+def carregar_artefato(diretorio: str, features: Optional[List[str]] = None, alvos: Optional[List[str]] = None,
+                      hash_dados: Optional[str] = None, verificar_checksum: bool = True) -> FlorestaCompilada:
+    """Carregar o modelo com os arrays mapeados em memória (somente leitura)
+
+    O tamanho de cada arquivo é sempre conferido; o SHA-256 completo é opcional, pois lê o
+    arquivo inteiro (a partir do page cache, quando outro processo já o carregou).
+    """
+    manifesto = ler_manifesto(diretorio)
+    validar_manifesto(manifesto, features, alvos, hash_dados)
+
+    arrays = {}
+    for nome, info in manifesto['arquivos'].items():
+        caminho = Path(diretorio) / info['arquivo']
+        if not caminho.exists() or caminho.stat().st_size != info['bytes']:
+            raise ValueError(f"Arquivo do artefato ausente ou com tamanho divergente: {caminho}")
+        if verificar_checksum and _sha256_arquivo(caminho) != info['sha256']:
+            raise ValueError(f"Checksum divergente: {caminho}")
+
+        array = np.load(caminho, mmap_mode='r', allow_pickle=False)
+        if str(array.dtype) != info['dtype'] or list(array.shape) != info['shape']:
+            raise ValueError(f"Array '{nome}' com dtype/shape divergente do manifesto")
+        arrays[nome] = array
+
+    return FlorestaCompilada(arrays, manifesto['meta_modelo'])
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Avaliação do Sistema de Manutenção Preditiva
+Avaliação em uma única passagem de inferência (rótulos derivados das probabilidades) e ajuste
+vetorizado do limiar de decisão de cada tipo de falha por somas acumuladas sobre as probabilidades ordenadas
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Limiar equivalente a predict(): classe positiva quando a probabilidade passa de 0,5
+LIMIAR_PADRAO = 0.5
+
+
+def rotulos_por_limiar(probabilidades: np.ndarray,
+                       limiares: Union[float, Sequence[float]] = LIMIAR_PADRAO) -> np.ndarray:
+    """Rótulos 0/1 de cada alvo: probabilidade estritamente acima do limiar (0,5 reproduz predict)"""
+    return (probabilidades > np.asarray(limiares, dtype=np.float64)).astype(np.int64)
+
+
+def metricas_por_alvo(y_true: np.ndarray, rotulos: np.ndarray, beta: float = 1.0) -> Dict[str, np.ndarray]:
+    """Precisão, recall e F-beta de cada coluna (zero quando indefinidos)"""
+    y_true = np.asarray(y_true, dtype=bool)
+    rotulos = np.asarray(rotulos, dtype=bool)
+    vp = (y_true & rotulos).sum(axis=0)
+    fp = (~y_true & rotulos).sum(axis=0)
+    fn = (y_true & ~rotulos).sum(axis=0)
+    return {
+        'precisao': np.divide(vp, vp + fp, out=np.zeros(vp.shape), where=(vp + fp) > 0),
+        'recall': np.divide(vp, vp + fn, out=np.zeros(vp.shape), where=(vp + fn) > 0),
+        'f': _f_beta(vp, fp, fn, beta),
+    }
+
+
+def _f_beta(vp: np.ndarray, fp: np.ndarray, fn: np.ndarray, beta: float) -> np.ndarray:
+    """F-beta a partir das contagens (zero quando não há positivos previstos nem reais)"""
+    b2 = beta ** 2
+    numerador = (1 + b2) * vp
+    denominador = numerador + b2 * fn + fp
+    return np.divide(numerador, denominador, out=np.zeros(np.shape(vp)), where=denominador > 0)
+
+
+def ajustar_limiares(y_true: np.ndarray, probabilidades: np.ndarray, beta: float = 1.0) -> Dict[str, np.ndarray]:
+    """Limiar de cada alvo que maximiza o F-beta, avaliando todos os cortes de uma vez
+
+    As probabilidades de cada coluna são ordenadas em ordem decrescente; a soma acumulada dos
+    rótulos nessa ordem dá os verdadeiros positivos de cada corte (k maiores previstas como positivas)
+    e os falsos positivos saem de k - VP. Só contam cortes no fim de um grupo de probabilidades
+    empatadas. O limiar fica no meio entre a menor probabilidade incluída e a próxima. Alvos sem
+    positivos mantêm LIMIAR_PADRAO.
+    """
+    y_true = np.asarray(y_true, dtype=np.int64)
+    probabilidades = np.asarray(probabilidades, dtype=np.float64)
+    n, n_alvos = probabilidades.shape
+    colunas = np.arange(n_alvos)
+
+    ordem = np.argsort(-probabilidades, axis=0, kind='stable')
+    p_ordenadas = np.take_along_axis(probabilidades, ordem, axis=0)
+    vp = np.cumsum(np.take_along_axis(y_true, ordem, axis=0), axis=0)
+    fp = np.arange(1, n + 1)[:, None] - vp
+    positivos = vp[-1]
+
+    f = _f_beta(vp, fp, positivos - vp, beta)
+    fim_empate = np.ones_like(p_ordenadas, dtype=bool)
+    fim_empate[:-1] = p_ordenadas[:-1] != p_ordenadas[1:]
+    f[~fim_empate] = -1.0
+
+    corte = np.argmax(f, axis=0)
+    p_corte = p_ordenadas[corte, colunas]
+    tem_proxima = corte + 1 < n
+    p_proxima = p_ordenadas[np.minimum(corte + 1, n - 1), colunas]
+    limiares = np.where(tem_proxima, (p_corte + p_proxima) / 2, np.nextafter(p_corte, -np.inf))
+
+    ajustado = positivos > 0
+    return {
+        'limiares': np.where(ajustado, limiares, LIMIAR_PADRAO),
+        'f': np.where(ajustado, f[corte, colunas], 0.0),
+        'ajustado': ajustado,
+    }
+
+
+def avaliar_probabilidades(y_true: np.ndarray, probabilidades: np.ndarray, alvos: List[str],
+                           ajustar: bool = True, beta: float = 1.0) -> Dict:
+    """Rótulos (limiar 0,5), limiares ajustados e métricas por alvo a partir de uma única matriz de probabilidades"""
+    y_true = np.asarray(y_true)
+    rotulos = rotulos_por_limiar(probabilidades)
+    padrao = metricas_por_alvo(y_true, rotulos, beta)
+
+    if ajustar:
+        ajuste = ajustar_limiares(y_true, probabilidades, beta)
+        limiares = ajuste['limiares']
+    else:
+        limiares = np.full(len(alvos), LIMIAR_PADRAO)
+    ajustadas = metricas_por_alvo(y_true, rotulos_por_limiar(probabilidades, limiares), beta)
+
+    return {
+        'rotulos': rotulos,
+        'limiares': dict(zip(alvos, map(float, limiares))),
+        'metricas': {
+            alvo: {
+                'limiar': float(limiares[i]),
+                'positivos': int(y_true[:, i].sum()),
+                'f_padrao': float(padrao['f'][i]),
+                'f_ajustado': float(ajustadas['f'][i]),
+                'precisao_ajustada': float(ajustadas['precisao'][i]),
+                'recall_ajustado': float(ajustadas['recall'][i]),
+            }
+            for i, alvo in enumerate(alvos)
+        },
+    }
+
+
+def auc_avaliavel(y_true: np.ndarray, probabilidades: np.ndarray) -> Optional[float]:
+    """AUC ponderada só dos alvos com as duas classes em y_true (None se nenhum tiver)"""
+    from sklearn.metrics import roc_auc_score
+
+    y_true = np.asarray(y_true)
+    if len(y_true) == 0:
+        return None
+    positivos = y_true.sum(axis=0)
+    avaliaveis = np.flatnonzero((positivos > 0) & (positivos < len(y_true)))
+    if avaliaveis.size == 0:
+        return None
+    return float(roc_auc_score(y_true[:, avaliaveis], probabilidades[:, avaliaveis], average='weighted'))
+
+
+def salvar_limiares(caminho: str, limiares: Dict[str, float], beta: float, metricas: Optional[Dict] = None):
+    """Gravar os limiares de decisão junto ao modelo"""
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump({'limiares': limiares, 'beta': beta, 'metricas_validacao': metricas or {},
+                   'criado_em': datetime.now().isoformat(timespec='seconds')}, f, indent=2, ensure_ascii=False)
+
+
+def carregar_limiares(caminho: str, alvos: List[str]) -> np.ndarray:
+    """Limiares gravados, na ordem dos alvos (LIMIAR_PADRAO para alvos ausentes)"""
+    with open(caminho, encoding='utf-8') as f:
+        limiares = json.load(f)['limiares']
+    return np.array([limiares.get(alvo, LIMIAR_PADRAO) for alvo in alvos], dtype=np.float64)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Avaliação em Passagem Única
+Compara a avaliação anterior (predict + predict_proba e busca de limiar com chamadas repetidas ao
+f1_score do sklearn) com a nova (uma passagem de predict_proba e busca vetorizada), conferindo a
+paridade dos rótulos com predict e dos limiares com a busca exaustiva
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+def busca_exaustiva(y_true: np.ndarray, probabilidades: np.ndarray, beta: float):
+    """Melhor F-beta de cada alvo testando cada probabilidade distinta como corte (um f-score por corte)"""
+    from sklearn.metrics import fbeta_score
+
+    melhores = []
+    for j in range(probabilidades.shape[1]):
+        if y_true[:, j].sum() == 0:
+            melhores.append(0.0)
+            continue
+        cortes = np.unique(probabilidades[:, j])
+        melhores.append(max(fbeta_score(y_true[:, j], probabilidades[:, j] >= corte, beta=beta, zero_division=0)
+                            for corte in cortes))
+    return np.array(melhores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Avaliação em passagem única e ajuste vetorizado de limiares")
+    parser.add_argument('--treino', default='data/bootcamp_train.csv')
+    parser.add_argument('--arvores', type=int, default=100)
+    parser.add_argument('--beta', type=float, default=1.0)
+    args = parser.parse_args()
+
+    from avaliacao import ajustar_limiares, avaliar_probabilidades
+    from config_file import obter_configuracao
+    from inferencia import probabilidades_positivas
+    from python_script_main import ManutencaoPreditiva
+
+    config = obter_configuracao()
+    config.MODO_VISUALIZACAO = 'off'
+    config.EXPORTAR_MODELO_COMPILADO = False
+    sistema = ManutencaoPreditiva(config)
+    sistema.carregar_dados(args.treino)
+    sistema.limpar_dados()
+    X_train, X_val, y_train, y_val, preprocessor = sistema.preparar_dados()
+    sistema.treinar_modelo(X_train, y_train, preprocessor, otimizar=False,
+                           parametros={'classifier__estimator__n_estimators': args.arvores})
+    modelo, alvos = sistema.best_model, sistema.target_cols
+    y = y_val.to_numpy()
+
+    # Avaliação anterior: duas passagens de inferência
+    inicio = time.perf_counter()
+    rotulos_predict = modelo.predict(X_val)
+    proba_anterior = probabilidades_positivas(modelo.predict_proba(X_val))
+    tempo_anterior = time.perf_counter() - inicio
+
+    # Avaliação nova: uma passagem, rótulos derivados das probabilidades
+    inicio = time.perf_counter()
+    probabilidades = probabilidades_positivas(modelo.predict_proba(X_val))
+    avaliacao = avaliar_probabilidades(y, probabilidades, alvos, ajustar=True, beta=args.beta)
+    tempo_novo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    f_exaustivo = busca_exaustiva(y, probabilidades, args.beta)
+    tempo_exaustivo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    ajuste = ajustar_limiares(y, probabilidades, args.beta)
+    tempo_vetorizado = time.perf_counter() - inicio
+
+    resultado = {
+        'linhas_validacao': len(X_val),
+        'inferencia_anterior_s': round(tempo_anterior, 4),
+        'avaliacao_nova_s': round(tempo_novo, 4),
+        'rotulos_iguais_predict': bool(np.array_equal(avaliacao['rotulos'], rotulos_predict)),
+        'probabilidades_iguais': bool(np.array_equal(probabilidades, proba_anterior)),
+        'busca_exaustiva_s': round(tempo_exaustivo, 4),
+        'busca_vetorizada_s': round(tempo_vetorizado, 6),
+        'diferenca_max_f': float(np.abs(f_exaustivo - ajuste['f']).max()),
+        'limiares': avaliacao['limiares'],
+        'f_padrao': {alvo: round(m['f_padrao'], 4) for alvo, m in avaliacao['metricas'].items()},
+        'f_ajustado': {alvo: round(m['f_ajustado'], 4) for alvo, m in avaliacao['metricas'].items()},
+    }
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Cache Colunar de Dados
+Compara a leitura a frio (pd.read_csv) com a leitura a quente do cache .npz
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cache_dados import ler_csv_com_cache
+
+
+def _medir(funcao, repeticoes):
+    """Executar uma função várias vezes e retornar o menor tempo (s)"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CSV vs cache colunar")
+    parser.add_argument('--csv', default='data/bootcamp_train.csv')
+    parser.add_argument('--escala', type=int, default=1,
+                        help="Replicar o CSV N vezes para simular lotes maiores")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho_csv = args.csv
+        if args.escala > 1:
+            df = pd.read_csv(args.csv)
+            caminho_csv = str(Path(tmp) / f"{Path(args.csv).stem}_x{args.escala}.csv")
+            pd.concat([df] * args.escala, ignore_index=True).to_csv(caminho_csv, index=False)
+
+        dir_cache = str(Path(tmp) / 'cache')
+
+        tempo_frio = _medir(lambda: pd.read_csv(caminho_csv), args.repeticoes)
+
+        inicio = time.perf_counter()
+        ler_csv_com_cache(caminho_csv, dir_cache)
+        tempo_conversao = time.perf_counter() - inicio
+
+        tempo_quente = _medir(lambda: ler_csv_com_cache(caminho_csv, dir_cache), args.repeticoes)
+
+        # Conferir que o cache devolve exatamente o mesmo DataFrame
+        df_csv = pd.read_csv(caminho_csv)
+        df_cache, _ = ler_csv_com_cache(caminho_csv, dir_cache)
+        pd.testing.assert_frame_equal(df_csv, df_cache)
+
+        tamanho_mb = Path(caminho_csv).stat().st_size / 1e6
+        print(f"Arquivo: {caminho_csv} ({tamanho_mb:.1f} MB, {len(df_csv)} linhas)")
+        print(f"  CSV (frio):              {tempo_frio * 1000:8.1f} ms")
+        print(f"  Primeira carga + cache:  {tempo_conversao * 1000:8.1f} ms")
+        print(f"  Cache colunar (quente):  {tempo_quente * 1000:8.1f} ms")
+        print(f"  Ganho:                   {tempo_frio / tempo_quente:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Motor de Inferência Compilado
+Confere a paridade com o pipeline sklearn e compara a latência para lotes de 1 a 10k linhas
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config_file import obter_configuracao
+from inferencia import probabilidades_positivas
+from inferencia_compilada import compilar_pipeline
+
+
+def _medir(funcao, repeticoes):
+    """Menor tempo (s) entre várias execuções"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+
+def verificar_paridade(pipeline, modelo_compilado, X) -> float:
+    """Maior diferença entre as probabilidades do motor compilado e as do pipeline sklearn"""
+    esperado = probabilidades_positivas(pipeline.predict_proba(X))
+    obtido = modelo_compilado.prever_proba(X)
+    return float(np.abs(esperado - obtido).max())
+
+
+def main():
+    config = obter_configuracao()
+
+    parser = argparse.ArgumentParser(description="Benchmark do motor de inferência compilado")
+    parser.add_argument('--modelo', default=config.CAMINHO_MODELO)
+    parser.add_argument('--csv', default=config.CAMINHO_DADOS_TESTE)
+    parser.add_argument('--lotes', type=int, nargs='+', default=[1, 100, 300, 1000, 10_000])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--tolerancia', type=float, default=1e-9)
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.modelo)
+    X = pd.read_csv(args.csv, usecols=config.FEATURES).dropna()
+
+    inicio = time.perf_counter()
+    modelo_compilado = compilar_pipeline(pipeline)
+    print(f"Exportação: {time.perf_counter() - inicio:.2f} s, {len(modelo_compilado.raizes)} árvores, "
+          f"{len(modelo_compilado.feature)} nós, profundidade máx. {modelo_compilado.profundidade_max}")
+
+    diferenca = verificar_paridade(pipeline, modelo_compilado, X)
+    if not diferenca <= args.tolerancia:
+        print(f"ERRO: motor compilado diverge do pipeline: diferença máxima {diferenca:.3g} "
+              f"(tolerância {args.tolerancia:.0e})")
+        return 1
+    print(f"Paridade com o pipeline sklearn: OK (diferença máxima {diferenca:.2e}, {len(X)} linhas)")
+
+    print(f"\n{'lote':>8} {'sklearn (ms)':>14} {'compilado (ms)':>16} {'ganho':>8}")
+    perde_em = []
+    for tamanho in args.lotes:
+        lote = X.sample(n=tamanho, replace=tamanho > len(X), random_state=0)
+        tempo_sklearn = _medir(lambda: pipeline.predict_proba(lote), args.repeticoes)
+        tempo_compilado = _medir(lambda: modelo_compilado.prever_proba(lote), args.repeticoes)
+        print(f"{tamanho:>8} {tempo_sklearn * 1000:>14.2f} {tempo_compilado * 1000:>16.2f} "
+              f"{tempo_sklearn / tempo_compilado:>7.1f}x")
+        if tempo_compilado >= tempo_sklearn:
+            perde_em.append(tamanho)
+
+    # Processo já carregado: no predicao_rapida.py o sklearn ainda paga a importação e a carga do .pkl
+    # (ver benchmarks/inicializacao.py e LIMITE_LINHAS_COMPILADO)
+    if perde_em:
+        print(f"\nCom o processo já carregado, o motor compilado deixa de ganhar a partir de {min(perde_em)} linhas")
+    else:
+        print("\nCom o processo já carregado, o motor compilado ganhou em todos os lotes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark da Predição em Blocos
+Compara gerar_predicoes com o arquivo inteiro em memória e em blocos (1 e N workers):
+linhas/s, pico de memória (RSS) de cada execução e igualdade dos arquivos de submissão
+"""
+
+import argparse
+import filecmp
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+def executar_modo(caminho_csv: str, caminho_saida: str, tamanho_bloco: int, n_workers: int):
+    """Processo filho: carregar o modelo salvo, gerar a submissão e reportar tempo e pico de RSS"""
+    import time
+
+    import joblib
+    from config_file import obter_configuracao
+    from python_script_main import ManutencaoPreditiva
+
+    config = obter_configuracao()
+    config.CAMINHO_SUBMISSION = caminho_saida
+    config.USAR_CACHE_DADOS = False
+    sistema = ManutencaoPreditiva(config)
+    sistema.best_model = joblib.load(config.CAMINHO_MODELO)
+
+    inicio = time.perf_counter()
+    sistema.gerar_predicoes(caminho_csv, tamanho_bloco=tamanho_bloco, n_workers=n_workers)
+    tempo = time.perf_counter() - inicio
+
+    pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({'tempo_s': tempo, 'pico_rss_mb': pico_mb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predição com o arquivo inteiro vs em blocos")
+    parser.add_argument('--csv', default='data/bootcamp_test.csv')
+    parser.add_argument('--escala', type=int, default=20,
+                        help="Replicar o CSV N vezes para simular um dump grande de sensores")
+    parser.add_argument('--tamanho-bloco', type=int, default=50_000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--filho', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        caminho_csv, caminho_saida, tamanho_bloco, n_workers = args.filho
+        executar_modo(caminho_csv, caminho_saida, int(tamanho_bloco) or None, int(n_workers))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho_csv = str(Path(tmp) / f"entrada_x{args.escala}.csv")
+        df = pd.read_csv(args.csv)
+        pd.concat([df] * args.escala, ignore_index=True).to_csv(caminho_csv, index=False)
+        n_linhas = len(df) * args.escala
+        del df
+
+        modos = [
+            ('arquivo inteiro', 0, 1),
+            (f'blocos de {args.tamanho_bloco}', args.tamanho_bloco, 1),
+            (f'blocos de {args.tamanho_bloco}, {args.workers} workers', args.tamanho_bloco, args.workers),
+        ]
+
+        resultados = []
+        for nome, tamanho_bloco, n_workers in modos:
+            caminho_saida = str(Path(tmp) / f"submission_{len(resultados)}.csv")
+            comando = [sys.executable, __file__, '--filho', caminho_csv, caminho_saida,
+                       str(tamanho_bloco), str(n_workers)]
+            saida = subprocess.run(comando, cwd=RAIZ, check=True, capture_output=True, text=True).stdout
+            resultados.append((nome, caminho_saida, json.loads(saida.strip().splitlines()[-1])))
+
+        print(f"\n{n_linhas} linhas ({Path(caminho_csv).stat().st_size / 1e6:.0f} MB)")
+        print(f"{'modo':<36} {'tempo (s)':>10} {'linhas/s':>10} {'pico RSS (MB)':>14}")
+        for nome, _, r in resultados:
+            print(f"{nome:<36} {r['tempo_s']:>10.1f} {n_linhas / r['tempo_s']:>10.0f} {r['pico_rss_mb']:>14.0f}")
+
+        referencia = resultados[0][1]
+        iguais = all(filecmp.cmp(referencia, caminho, shallow=False) for _, caminho, _ in resultados[1:])
+        print(f"\nSubmissões idênticas ao modo arquivo inteiro: {iguais}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Cache de Predições
+Telemetria sintética repetitiva (máquinas paradas repetindo a última leitura, com ruído de sensor
+opcional) pontuada em micro-lotes sem cache, com cache exato e com cache arredondado, reportando
+linhas/s, taxa de acerto e a diferença máxima para as probabilidades sem cache
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+def gerar_telemetria(base: pd.DataFrame, maquinas: int, eventos: int, fracao_paradas: float, ruido: float,
+                     numericas, semente: int = 0) -> pd.DataFrame:
+    """Eventos de `maquinas` máquinas; as paradas repetem sempre a mesma leitura (mais ruído opcional)"""
+    rng = np.random.default_rng(semente)
+    leituras = base.sample(maquinas, replace=True, random_state=semente).reset_index(drop=True)
+    maquina = rng.integers(0, maquinas, eventos)
+    eventos_df = leituras.iloc[maquina].reset_index(drop=True)
+
+    # Máquinas em operação trocam de leitura a cada evento
+    em_operacao = rng.random(maquinas) >= fracao_paradas
+    ativas = np.flatnonzero(em_operacao[maquina])
+    novas = base.sample(len(ativas), replace=True, random_state=semente + 1)
+    eventos_df.loc[ativas, numericas] = novas[numericas].to_numpy()
+
+    if ruido > 0:
+        for col in numericas:
+            eventos_df[col] = eventos_df[col] + rng.normal(0, ruido, eventos)
+    return eventos_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache de predições em telemetria repetitiva")
+    parser.add_argument('--dados', default='data/bootcamp_test.csv')
+    parser.add_argument('--modelo', default=None,
+                        help="Artefato compilado ou .pkl (padrão: models/modelo_otimizado.pkl)")
+    parser.add_argument('--maquinas', type=int, default=2000)
+    parser.add_argument('--eventos', type=int, default=100_000)
+    parser.add_argument('--fracao-paradas', type=float, default=0.9)
+    parser.add_argument('--ruido', type=float, default=0.0, help="Desvio do ruído somado aos sensores")
+    parser.add_argument('--lote', type=int, default=512)
+    parser.add_argument('--max-entradas', type=int, default=100_000)
+    parser.add_argument('--casas-decimais', type=int, default=1, help="Arredondamento do modo quantizado")
+    args = parser.parse_args()
+
+    import joblib
+
+    from artefato_modelo import carregar_artefato
+    from cache_predicoes import CachePredicoes, versao_modelo
+    from config_file import obter_configuracao
+    from inferencia import criar_pontuador
+
+    config = obter_configuracao()
+    caminho = args.modelo or config.CAMINHO_MODELO
+    if Path(caminho).is_dir():
+        modelo = carregar_artefato(caminho, config.FEATURES, config.COLUNAS_TARGET)
+    else:
+        modelo = joblib.load(caminho)
+    pontuar = criar_pontuador(modelo, config.FEATURES)
+    versao = versao_modelo(caminho=caminho)
+
+    base = pd.read_csv(args.dados, usecols=config.FEATURES)
+    base = base.fillna(base.median(numeric_only=True)).dropna()
+    numericas = config.FEATURES_NUMERICAS
+    eventos = gerar_telemetria(base, args.maquinas, args.eventos, args.fracao_paradas, args.ruido, numericas)
+
+    modos = {'sem cache': None, 'exato': None, f'{args.casas_decimais} casas': args.casas_decimais}
+    referencia = None
+    resultados = {}
+    for nome, casas in modos.items():
+        cache = None
+        if nome != 'sem cache':
+            cache = CachePredicoes(pontuar, numericas, config.FEATURES_CATEGORICAS, len(config.COLUNAS_TARGET),
+                                   versao, args.max_entradas, casas)
+        funcao = cache.prever if cache is not None else pontuar
+
+        saidas = []
+        inicio = time.perf_counter()
+        for bloco in range(0, len(eventos), args.lote):
+            saidas.append(funcao(eventos.iloc[bloco:bloco + args.lote]))
+        duracao = time.perf_counter() - inicio
+        probabilidades = np.vstack(saidas)
+        if referencia is None:
+            referencia = probabilidades
+
+        estatisticas = cache.estatisticas() if cache is not None else {}
+        resultados[nome] = {
+            'linhas_por_s': round(len(eventos) / duracao),
+            'tempo_s': round(duracao, 3),
+            'taxa_acerto': round(estatisticas.get('taxa_acerto', 0.0), 4),
+            'pontuadas': estatisticas.get('pontuadas', len(eventos)),
+            'entradas': estatisticas.get('entradas', 0),
+            'dif_max': float(np.abs(probabilidades - referencia).max()),
+        }
+
+    print(json.dumps({'eventos': len(eventos), 'maquinas': args.maquinas, 'fracao_paradas': args.fracao_paradas,
+                      'ruido': args.ruido, 'lote': args.lote, 'modelo': caminho}, ensure_ascii=False))
+    print(f"\n{'modo':>10} {'linhas/s':>9} {'tempo (s)':>10} {'acerto':>7} {'pontuadas':>10} "
+          f"{'entradas':>9} {'dif. máx':>9}")
+    for nome, r in resultados.items():
+        print(f"{nome:>10} {r['linhas_por_s']:>9} {r['tempo_s']:>10.3f} {r['taxa_acerto']:>7.1%} "
+              f"{r['pontuadas']:>10} {r['entradas']:>9} {r['dif_max']:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
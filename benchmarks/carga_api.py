@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Teste de Carga da API de Predição
+Dispara requisições concorrentes contra uma instância local e reporta latência p50/p99 e requisições/s
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config_file import obter_configuracao
+
+
+def carregar_leituras(caminho_csv, features, limite=1000):
+    """Obter leituras de exemplo a partir do CSV de teste"""
+    df = pd.read_csv(caminho_csv, usecols=features, nrows=limite).dropna()
+    return [json.dumps(registro).encode('utf-8') for registro in df.to_dict(orient='records')]
+
+
+async def _cliente(host, porta, leituras, n_requisicoes, latencias, erros):
+    """Cliente com conexão persistente enviando requisições em sequência"""
+    reader, writer = await asyncio.open_connection(host, porta)
+    try:
+        for i in range(n_requisicoes):
+            corpo = leituras[i % len(leituras)]
+            requisicao = (
+                f"POST /prever HTTP/1.1\r\nHost: {host}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(corpo)}\r\n\r\n"
+            ).encode('latin-1') + corpo
+
+            inicio = time.perf_counter()
+            writer.write(requisicao)
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            tamanho = 0
+            while True:
+                linha = await reader.readline()
+                if linha in (b'\r\n', b''):
+                    break
+                if linha.lower().startswith(b'content-length:'):
+                    tamanho = int(linha.split(b':', 1)[1])
+            await reader.readexactly(tamanho)
+
+            latencias.append(time.perf_counter() - inicio)
+            if status != 200:
+                erros.append(status)
+    finally:
+        writer.close()
+
+
+async def executar_carga(host, porta, leituras, concorrencia, total):
+    """Executar a carga com N clientes concorrentes"""
+    latencias, erros = [], []
+    por_cliente = max(1, total // concorrencia)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*[
+        _cliente(host, porta, leituras, por_cliente, latencias, erros)
+        for _ in range(concorrencia)
+    ])
+    duracao = time.perf_counter() - inicio
+
+    return np.array(latencias), erros, duracao
+
+
+def main():
+    config = obter_configuracao()
+
+    parser = argparse.ArgumentParser(description="Teste de carga da API de predição")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=config.API_PORT)
+    parser.add_argument('--csv', default=config.CAMINHO_DADOS_TESTE)
+    parser.add_argument('--concorrencia', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--requisicoes', type=int, default=2000)
+    args = parser.parse_args()
+
+    leituras = carregar_leituras(args.csv, config.FEATURES)
+
+    print(f"{'clientes':>9} {'req/s':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'erros':>7}")
+    for concorrencia in args.concorrencia:
+        latencias, erros, duracao = asyncio.run(
+            executar_carga(args.host, args.porta, leituras, concorrencia, args.requisicoes)
+        )
+        p50, p99 = np.percentile(latencias * 1000, [50, 99])
+        print(f"{concorrencia:>9} {len(latencias) / duracao:>10.1f} {p50:>10.2f} {p99:>10.2f} {len(erros):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Teste de Carga do Consumidor de Streaming
+Sobe o consumidor numa porta local e dispara, de um processo separado, leituras em JSON por linha
+de muitas máquinas (ids distintos sobre as linhas do CSV de teste); reporta eventos/s, latência
+ponta a ponta, contrapressão e a evolução do RSS ao longo da carga
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+async def _produtor(host, porta, linhas, maquinas, inicio, total, passo, taxa):
+    """Conexão de um produtor: leituras inicio, inicio + passo, ... (drain respeita a contrapressão)"""
+    reader, writer = await asyncio.open_connection(host, porta)
+    bloco = []
+    enviados = 0
+    t0 = time.time()
+    for i in range(inicio, total, passo):
+        registro = linhas[i % len(linhas)]
+        # Desgaste crescente com as leituras da máquina, para a taxa de desgaste ser informativa
+        registro = dict(registro, id_produto=f"M{i % maquinas:06d}", instante=time.time(),
+                        desgaste_da_ferramenta=registro['desgaste_da_ferramenta'] + i // maquinas)
+        bloco.append(json.dumps(registro))
+        if len(bloco) == 256:
+            writer.write(('\n'.join(bloco) + '\n').encode('utf-8'))
+            await writer.drain()
+            enviados += len(bloco)
+            bloco = []
+            if taxa:
+                atraso = enviados / taxa - (time.time() - t0)
+                if atraso > 0:
+                    await asyncio.sleep(atraso)
+    if bloco:
+        writer.write(('\n'.join(bloco) + '\n').encode('utf-8'))
+        await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+
+def executar_produtores(host, porta, caminho_teste, maquinas, total, conexoes, taxa):
+    """Processo filho: N conexões concorrentes enviando o total de leituras"""
+    from config_file import obter_configuracao
+
+    config = obter_configuracao()
+    df = pd.read_csv(caminho_teste, usecols=config.FEATURES).dropna()
+    linhas = df.to_dict(orient='records')
+
+    async def todos():
+        await asyncio.gather(*[_produtor(host, porta, linhas, maquinas, k, total, conexoes, taxa / conexoes)
+                               for k in range(conexoes)])
+    asyncio.run(todos())
+
+
+async def executar_carga(args) -> dict:
+    """Consumidor no processo atual, produtores num processo filho; RSS amostrado a cada segundo"""
+    import joblib
+
+    from artefato_modelo import carregar_artefato
+    from config_file import obter_configuracao
+    from instrumentacao import memoria_atual_kb
+    from streaming_sensores import ConsumidorStreaming, criar_pontuador
+
+    config = obter_configuracao()
+    if args.artefato:
+        modelo = carregar_artefato(args.artefato, config.FEATURES, config.COLUNAS_TARGET)
+    else:
+        modelo = joblib.load(args.modelo)
+
+    consumidor = ConsumidorStreaming(criar_pontuador(modelo, config.FEATURES), config,
+                                     max_maquinas=args.max_maquinas, max_lote=args.max_lote,
+                                     fila_max=args.fila_max)
+    consumidor.iniciar()
+    servidor = await asyncio.start_server(consumidor.consumir_conexao, '127.0.0.1', 0, limit=2 ** 20)
+    porta = servidor.sockets[0].getsockname()[1]
+    rss_inicial = memoria_atual_kb() / 1024
+
+    comando = [sys.executable, str(Path(__file__).resolve()), '--filho', str(porta),
+               '--teste', str(Path(args.teste).resolve()), '--maquinas', str(args.maquinas),
+               '--eventos', str(args.eventos), '--conexoes', str(args.conexoes), '--taxa', str(args.taxa)]
+    inicio = time.perf_counter()
+    produtores = await asyncio.create_subprocess_exec(*comando, env=dict(os.environ, PYTHONPATH=str(RAIZ)))
+
+    amostras_rss = []
+    while produtores.returncode is None:
+        try:
+            await asyncio.wait_for(produtores.wait(), 1.0)
+        except asyncio.TimeoutError:
+            pass
+        amostras_rss.append((round(time.perf_counter() - inicio, 1), round(memoria_atual_kb() / 1024, 1),
+                             consumidor.metricas.eventos))
+    await consumidor._fila.join()
+    duracao = time.perf_counter() - inicio
+
+    servidor.close()
+    await servidor.wait_closed()
+    await consumidor.parar()
+
+    resumo = consumidor.metricas.resumo(consumidor.janelas)
+    resumo.update({
+        'duracao_s': round(duracao, 2),
+        'eventos_por_s': resumo['eventos'] / duracao,
+        'rss_inicial_mb': round(rss_inicial, 1),
+        'rss_amostras_mb': amostras_rss[::max(1, len(amostras_rss) // 10)],
+    })
+    return resumo
+
+
+def main():
+    from config_file import obter_configuracao
+
+    config = obter_configuracao()
+    parser = argparse.ArgumentParser(description="Teste de carga do consumidor de streaming")
+    parser.add_argument('--teste', default=config.CAMINHO_DADOS_TESTE)
+    parser.add_argument('--modelo', default=config.CAMINHO_MODELO)
+    parser.add_argument('--artefato', default=None)
+    parser.add_argument('--maquinas', type=int, default=100_000)
+    parser.add_argument('--eventos', type=int, default=1_000_000)
+    parser.add_argument('--conexoes', type=int, default=8)
+    parser.add_argument('--taxa', type=float, default=0, help="Eventos/s somando as conexões (0 = sem limite)")
+    parser.add_argument('--max-maquinas', type=int, default=config.STREAM_MAX_MAQUINAS)
+    parser.add_argument('--max-lote', type=int, default=config.STREAM_MAX_LOTE)
+    parser.add_argument('--fila-max', type=int, default=config.STREAM_FILA_MAX)
+    parser.add_argument('--filho', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        executar_produtores('127.0.0.1', args.filho, args.teste, args.maquinas, args.eventos,
+                            args.conexoes, args.taxa)
+        return
+
+    resumo = asyncio.run(executar_carga(args))
+    print(json.dumps(resumo, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Comparação dos Modos de Busca de Hiperparâmetros
+Mede tempo de parede, número de ajustes e melhor f1_weighted da grade exaustiva, das divisões
+sucessivas e da grade com warm start (conferindo que esta reproduz as pontuações da grade exaustiva)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import f1_score
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config_file import obter_configuracao
+from busca_hiperparametros import MODOS_BUSCA, contar_ajustes, executar_busca
+from python_script_main import ManutencaoPreditiva
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar grade exaustiva e divisões sucessivas")
+    parser.add_argument('--ambiente', default='desenvolvimento', choices=['desenvolvimento', 'producao'],
+                        help="Ambiente cuja PARAM_GRID será usada")
+    parser.add_argument('--modos', nargs='+', default=list(MODOS_BUSCA), choices=MODOS_BUSCA)
+    parser.add_argument('--fracao', type=float, default=1.0,
+                        help="Fração dos dados de treino usada (para execuções rápidas)")
+    args = parser.parse_args()
+
+    config = obter_configuracao(args.ambiente)
+    sistema = ManutencaoPreditiva(config)
+    sistema.carregar_dados(config.CAMINHO_DADOS_TREINO)
+    sistema.limpar_dados()
+    if args.fracao < 1.0:
+        sistema.df_train = sistema.df_train.sample(frac=args.fracao, random_state=config.RANDOM_STATE)
+    X_train, X_val, y_train, y_val, preprocessor = sistema.preparar_dados()
+
+    resultados = []
+    buscas = {}
+    for modo in args.modos:
+        print(f"\n=== Modo '{modo}' ===")
+        pipeline = sistema._criar_pipeline(preprocessor)
+        busca, tempo = executar_busca(pipeline, X_train, y_train, config.PARAM_GRID, config, modo=modo)
+        buscas[modo] = busca
+        f1_validacao = f1_score(y_val, busca.best_estimator_.predict(X_val), average='weighted', zero_division=0)
+        resultados.append((modo, tempo, contar_ajustes(busca), busca.best_score_, f1_validacao, busca.best_params_))
+
+    print(f"\n{'modo':<10} {'tempo (s)':>10} {'ajustes':>8} {'f1 CV':>8} {'f1 val.':>8}")
+    for modo, tempo, ajustes, f1_cv, f1_val, _ in resultados:
+        print(f"{modo:<10} {tempo:>10.1f} {ajustes:>8} {f1_cv:>8.4f} {f1_val:>8.4f}")
+
+    for modo, *_, parametros in resultados:
+        print(f"\nMelhores parâmetros ({modo}): {parametros}")
+
+    if 'grid' in buscas and 'warm_start' in buscas:
+        grade = buscas['grid'].cv_results_
+        warm = buscas['warm_start'].cv_results_
+        assert grade['params'] == warm['params']
+        diferenca = np.abs(grade['mean_test_score'] - warm['mean_test_score']).max()
+        print(f"\nWarm start vs grade exaustiva: diferença máxima de f1 por candidato = {diferenca:.2e}")
+
+
+if __name__ == "__main__":
+    main()
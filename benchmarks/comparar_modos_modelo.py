@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Comparação dos Modos de Modelo
+Floresta por alvo (MultiOutputClassifier) vs floresta multi-saída nativa: tempo de ajuste,
+tamanho do pickle, latência de predição e AUC por alvo
+"""
+
+import argparse
+import pickle
+import sys
+import time
+from pathlib import Path
+
+from sklearn.metrics import roc_auc_score
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config_file import obter_configuracao
+from busca_hiperparametros import adaptar_nome_parametro, prefixo_parametros
+from inferencia import probabilidades_positivas
+from python_script_main import ManutencaoPreditiva
+
+MODOS_MODELO = ('multioutput', 'nativo')
+
+
+def _latencia(modelo, X, repeticoes=5):
+    """Menor tempo (ms) de predict_proba para o lote X"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        modelo.predict_proba(X)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar floresta por alvo e floresta multi-saída")
+    parser.add_argument('--n-arvores', type=int, default=100)
+    parser.add_argument('--max-depth', type=int, default=20)
+    parser.add_argument('--min-samples-leaf', type=int, default=5)
+    args = parser.parse_args()
+
+    config = obter_configuracao()
+    sistema = ManutencaoPreditiva(config)
+    sistema.carregar_dados(config.CAMINHO_DADOS_TREINO)
+    sistema.limpar_dados()
+    X_train, X_val, y_train, y_val, preprocessor = sistema.preparar_dados()
+
+    parametros = {
+        'classifier__estimator__n_estimators': args.n_arvores,
+        'classifier__estimator__max_depth': args.max_depth,
+        'classifier__estimator__min_samples_leaf': args.min_samples_leaf,
+    }
+
+    linhas = []
+    for modo in MODOS_MODELO:
+        pipeline = sistema._criar_pipeline(preprocessor, modo)
+        prefixo = prefixo_parametros(pipeline)
+        pipeline.set_params(**{adaptar_nome_parametro(nome, prefixo): valor
+                               for nome, valor in parametros.items()})
+
+        inicio = time.perf_counter()
+        pipeline.fit(X_train, y_train)
+        tempo_ajuste = time.perf_counter() - inicio
+
+        tamanho_mb = len(pickle.dumps(pipeline, protocol=pickle.HIGHEST_PROTOCOL)) / 1e6
+        probabilidades = probabilidades_positivas(pipeline.predict_proba(X_val))
+        aucs = [roc_auc_score(y_val[col], probabilidades[:, i]) for i, col in enumerate(sistema.target_cols)]
+
+        linhas.append((modo, tempo_ajuste, tamanho_mb,
+                       _latencia(pipeline, X_val.iloc[:1]), _latencia(pipeline, X_val), aucs))
+
+    print(f"\n{'modo':<12} {'ajuste (s)':>10} {'pickle (MB)':>12} {'1 linha (ms)':>13} "
+          f"{f'{len(X_val)} linhas (ms)':>18}")
+    for modo, tempo, tamanho, lat_1, lat_val, _ in linhas:
+        print(f"{modo:<12} {tempo:>10.2f} {tamanho:>12.1f} {lat_1:>13.2f} {lat_val:>18.1f}")
+
+    print(f"\n{'AUC por alvo':<34}" + ''.join(f"{modo:>13}" for modo in MODOS_MODELO))
+    for i, col in enumerate(sistema.target_cols):
+        print(f"{col:<34}" + ''.join(f"{linha[5][i]:>13.4f}" for linha in linhas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Escalabilidade por Núcleos
+Mede o tempo da busca de hiperparâmetros com orçamentos de 1, 2, 4, 8 e todos os núcleos
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config_file import obter_configuracao
+from busca_hiperparametros import contar_tarefas_externas, executar_busca
+from orcamento_recursos import aplicar_layout, nucleos_disponiveis
+from python_script_main import ManutencaoPreditiva
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de ajuste por orçamento de núcleos")
+    parser.add_argument('--nucleos', type=int, nargs='+', default=[1, 2, 4, 8, -1],
+                        help="Orçamentos a medir (-1 = todos os núcleos)")
+    parser.add_argument('--modo', default='grid', choices=['grid', 'halving', 'warm_start'])
+    parser.add_argument('--fracao', type=float, default=0.25,
+                        help="Fração dos dados de treino usada")
+    args = parser.parse_args()
+
+    config = obter_configuracao()
+    sistema = ManutencaoPreditiva(config)
+    sistema.carregar_dados(config.CAMINHO_DADOS_TREINO)
+    sistema.limpar_dados()
+    if args.fracao < 1.0:
+        sistema.df_train = sistema.df_train.sample(frac=args.fracao, random_state=config.RANDOM_STATE)
+    X_train, _, y_train, _, preprocessor = sistema.preparar_dados()
+
+    disponiveis = nucleos_disponiveis()
+    orcamentos = sorted({disponiveis if n == -1 else n for n in args.nucleos if n == -1 or n <= disponiveis})
+
+    resultados = []
+    for nucleos in orcamentos:
+        config.N_JOBS = nucleos
+        pipeline = sistema._criar_pipeline(preprocessor)
+        layout = sistema._planejar_paralelismo(
+            X_train, pipeline, contar_tarefas_externas(config.PARAM_GRID, config, args.modo, pipeline)
+        )
+
+        inicio = time.perf_counter()
+        with aplicar_layout(layout):
+            executar_busca(pipeline, X_train, y_train, config.PARAM_GRID, config,
+                           modo=args.modo, n_jobs=layout.externo)
+        resultados.append((nucleos, layout, time.perf_counter() - inicio))
+
+    base = resultados[0][2]
+    print(f"\n{'núcleos':>8} {'externo':>8} {'interno':>8} {'blas':>5} {'tempo (s)':>10} {'speedup':>8}")
+    for nucleos, layout, tempo in resultados:
+        print(f"{nucleos:>8} {layout.externo:>8} {layout.interno:>8} {layout.threads_blas:>5} "
+              f"{tempo:>10.1f} {base / tempo:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
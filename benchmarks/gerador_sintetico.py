@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Gerador de Dados Sintéticos
+Produz CSVs de treino/teste com o mesmo esquema dos dados reais: proporção de tipos L/M/H,
+distribuições dos sensores (quantis empíricos), taxas de valores ausentes, taxas de falha por
+alvo e as mesmas codificações "bagunçadas" dos rótulos ('sim', 'Não', True, 'N', '-', ...)
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config_file import obter_configuracao
+from normalizacao_rotulos import MAPA_ROTULOS
+
+# Pontos de quantil usados para amostrar cada sensor pela inversa da distribuição empírica
+N_QUANTIS = 201
+
+# Linhas geradas por bloco ao escrever o CSV
+TAMANHO_BLOCO = 500_000
+
+
+def criar_perfil(caminho_referencia: str) -> dict:
+    """Extrair do CSV real tudo o que o gerador precisa reproduzir"""
+    config = obter_configuracao()
+    df = pd.read_csv(caminho_referencia)
+    grade = np.linspace(0, 1, N_QUANTIS)
+
+    tipos = df['tipo'].value_counts(normalize=True)
+    sensores = {}
+    for col in config.FEATURES_NUMERICAS + ['umidade_relativa']:
+        valores = df[col].dropna()
+        sensores[col] = {
+            'quantis': np.quantile(valores, grade).tolist(),
+            'taxa_ausentes': float(df[col].isna().mean()),
+        }
+
+    # Temperaturas do ar e de processo são geradas juntas por uma cópula gaussiana (mantém as
+    # marginais e a correlação); correlação normal a partir da correlação de Spearman
+    spearman = df[['temperatura_ar', 'temperatura_processo']].corr(method='spearman').iloc[0, 1]
+    correlacao_temperaturas = float(2 * np.sin(np.pi * spearman / 6))
+
+    rotulos = {}
+    for col in ['falha_maquina'] + config.COLUNAS_TARGET:
+        tokens = df[col].value_counts()
+        positivos = {str(t): int(n) for t, n in tokens.items() if MAPA_ROTULOS.get(t) == 1}
+        negativos = {str(t): int(n) for t, n in tokens.items() if MAPA_ROTULOS.get(t) != 1}
+        rotulos[col] = {
+            'taxa_positiva': sum(positivos.values()) / len(df),
+            'tokens_positivos': positivos,
+            'tokens_negativos': negativos,
+        }
+
+    return {
+        'linhas_referencia': len(df),
+        'tipos': {str(t): float(p) for t, p in tipos.items()},
+        'sensores': sensores,
+        'correlacao_temperaturas': correlacao_temperaturas,
+        'rotulos': rotulos,
+    }
+
+
+def _amostrar_quantis(quantis, n: int, rng, uniformes: np.ndarray = None) -> np.ndarray:
+    """Amostrar pela inversa da CDF empírica (interpolação linear entre os quantis)"""
+    uniformes = rng.random(n) if uniformes is None else uniformes
+    return np.interp(uniformes, np.linspace(0, 1, len(quantis)), quantis)
+
+
+def _zscore(valores: np.ndarray) -> np.ndarray:
+    desvio = np.nanstd(valores)
+    z = (valores - np.nanmean(valores)) / (desvio if desvio else 1.0)
+    return np.nan_to_num(z)
+
+
+def _sortear_tokens(tokens: dict, n: int, rng) -> np.ndarray:
+    """Sortear tokens de rótulo com as frequências observadas"""
+    nomes = list(tokens)
+    pesos = np.array([tokens[t] for t in nomes], dtype=np.float64)
+    return np.asarray(nomes, dtype=object)[rng.choice(len(nomes), size=n, p=pesos / pesos.sum())]
+
+
+def gerar_bloco(perfil: dict, n: int, rng, id_inicial: int = 0, com_rotulos: bool = True) -> pd.DataFrame:
+    """Gerar n linhas sintéticas"""
+    config = obter_configuracao()
+    tipos = list(perfil['tipos'])
+    tipo = np.asarray(tipos, dtype=object)[rng.choice(len(tipos), size=n, p=list(perfil['tipos'].values()))]
+
+    df = pd.DataFrame({
+        'id': np.arange(id_inicial, id_inicial + n),
+        'id_produto': tipo + rng.integers(10000, 100000, size=n).astype(str).astype(object),
+        'tipo': tipo,
+    })
+
+    sensores = perfil['sensores']
+    rho = perfil['correlacao_temperaturas']
+    z_ar = rng.standard_normal(n)
+    z_processo = rho * z_ar + np.sqrt(1 - rho ** 2) * rng.standard_normal(n)
+    uniformes = {'temperatura_ar': ndtr(z_ar), 'temperatura_processo': ndtr(z_processo)}
+
+    for col in ['temperatura_ar', 'temperatura_processo', 'umidade_relativa',
+                'velocidade_rotacional', 'torque', 'desgaste_da_ferramenta']:
+        df[col] = np.round(_amostrar_quantis(sensores[col]['quantis'], n, rng, uniformes.get(col)), 1)
+
+    if com_rotulos:
+        # Escores de risco ligados aos sensores, para que os rótulos sejam aprendíveis
+        desgaste, torque = _zscore(df['desgaste_da_ferramenta'].to_numpy()), _zscore(df['torque'].to_numpy())
+        rotacao = _zscore(df['velocidade_rotacional'].to_numpy())
+        delta_temp = _zscore((df['temperatura_processo'] - df['temperatura_ar']).to_numpy())
+        escores = {
+            'FDF (Falha Desgaste Ferramenta)': desgaste,
+            'FDC (Falha Dissipacao Calor)': -delta_temp - rotacao,
+            'FP (Falha Potencia)': np.abs(_zscore(df['torque'].to_numpy() * df['velocidade_rotacional'].to_numpy())),
+            'FTE (Falha Tensao Excessiva)': desgaste + torque,
+            'FA (Falha Aleatoria)': np.zeros(n),
+        }
+
+        positivos = {}
+        for col in config.COLUNAS_TARGET:
+            escore = escores[col] + rng.normal(0, 0.5, size=n)
+            taxa = perfil['rotulos'][col]['taxa_positiva']
+            positivos[col] = escore >= np.quantile(escore, 1 - taxa) if taxa > 0 else np.zeros(n, dtype=bool)
+        positivos['falha_maquina'] = np.logical_or.reduce([positivos[c] for c in config.COLUNAS_TARGET])
+
+        for col in ['falha_maquina'] + config.COLUNAS_TARGET:
+            info = perfil['rotulos'][col]
+            tokens = _sortear_tokens(info['tokens_negativos'], n, rng)
+            if info['tokens_positivos']:
+                tokens[positivos[col]] = _sortear_tokens(info['tokens_positivos'], int(positivos[col].sum()), rng)
+            df[col] = tokens
+
+    # Valores ausentes com as taxas observadas (depois dos escores, que usam os valores completos)
+    for col, info in sensores.items():
+        ausentes = rng.random(n) < info['taxa_ausentes']
+        df.loc[ausentes, col] = np.nan
+
+    return df
+
+
+def escrever_csv(perfil: dict, caminho: str, n_linhas: int, semente: int = 42, com_rotulos: bool = True,
+                 tamanho_bloco: int = TAMANHO_BLOCO):
+    """Escrever um CSV sintético em blocos (memória limitada ao tamanho do bloco)"""
+    rng = np.random.default_rng(semente)
+    Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        for inicio in range(0, n_linhas, tamanho_bloco):
+            bloco = gerar_bloco(perfil, min(tamanho_bloco, n_linhas - inicio), rng, inicio, com_rotulos)
+            bloco.to_csv(arquivo, header=inicio == 0, index=False)
+
+
+def gerar_conjunto(perfil: dict, diretorio: str, escala: int, linhas_teste: int, semente: int = 42) -> dict:
+    """Gerar (ou reaproveitar) os CSVs de treino e teste de uma escala"""
+    caminhos = {
+        'treino': str(Path(diretorio) / f"sintetico_treino_x{escala}.csv"),
+        'teste': str(Path(diretorio) / f"sintetico_teste_x{escala}.csv"),
+    }
+    if not Path(caminhos['treino']).exists():
+        escrever_csv(perfil, caminhos['treino'], perfil['linhas_referencia'] * escala, semente)
+    if not Path(caminhos['teste']).exists():
+        escrever_csv(perfil, caminhos['teste'], linhas_teste * escala, semente + 1, com_rotulos=False)
+    return caminhos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerar dados sintéticos no esquema do bootcamp")
+    parser.add_argument('--referencia', default='data/bootcamp_train.csv')
+    parser.add_argument('--referencia-teste', default='data/bootcamp_test.csv')
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--dir', default='data/sintetico')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--salvar-perfil', default=None, help="Gravar o perfil extraído em JSON")
+    args = parser.parse_args()
+
+    perfil = criar_perfil(args.referencia)
+    if args.salvar_perfil:
+        with open(args.salvar_perfil, 'w', encoding='utf-8') as f:
+            json.dump(perfil, f, indent=2, ensure_ascii=False)
+
+    linhas_teste = len(pd.read_csv(args.referencia_teste, usecols=['id']))
+    for escala in args.escalas:
+        caminhos = gerar_conjunto(perfil, args.dir, escala, linhas_teste, args.semente)
+        print(f"x{escala}: {caminhos['treino']} ({Path(caminhos['treino']).stat().st_size / 1e6:.0f} MB), "
+              f"{caminhos['teste']}")
+
+
+if __name__ == "__main__":
+    main()
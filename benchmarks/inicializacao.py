@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Inicialização
+Tempo de processo (importações + carga do modelo + pontuação) do ponto de entrada de predição
+rápida, comparado ao caminho de main() (python_script_main + ManutencaoPreditiva)
+"""
+
+import argparse
+import itertools
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Só a inicialização de main(): importar o módulo de treinamento e criar o sistema
+CODIGO_MAIN_INICIO = (
+    "from python_script_main import ManutencaoPreditiva; ManutencaoPreditiva()"
+)
+
+# Pontuação pelo caminho de main(): sistema completo + pipeline salvo + gerar_predicoes
+# (a submissão vai para {saida}, fora de outputs/)
+CODIGO_MAIN_PONTUACAO = (
+    "import joblib; from python_script_main import ManutencaoPreditiva; "
+    "s = ManutencaoPreditiva(); s.best_model = joblib.load(s.config.CAMINHO_MODELO); "
+    "s.config.CAMINHO_SUBMISSION = {saida!r}; s.gerar_predicoes({entrada!r})"
+)
+
+
+def _medir(comando, repeticoes):
+    """Tempos de parede (s) de execuções completas do comando em processos novos"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run(comando, cwd=RAIZ, check=True, stdout=subprocess.DEVNULL)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar a inicialização da predição rápida com main()")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--linhas-amostra', type=int, default=100,
+                        help="Linhas do arquivo pequeno (lote em que o motor compilado é escolhido)")
+    parser.add_argument('--saida', default=None,
+                        help="Arquivo de saída das pontuações (padrão: diretório temporário, não sobrescreve outputs/)")
+    args = parser.parse_args()
+
+    # Saídas e a amostra do arquivo de teste ficam num diretório temporário
+    temporario = tempfile.mkdtemp(prefix='inicializacao-')
+    saida = args.saida or os.path.join(temporario, 'submission.csv')
+    completo = str(RAIZ / 'data' / 'bootcamp_test.csv')
+    amostra = os.path.join(temporario, 'amostra.csv')
+    with open(completo, encoding='utf-8') as origem, open(amostra, 'w', encoding='utf-8') as destino:
+        destino.writelines(itertools.islice(origem, args.linhas_amostra + 1))
+
+    python = sys.executable
+    rapida = [python, 'predicao_rapida.py', '--saida', saida]
+    cenarios = [("main(): importação + __init__", [python, '-c', CODIGO_MAIN_INICIO])]
+    for rotulo, entrada in (("completo", completo), (f"{args.linhas_amostra} linhas", amostra)):
+        cenarios += [
+            (f"main(): pontuação, {rotulo}",
+             [python, '-c', CODIGO_MAIN_PONTUACAO.format(saida=saida, entrada=entrada)]),
+            (f"rápida sklearn, {rotulo}", rapida + [entrada, '--motor', 'sklearn']),
+            (f"rápida compilado, {rotulo}", rapida + [entrada, '--motor', 'compilado']),
+            (f"rápida auto, {rotulo}", rapida + [entrada, '--motor', 'auto']),
+        ]
+
+    print(f"\n{'cenário':<36} {'mediana (s)':>12} {'mínimo (s)':>11}")
+    for nome, comando in cenarios:
+        tempos = _medir(comando, args.repeticoes)
+        print(f"{nome:<36} {statistics.median(tempos):>12.2f} {min(tempos):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
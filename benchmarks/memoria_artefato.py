@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de Memória do Artefato de Modelo
+Sobe N processos worker que carregam o modelo (pickle do pipeline vs artefato mapeado em memória)
+e pontuam um lote; mede o tempo de carga e a RSS/PSS somada dos workers vivos ao mesmo tempo
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+FORMATOS = ('pickle', 'artefato')
+
+
+def _memoria_processo_kb(pid) -> dict:
+    """Rss e Pss (kB) de um processo, via /proc/<pid>/smaps_rollup"""
+    memoria = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for linha in f:
+            campo, _, valor = linha.partition(':')
+            if campo in ('Rss', 'Pss'):
+                memoria[campo] = int(valor.split()[0])
+    return memoria
+
+
+def executar_worker(formato: str, n_linhas: int):
+    """Processo worker: carregar o modelo, pontuar um lote, reportar e esperar o sinal para sair"""
+    from config_file import obter_configuracao
+    from predicao_rapida import carregar_medianas, ler_entrada_numpy
+
+    config = obter_configuracao()
+    medianas = carregar_medianas(config.CAMINHO_MEDIANAS)
+
+    inicio = time.perf_counter()
+    if formato == 'pickle':
+        import joblib
+        modelo = joblib.load(config.CAMINHO_MODELO)
+    else:
+        from artefato_modelo import carregar_artefato
+        modelo = carregar_artefato(config.DIR_ARTEFATO_MODELO, config.FEATURES, config.COLUNAS_TARGET)
+    tempo_carga = time.perf_counter() - inicio
+
+    _, colunas = ler_entrada_numpy(config.CAMINHO_DADOS_TESTE, 'id', config.FEATURES_NUMERICAS,
+                                   config.FEATURES_CATEGORICAS, medianas)
+    colunas = {col: valores[:n_linhas] for col, valores in colunas.items()}
+    if formato == 'pickle':
+        import pandas as pd
+        modelo.predict_proba(pd.DataFrame(colunas)[config.FEATURES])
+    else:
+        modelo.prever_proba(colunas)
+
+    print(json.dumps({'tempo_carga_s': tempo_carga}), flush=True)
+    sys.stdin.readline()
+
+
+def medir(formato: str, n_workers: int, n_linhas: int) -> dict:
+    """Subir n_workers, esperar todos carregarem e medir a memória enquanto estão vivos"""
+    comando = [sys.executable, __file__, '--worker', formato, '--linhas', str(n_linhas)]
+    workers = [subprocess.Popen(comando, cwd=RAIZ, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+               for _ in range(n_workers)]
+    try:
+        tempos = [json.loads(w.stdout.readline())['tempo_carga_s'] for w in workers]
+        memorias = [_memoria_processo_kb(w.pid) for w in workers]
+    finally:
+        for w in workers:
+            w.stdin.close()
+            w.wait()
+
+    return {
+        'formato': formato,
+        'workers': n_workers,
+        'tempo_carga_medio_s': sum(tempos) / len(tempos),
+        'rss_total_mb': sum(m['Rss'] for m in memorias) / 1024,
+        'pss_total_mb': sum(m['Pss'] for m in memorias) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS/PSS e tempo de carga: pickle vs artefato mapeado")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--linhas', type=int, default=1000, help="Linhas pontuadas por worker")
+    parser.add_argument('--worker', choices=FORMATOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        executar_worker(args.worker, args.linhas)
+        return
+
+    print(f"\n{'formato':<10} {'workers':>8} {'carga (s)':>10} {'RSS total (MB)':>15} "
+          f"{'PSS total (MB)':>15} {'PSS/worker':>11}")
+    for formato in FORMATOS:
+        for n_workers in args.workers:
+            r = medir(formato, n_workers, args.linhas)
+            print(f"{formato:<10} {n_workers:>8} {r['tempo_carga_medio_s']:>10.3f} {r['rss_total_mb']:>15.1f} "
+                  f"{r['pss_total_mb']:>15.1f} {r['pss_total_mb'] / n_workers:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Modo Compacto
+Executa carregar/limpar/preparar/treinar/prever com DADOS_COMPACTOS desligado e ligado (um processo
+por modo) e compara a memória de cada DataFrame, o pico de RSS e as probabilidades do modelo
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+def executar_modo(compacto: bool, caminho_treino: str, caminho_teste: str, saida: str, arvores: int):
+    """Processo filho: pipeline até a predição, medindo a memória de cada DataFrame"""
+    from sklearn.metrics import roc_auc_score
+
+    from compactacao_dados import memoria_mb
+    from config_file import obter_configuracao
+    from inferencia import probabilidades_positivas
+    from instrumentacao import pico_memoria_kb
+    from python_script_main import ManutencaoPreditiva
+
+    config = obter_configuracao()
+    config.DADOS_COMPACTOS = compacto
+    config.USAR_CACHE_DADOS = False
+    config.MODO_VISUALIZACAO = 'off'
+    config.EXPORTAR_MODELO_COMPILADO = False
+    config.CAMINHO_SUBMISSION = str(Path(saida).with_suffix('.csv'))
+    sistema = ManutencaoPreditiva(config)
+
+    memoria = {}
+    sistema.carregar_dados(caminho_treino, caminho_teste)
+    memoria['df_train (bruto)'] = memoria_mb(sistema.df_train)
+    memoria['df_test'] = memoria_mb(sistema.df_test)
+
+    sistema.limpar_dados()
+    memoria['df_train (limpo)'] = memoria_mb(sistema.df_train)
+
+    X_train, X_val, y_train, y_val, preprocessor = sistema.preparar_dados()
+    memoria['X_train + y_train'] = memoria_mb(X_train) + memoria_mb(y_train)
+
+    sistema.treinar_modelo(X_train, y_train, preprocessor, otimizar=False,
+                           parametros={'classifier__estimator__n_estimators': arvores})
+    proba_val = probabilidades_positivas(sistema.best_model.predict_proba(X_val))
+    submissao = sistema.gerar_predicoes(caminho_teste)
+
+    np.savez(saida, validacao=proba_val, teste=submissao[sistema.target_cols].to_numpy())
+    print(json.dumps({
+        'memoria_mb': memoria,
+        'pico_rss_mb': pico_memoria_kb() / 1024,
+        'auc_validacao': roc_auc_score(y_val, proba_val, average='weighted'),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória e paridade do modelo com DADOS_COMPACTOS")
+    parser.add_argument('--treino', default='data/bootcamp_train.csv')
+    parser.add_argument('--teste', default='data/bootcamp_test.csv')
+    parser.add_argument('--arvores', type=int, default=100)
+    parser.add_argument('--filho', nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        compacto, caminho_treino, caminho_teste, saida, arvores = args.filho
+        executar_modo(compacto == '1', caminho_treino, caminho_teste, saida, int(arvores))
+        return
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for compacto in (False, True):
+            saida = str(Path(tmp) / f"probabilidades_{int(compacto)}.npz")
+            comando = [sys.executable, str(Path(__file__).resolve()), '--filho', str(int(compacto)),
+                       str(Path(args.treino).resolve()), str(Path(args.teste).resolve()), saida, str(args.arvores)]
+            texto = subprocess.run(comando, cwd=tmp, env=dict(os.environ, PYTHONPATH=str(RAIZ)),
+                                   check=True, capture_output=True, text=True).stdout
+            resultados[compacto] = json.loads(texto.strip().splitlines()[-1])
+            with np.load(saida) as dados:
+                resultados[compacto]['probabilidades'] = {k: dados[k] for k in dados.files}
+
+    normal, compacto = resultados[False], resultados[True]
+    print(f"\n{'DataFrame':<22} {'normal (MB)':>12} {'compacto (MB)':>14} {'economia':>9}")
+    for nome, antes in normal['memoria_mb'].items():
+        depois = compacto['memoria_mb'][nome]
+        print(f"{nome:<22} {antes:>12.2f} {depois:>14.2f} {1 - depois / antes:>9.0%}")
+    print(f"{'pico de RSS':<22} {normal['pico_rss_mb']:>12.0f} {compacto['pico_rss_mb']:>14.0f} "
+          f"{1 - compacto['pico_rss_mb'] / normal['pico_rss_mb']:>9.0%}")
+
+    print("\nParidade do modelo:")
+    for conjunto in ('validacao', 'teste'):
+        p_normal = normal['probabilidades'][conjunto]
+        p_compacto = compacto['probabilidades'][conjunto]
+        iguais = np.mean((p_normal > 0.5) == (p_compacto > 0.5))
+        situacao = "idênticas" if np.array_equal(p_normal, p_compacto) else "DIFERENTES"
+        print(f"  {conjunto}: probabilidades {situacao} (diferença máxima "
+              f"{np.abs(p_normal - p_compacto).max():.2e}), mesma classe prevista em {iguais:.4%} das células")
+    print(f"  AUC de validação: normal {normal['auc_validacao']:.4f}, compacto {compacto['auc_validacao']:.4f}")
+
+
+if __name__ == "__main__":
+    main()
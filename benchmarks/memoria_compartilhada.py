@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos Dados Compartilhados na Busca Warm Start
+Executa a busca warm_start com as matrizes dos folds copiadas para cada tarefa e publicadas em
+memória compartilhada (um processo por modo) e compara bytes enviados, RSS dos workers, tempo e scores
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+def executar_modo(compartilhar: bool, caminho_treino: str, workers: int, arvores: list):
+    """Processo filho: busca warm_start com os dados de treino e o modo escolhido"""
+    from busca_hiperparametros import executar_busca
+    from config_file import obter_configuracao
+    from instrumentacao import pico_memoria_kb
+    from python_script_main import ManutencaoPreditiva
+
+    config = obter_configuracao()
+    config.USAR_CACHE_DADOS = False
+    config.MODO_VISUALIZACAO = 'off'
+    config.DADOS_COMPARTILHADOS = compartilhar
+    sistema = ManutencaoPreditiva(config)
+    sistema.carregar_dados(caminho_treino)
+    sistema.limpar_dados()
+    X_train, _, y_train, _, preprocessor = sistema.preparar_dados()
+
+    pipeline = sistema._criar_pipeline(preprocessor).set_params(classifier__n_jobs=1)
+    grade = {'classifier__estimator__n_estimators': arvores,
+             'classifier__estimator__max_depth': [10, 20]}
+    busca, tempo = executar_busca(pipeline, X_train, y_train, grade, config, modo='warm_start', n_jobs=workers)
+
+    print(json.dumps({
+        'tempo_s': tempo,
+        'bytes_enviados': busca.bytes_enviados_,
+        'bytes_publicados': busca.bytes_publicados_,
+        'memoria_workers': busca.memoria_workers_,
+        'pico_rss_pai_mb': pico_memoria_kb() / 1024,
+        'scores': busca.cv_results_['mean_test_score'].tolist(),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca warm_start com dados copiados x memória compartilhada")
+    parser.add_argument('--treino', default='data/bootcamp_train.csv')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--arvores', type=int, nargs='+', default=[20, 40])
+    parser.add_argument('--filho', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        compartilhar, caminho_treino = args.filho
+        executar_modo(compartilhar == '1', caminho_treino, args.workers, args.arvores)
+        return
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for compartilhar in (False, True):
+            comando = [sys.executable, str(Path(__file__).resolve()), '--filho', str(int(compartilhar)),
+                       str(Path(args.treino).resolve()), '--workers', str(args.workers),
+                       '--arvores', *map(str, args.arvores)]
+            texto = subprocess.run(comando, cwd=tmp, env=dict(os.environ, PYTHONPATH=str(RAIZ)),
+                                   check=True, capture_output=True, text=True).stdout
+            resultados[compartilhar] = json.loads(texto.strip().splitlines()[-1])
+
+    print(f"\n{'modo':<14} {'tempo (s)':>10} {'enviado (MB)':>13} {'publicado (MB)':>15} {'RSS workers (MB)':>24}")
+    for compartilhar, nome in ((False, 'copiado'), (True, 'compartilhado')):
+        r = resultados[compartilhar]
+        rss = ', '.join(f"{m['antes_mb']:.0f}->{m['depois_mb']:.0f}" for m in r['memoria_workers'].values())
+        print(f"{nome:<14} {r['tempo_s']:>10.2f} {r['bytes_enviados'] / 2 ** 20:>13.3f} "
+              f"{r['bytes_publicados'] / 2 ** 20:>15.3f} {rss:>24}")
+
+    iguais = np.array_equal(resultados[False]['scores'], resultados[True]['scores'])
+    print(f"\nScores dos candidatos idênticos nos dois modos: {'sim' if iguais else 'não'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark do Registro de Modelos por Segmento
+Treina um modelo pequeno por segmento (tipo x site sintético, centenas de segmentos), grava o
+registro e pontua o arquivo de teste em blocos com diferentes limites do cache LRU, reportando
+acertos, carregamentos, despejos, tempo de carga, linhas/s e RSS
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro de modelos por segmento com cache LRU")
+    parser.add_argument('--treino', default='data/bootcamp_train.csv')
+    parser.add_argument('--teste', default='data/bootcamp_test.csv')
+    parser.add_argument('--sites', type=int, default=100, help="Sites sintéticos (segmentos = tipos x sites)")
+    parser.add_argument('--arvores', type=int, default=10)
+    parser.add_argument('--bloco', type=int, default=1000)
+    parser.add_argument('--limites-mb', type=float, nargs='+', default=[0.1, 0.25, 0.5, 2])
+    args = parser.parse_args()
+
+    from sklearn.base import clone
+
+    from config_file import obter_configuracao
+    from inferencia_compilada import compilar_pipeline
+    from instrumentacao import memoria_atual_kb
+    from python_script_main import ManutencaoPreditiva
+    from registro_modelos import RegistroModelos, agrupar_por_chave, chaves_segmento, salvar_registro, salvar_segmento
+
+    config = obter_configuracao()
+    config.MODO_VISUALIZACAO = 'off'
+    config.USAR_CACHE_DADOS = False
+    sistema = ManutencaoPreditiva(config)
+    sistema.carregar_dados(args.treino)
+    sistema.limpar_dados()
+    X_train, _, y_train, _, preprocessor = sistema.preparar_dados()
+
+    rng = np.random.default_rng(0)
+    colunas = ['tipo', 'site']
+    X_train = X_train.assign(site=rng.integers(0, args.sites, len(X_train)).astype(str))
+    base = sistema._criar_pipeline(preprocessor).set_params(classifier__estimator__n_estimators=args.arvores,
+                                                            classifier__n_jobs=1)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        inicio = time.perf_counter()
+        segmentos = {}
+        for chave, indices in agrupar_por_chave(chaves_segmento(X_train, colunas)):
+            modelo = clone(base).fit(X_train.iloc[indices], y_train.iloc[indices])
+            segmentos[chave] = salvar_segmento(diretorio, colunas, chave, compilar_pipeline(modelo),
+                                               config.FEATURES, config.COLUNAS_TARGET)
+        salvar_registro(diretorio, colunas, segmentos)
+        tempo_treino = time.perf_counter() - inicio
+        total_mb = sum(info['bytes'] for info in segmentos.values()) / 2 ** 20
+
+        teste = pd.read_csv(args.teste, usecols=config.FEATURES)
+        teste = teste.fillna(teste.median(numeric_only=True)).dropna()
+        teste['site'] = rng.integers(0, args.sites, len(teste)).astype(str)
+
+        resultados = {}
+        for limite in args.limites_mb:
+            registro = RegistroModelos(diretorio, config.FEATURES, config.COLUNAS_TARGET, max_mb=limite,
+                                       verificar_checksum=False)
+            inicio = time.perf_counter()
+            for bloco in range(0, len(teste), args.bloco):
+                registro.prever_proba(teste.iloc[bloco:bloco + args.bloco])
+            duracao = time.perf_counter() - inicio
+            resultados[limite] = dict(registro.cache.estatisticas(), linhas_por_s=len(teste) / duracao,
+                                      rss_mb=memoria_atual_kb() / 1024)
+
+    print(json.dumps({'segmentos': len(segmentos), 'registro_mb': round(total_mb, 2),
+                      'tempo_treino_s': round(tempo_treino, 1), 'linhas_teste': len(teste)}, ensure_ascii=False))
+    print(f"\n{'limite (MB)':>11} {'modelos':>8} {'acertos':>8} {'cargas':>7} {'despejos':>9} "
+          f"{'carga (s)':>10} {'linhas/s':>9} {'RSS (MB)':>9}")
+    for limite, r in resultados.items():
+        print(f"{limite:>11g} {r['modelos_carregados']:>8} {r['acertos']:>8} {r['carregamentos']:>7} "
+              f"{r['despejos']:>9} {r['tempo_carga_s']:>10.3f} {r['linhas_por_s']:>9.0f} {r['rss_mb']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
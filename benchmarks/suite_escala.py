@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Suíte de Benchmarks de Escala
+Executa carregar_dados, limpar_dados, preparar_dados, treinar_modelo e gerar_predicoes sobre
+dados sintéticos em 1x/10x/100x/1000x, mede tempo, vazão e pico de memória de cada etapa,
+grava o resultado em JSON e aponta regressões em relação a uma linha de base
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+ESTAGIOS = ('carregar_dados', 'limpar_dados', 'preparar_dados', 'treinar_modelo', 'gerar_predicoes')
+
+
+def _reiniciar_pico_memoria() -> bool:
+    """Zerar o pico de RSS (VmHWM) do processo; False se o kernel não permitir"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _memoria_kb(campo: str) -> int:
+    """Valor de um campo de /proc/self/status (kB)"""
+    with open('/proc/self/status') as f:
+        for linha in f:
+            if linha.startswith(campo + ':'):
+                return int(linha.split()[1])
+    return 0
+
+
+def executar_escala(caminho_treino: str, caminho_teste: str, arvores: int, profundidade: int) -> dict:
+    """Processo filho: rodar as etapas em sequência, medindo cada uma isoladamente"""
+    from config_file import obter_configuracao
+    from python_script_main import ManutencaoPreditiva
+
+    config = obter_configuracao()
+    config.USAR_CACHE_DADOS = False
+    config.MODO_VISUALIZACAO = 'off'
+    config.EXPORTAR_MODELO_COMPILADO = False
+    config.VERSIONAR_DADOS = False
+    sistema = ManutencaoPreditiva(config)
+
+    parametros = {
+        'classifier__estimator__n_estimators': arvores,
+        'classifier__estimator__max_depth': profundidade,
+    }
+    estado = {}
+
+    def preparar():
+        estado['dados'] = sistema.preparar_dados()
+
+    def treinar():
+        X_train, _, y_train, _, preprocessor = estado['dados']
+        sistema.treinar_modelo(X_train, y_train, preprocessor, otimizar=False, parametros=parametros)
+
+    etapas = {
+        'carregar_dados': lambda: sistema.carregar_dados(caminho_treino),
+        'limpar_dados': sistema.limpar_dados,
+        'preparar_dados': preparar,
+        'treinar_modelo': treinar,
+        'gerar_predicoes': lambda: sistema.gerar_predicoes(caminho_teste),
+    }
+
+    resultados = {}
+    for nome in ESTAGIOS:
+        pico_reiniciado = _reiniciar_pico_memoria()
+        rss_inicial = _memoria_kb('VmRSS')
+
+        inicio = time.perf_counter()
+        inicio_cpu = time.process_time()
+        etapas[nome]()
+        tempo = time.perf_counter() - inicio
+
+        linhas = len(sistema.df_test) if nome == 'gerar_predicoes' else len(sistema.df_train)
+        resultados[nome] = {
+            'tempo_s': tempo,
+            'cpu_s': time.process_time() - inicio_cpu,
+            'linhas': linhas,
+            'linhas_por_s': linhas / tempo if tempo > 0 else None,
+            'pico_memoria_mb': _memoria_kb('VmHWM') / 1024,
+            'memoria_adicional_mb': (_memoria_kb('VmHWM') - rss_inicial) / 1024,
+            'pico_por_etapa': pico_reiniciado,
+        }
+    return resultados
+
+
+def comparar_baseline(resultados: dict, baseline: dict, tolerancia: float) -> list:
+    """Listar (escala, etapa, métrica, base, atual) que pioraram mais que a tolerância"""
+    regressoes = []
+    for escala, atual in resultados['escalas'].items():
+        base = baseline.get('escalas', {}).get(escala)
+        if base is None:
+            print(f"AVISO: escala x{escala} ausente da linha de base; não comparada")
+            continue
+        for etapa, medidas in atual['etapas'].items():
+            ref = base['etapas'].get(etapa)
+            if ref is None:
+                continue
+            for metrica in ('tempo_s', 'pico_memoria_mb'):
+                if ref[metrica] and medidas[metrica] > ref[metrica] * (1 + tolerancia):
+                    regressoes.append((escala, etapa, metrica, ref[metrica], medidas[metrica]))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks por etapa do pipeline em várias escalas")
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 10, 100],
+                        help="Múltiplos do tamanho real (1000 gera ~35 milhões de linhas)")
+    parser.add_argument('--dir-dados', default='data/sintetico')
+    parser.add_argument('--arvores', type=int, default=20, help="Árvores por alvo no treinamento medido")
+    parser.add_argument('--profundidade', type=int, default=12)
+    parser.add_argument('--saida', default='outputs/benchmark_escala.json')
+    parser.add_argument('--baseline', default=str(RAIZ / 'benchmarks/baseline_escala.json'))
+    parser.add_argument('--salvar-baseline', action='store_true', help="Gravar este resultado como linha de base")
+    parser.add_argument('--exigir-baseline', action='store_true',
+                        help="Sair com erro quando a linha de base não existir (uso em CI)")
+    parser.add_argument('--tolerancia', type=float, default=0.25,
+                        help="Piora relativa aceita antes de apontar regressão")
+    parser.add_argument('--filho', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        caminho_treino, caminho_teste, arvores, profundidade = args.filho
+        print(json.dumps(executar_escala(caminho_treino, caminho_teste, int(arvores), int(profundidade))))
+        return
+
+    from gerador_sintetico import criar_perfil, gerar_conjunto
+    import pandas as pd
+
+    perfil = criar_perfil(str(RAIZ / 'data/bootcamp_train.csv'))
+    linhas_teste = len(pd.read_csv(RAIZ / 'data/bootcamp_test.csv', usecols=['id']))
+
+    resultados = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {'python': platform.python_version(), 'nucleos': os.cpu_count(),
+                     'plataforma': platform.platform()},
+        'parametros': {'arvores': args.arvores, 'profundidade': args.profundidade},
+        'escalas': {},
+    }
+
+    for escala in args.escalas:
+        print(f"\n=== Escala x{escala} ===")
+        caminhos = gerar_conjunto(perfil, str(RAIZ / args.dir_dados), escala, linhas_teste)
+
+        # Cada escala roda em um processo novo, com diretório de trabalho temporário (models/, outputs/)
+        with tempfile.TemporaryDirectory() as tmp:
+            comando = [sys.executable, str(Path(__file__).resolve()), '--filho', caminhos['treino'],
+                       caminhos['teste'], str(args.arvores), str(args.profundidade)]
+            ambiente = dict(os.environ, PYTHONPATH=str(RAIZ))
+            saida = subprocess.run(comando, cwd=tmp, env=ambiente, check=True,
+                                   capture_output=True, text=True).stdout
+        etapas = json.loads(saida.strip().splitlines()[-1])
+        resultados['escalas'][str(escala)] = {'etapas': etapas}
+
+        print(f"{'etapa':<18} {'tempo (s)':>10} {'linhas/s':>12} {'pico (MB)':>10}")
+        for nome, medidas in etapas.items():
+            print(f"{nome:<18} {medidas['tempo_s']:>10.2f} {medidas['linhas_por_s']:>12.0f} "
+                  f"{medidas['pico_memoria_mb']:>10.0f}")
+
+    Path(args.saida).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(resultados, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados gravados em '{args.saida}'")
+
+    if args.salvar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+        print(f"Linha de base gravada em '{args.baseline}'")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"\nAVISO: linha de base '{args.baseline}' não encontrada; regressões não verificadas "
+              f"(gere com --salvar-baseline)")
+        if args.exigir_baseline:
+            sys.exit(2)
+    else:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressoes = comparar_baseline(resultados, json.load(f), args.tolerancia)
+        if regressoes:
+            print(f"\nREGRESSÕES (tolerância {args.tolerancia:.0%}):")
+            for escala, etapa, metrica, base, atual in regressoes:
+                print(f"  x{escala} {etapa} {metrica}: {base:.2f} -> {atual:.2f} ({atual / base - 1:+.0%})")
+            sys.exit(1)
+        print("\nSem regressões em relação à linha de base.")
+
+
+if __name__ == "__main__":
+    main()
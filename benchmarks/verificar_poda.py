@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Verificação da Poda de Árvores da Compressão
+podar_arvore reconstrói o Tree do sklearn a partir do formato interno (__getstate__/__reduce__);
+este script confere, nas árvores do modelo treinado, que a poda sem parâmetros é a identidade e que
+as árvores podadas/fundidas têm estrutura consistente e folhas tiradas do caminho original
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.multioutput import MultiOutputClassifier
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compressao_floresta import FOLHA, INDEFINIDO, podar_arvore
+from config_file import obter_configuracao
+
+
+def _florestas(pipeline):
+    """Florestas do pipeline (uma por alvo no MultiOutputClassifier)"""
+    classificador = pipeline.named_steps['classifier']
+    return classificador.estimators_ if isinstance(classificador, MultiOutputClassifier) else [classificador]
+
+
+def verificar_identidade(arvore, Xt):
+    """Poda com profundidade_max=None e fusao_folhas=0 devolve a mesma árvore e as mesmas predições"""
+    podada = podar_arvore(arvore, profundidade_max=None, fusao_folhas=0.0)
+    original, nova = arvore.tree_, podada.tree_
+    if (nova.node_count, nova.max_depth) != (original.node_count, original.max_depth):
+        raise AssertionError(f"Poda identidade mudou a árvore: {original.node_count} nós/profundidade "
+                             f"{original.max_depth} -> {nova.node_count}/{nova.max_depth}")
+    for campo in ('children_left', 'children_right', 'feature', 'threshold', 'value', 'n_node_samples'):
+        if not np.array_equal(getattr(original, campo), getattr(nova, campo)):
+            raise AssertionError(f"Poda identidade mudou '{campo}'")
+    esperado, obtido = arvore.predict_proba(Xt), podada.predict_proba(Xt)
+    if not all(np.array_equal(e, o) for e, o in zip(np.atleast_3d(esperado), np.atleast_3d(obtido))):
+        raise AssertionError("Poda identidade mudou as predições")
+
+
+def _mapear_nos(original, podada) -> np.ndarray:
+    """Índice do nó original correspondente a cada nó da árvore podada (percorrendo as duas juntas)"""
+    mapa = np.full(podada.node_count, -1, dtype=np.int64)
+    pilha = [(0, 0)]
+    while pilha:
+        no, no_original = pilha.pop()
+        mapa[no] = no_original
+        if podada.children_left[no] == FOLHA:
+            continue
+        if (podada.feature[no], podada.threshold[no]) != (original.feature[no_original],
+                                                          original.threshold[no_original]):
+            raise AssertionError(f"Nó interno {no} não corresponde ao nó original {no_original}")
+        pilha.append((podada.children_left[no], original.children_left[no_original]))
+        pilha.append((podada.children_right[no], original.children_right[no_original]))
+    return mapa
+
+
+def verificar_estrutura(arvore, podada, Xt, profundidade_max=None):
+    """node_count/max_depth consistentes com os arrays e cada folha vinda do caminho original da amostra"""
+    original, nova = arvore.tree_, podada.tree_
+    n = nova.node_count
+    if not (len(nova.children_left) == len(nova.value) == n <= original.node_count):
+        raise AssertionError(f"node_count {n} não bate com os arrays ({len(nova.children_left)} nós)")
+
+    esquerda, direita = nova.children_left, nova.children_right
+    internos = np.flatnonzero(esquerda != FOLHA)
+    folhas = np.flatnonzero(esquerda == FOLHA)
+    filhos = np.concatenate([esquerda[internos], direita[internos]])
+    if (np.any(esquerda[internos] <= internos) or np.any(direita[internos] <= internos)
+            or np.any(filhos >= n) or len(np.unique(filhos)) != n - 1):
+        raise AssertionError("Filhos fora de ordem, fora do intervalo ou repetidos")
+    if np.any(direita[folhas] != FOLHA) or np.any(nova.feature[folhas] != INDEFINIDO):
+        raise AssertionError("Folha com filho ou feature definida")
+
+    profundidade = np.zeros(n, dtype=np.int64)
+    for i in internos:
+        profundidade[esquerda[i]] = profundidade[direita[i]] = profundidade[i] + 1
+    if nova.max_depth != profundidade.max():
+        raise AssertionError(f"max_depth {nova.max_depth} diferente da profundidade real {profundidade.max()}")
+    if profundidade_max is not None and nova.max_depth > profundidade_max:
+        raise AssertionError(f"Profundidade {nova.max_depth} acima de {profundidade_max}")
+
+    # A folha de cada amostra na árvore podada é um nó do seu caminho na original, com o mesmo valor
+    mapa = _mapear_nos(original, nova)
+    folha_podada = podada.apply(Xt)
+    no_original = mapa[folha_podada]
+    caminho = arvore.decision_path(Xt)
+    if not np.asarray(caminho[np.arange(len(Xt)), no_original]).all():
+        raise AssertionError("Folha podada fora do caminho original da amostra")
+    if not np.array_equal(nova.value[folha_podada], original.value[no_original]):
+        raise AssertionError("Valor da folha podada difere do nó original")
+
+
+def main():
+    config = obter_configuracao()
+
+    parser = argparse.ArgumentParser(description="Verificar podar_arvore nas árvores do modelo treinado")
+    parser.add_argument('--modelo', default=config.CAMINHO_MODELO)
+    parser.add_argument('--csv', default=config.CAMINHO_DADOS_TESTE)
+    parser.add_argument('--arvores', type=int, default=10, help="Árvores verificadas por floresta")
+    parser.add_argument('--profundidades', type=int, nargs='+', default=[4, 8])
+    parser.add_argument('--fusoes', type=float, nargs='+', default=[0.02, 0.1, 0.5])
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.modelo)
+    X = pd.read_csv(args.csv, usecols=config.FEATURES).dropna()
+    Xt = np.asarray(pipeline.named_steps['preprocessor'].transform(X), dtype=np.float32)
+    arvores = [a for floresta in _florestas(pipeline) for a in floresta.estimators_[:args.arvores]]
+
+    for arvore in arvores:
+        verificar_identidade(arvore, Xt)
+    print(f"Poda identidade: OK ({len(arvores)} árvores, {len(Xt)} linhas, predições idênticas)")
+
+    combinacoes = [(None, f) for f in args.fusoes] + [(p, f) for p in args.profundidades for f in [0.0] + args.fusoes]
+    nos_original = sum(a.tree_.node_count for a in arvores)
+    print(f"\n{'profundidade':>12} {'fusão':>6} {'nós':>9} {'% original':>11} {'estrutura':>10}")
+    for profundidade_max, fusao in combinacoes:
+        podadas = [podar_arvore(a, profundidade_max, fusao) for a in arvores]
+        for arvore, podada in zip(arvores, podadas):
+            verificar_estrutura(arvore, podada, Xt, profundidade_max)
+        nos = sum(p.tree_.node_count for p in podadas)
+        print(f"{str(profundidade_max):>12} {fusao:>6g} {nos:>9} {nos / nos_original:>11.1%} {'OK':>10}")
+
+
+if __name__ == "__main__":
+    main()
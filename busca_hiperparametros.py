@@ -0,0 +1,690 @@
+#!/usr/bin/env python3
+"""
+Busca de Hiperparâmetros do Sistema de Manutenção Preditiva
+Grade exaustiva (GridSearchCV), divisões sucessivas (HalvingGridSearchCV) ou grade com
+crescimento incremental das florestas (warm start), configuradas por ConfiguracaoProjeto
+"""
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+import time
+import warnings
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy import sparse
+from scipy.stats import rankdata
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.metrics import f1_score
+from sklearn.model_selection import GridSearchCV, HalvingGridSearchCV, ParameterGrid, check_cv
+from sklearn.multioutput import MultiOutputClassifier
+from sklearn.pipeline import Pipeline
+
+from dados_compartilhados import (
+    MatrizesCompartilhadas, abrir_compartilhada, medir_envio, resumir_memoria_workers
+)
+from instrumentacao import memoria_atual_kb
+
+MODOS_BUSCA = ('grid', 'halving', 'warm_start')
+
+# Arquivo (em um diretório temporário por busca) com uma linha JSON por ajuste medido
+ARQUIVO_MEDICOES = 'medicoes.jsonl'
+
+METRICA_BUSCA = 'f1_weighted'
+
+# Nomes da grade são escritos para o MultiOutputClassifier; no modo nativo a floresta é o próprio 'classifier'
+PREFIXO_ESTIMADOR = 'classifier__estimator__'
+PREFIXO_NATIVO = 'classifier__'
+
+
+def prefixo_parametros(pipeline) -> str:
+    """Prefixo dos parâmetros da floresta no pipeline (MultiOutputClassifier ou floresta multi-saída)"""
+    return PREFIXO_ESTIMADOR if isinstance(pipeline.named_steps['classifier'], MultiOutputClassifier) else PREFIXO_NATIVO
+
+
+def adaptar_nome_parametro(nome: str, prefixo: str) -> str:
+    """Traduzir um nome de parâmetro da grade para o prefixo do pipeline"""
+    if nome.startswith(PREFIXO_ESTIMADOR):
+        return prefixo + nome[len(PREFIXO_ESTIMADOR):]
+    return nome
+
+
+def adaptar_grade(param_grid: Dict[str, List], pipeline) -> Dict[str, List]:
+    """Traduzir os nomes de uma grade para o modo de modelo do pipeline"""
+    prefixo = prefixo_parametros(pipeline)
+    return {adaptar_nome_parametro(nome, prefixo): valores for nome, valores in param_grid.items()}
+
+
+def _grade_halving(param_grid: Dict[str, List], recurso: str) -> Dict[str, List]:
+    """Remover da grade o parâmetro usado como recurso (ele é controlado pelas divisões sucessivas)"""
+    return {nome: valores for nome, valores in param_grid.items() if nome != recurso}
+
+
+def _min_recursos_amostras(param_grid: Dict[str, List], config, n_amostras: int) -> int:
+    """Resolver 'smallest'/'exhaust' para o recurso n_samples
+
+    O sklearn só resolve esses valores para alvos 1-D; aqui os alvos são multi-rótulo
+    (5 colunas binárias), então o cálculo é refeito com 2 classes por alvo.
+    """
+    minimo = config.CV_FOLDS * 2 * 2
+    if config.HALVING_MIN_RECURSOS == 'smallest':
+        return minimo
+
+    max_recursos = n_amostras if config.HALVING_MAX_RECURSOS == 'auto' else config.HALVING_MAX_RECURSOS
+    n_candidatos = len(ParameterGrid(param_grid))
+    ultima_iteracao = int(math.floor(math.log(n_candidatos, config.HALVING_FATOR))) if n_candidatos > 1 else 0
+    return max(minimo, max_recursos // config.HALVING_FATOR ** ultima_iteracao)
+
+
+def criar_busca(pipeline, param_grid: Dict[str, List], config, modo: str = 'grid',
+                n_jobs: int = -1, n_amostras: int = None, medir: bool = False):
+    """Criar o objeto de busca correspondente ao modo escolhido"""
+    param_grid = adaptar_grade(param_grid, pipeline)
+
+    if modo == 'grid':
+        return GridSearchCV(
+            estimator=pipeline,
+            param_grid=param_grid,
+            scoring=METRICA_BUSCA,
+            cv=config.CV_FOLDS,
+            n_jobs=n_jobs,
+            verbose=1
+        )
+
+    if modo == 'halving':
+        recurso = adaptar_nome_parametro(config.HALVING_RECURSO, prefixo_parametros(pipeline))
+        grade = _grade_halving(param_grid, recurso)
+        min_recursos = config.HALVING_MIN_RECURSOS
+        max_recursos = config.HALVING_MAX_RECURSOS
+
+        if recurso == 'n_samples':
+            if isinstance(min_recursos, str):
+                min_recursos = _min_recursos_amostras(grade, config, n_amostras)
+        elif max_recursos == 'auto':
+            # Com um parâmetro como recurso (ex.: número de árvores), o máximo vem da própria grade
+            max_recursos = max(param_grid.get(recurso, [100]))
+
+        return HalvingGridSearchCV(
+            estimator=pipeline,
+            param_grid=grade,
+            factor=config.HALVING_FATOR,
+            resource=recurso,
+            min_resources=min_recursos,
+            max_resources=max_recursos,
+            scoring=METRICA_BUSCA,
+            cv=config.CV_FOLDS,
+            n_jobs=n_jobs,
+            random_state=config.RANDOM_STATE,
+            verbose=1
+        )
+
+    if modo == 'warm_start':
+        return BuscaWarmStart(
+            estimator=pipeline,
+            param_grid=param_grid,
+            cv=config.CV_FOLDS,
+            n_jobs=n_jobs,
+            compartilhar=config.DADOS_COMPARTILHADOS,
+            dir_compartilhado=config.DIR_DADOS_COMPARTILHADOS,
+            medir=medir
+        )
+
+    raise ValueError(f"Modo de busca desconhecido: '{modo}' (opções: {MODOS_BUSCA})")
+
+
+def executar_busca(pipeline, X, y, param_grid: Dict[str, List], config,
+                   modo: str = 'grid', n_jobs: int = -1, medir: bool = False) -> Tuple[object, float]:
+    """Executar a busca e retornar o objeto ajustado e o tempo de parede (s)
+
+    Com medir (rastreamento ativo), em grid/halving cada ajuste dos workers é medido por PipelineMedido
+    (a busca do sklearn descarta os pipelines dos folds) e o reajuste final por FlorestaMedida;
+    best_estimator_ volta sem a instrumentação. Sem medir, o pipeline é usado como está.
+    Com DADOS_COMPARTILHADOS e mais de um worker, grid/halving leem X por referência (LeitorCompartilhado).
+    """
+    # grid/halving com workers: X publicado uma vez; as tarefas recebem só as posições das linhas
+    compartilhadas = None
+    if (modo != 'warm_start' and config.DADOS_COMPARTILHADOS and effective_n_jobs(n_jobs) > 1
+            and hasattr(X, 'columns') and pd.api.types.is_numeric_dtype(X.index)):
+        compartilhadas = MatrizesCompartilhadas(config.DIR_DADOS_COMPARTILHADOS)
+        pipeline = ler_por_referencia(pipeline, publicar_tabela(compartilhadas, X))
+        X = np.arange(len(X)).reshape(-1, 1)
+        # Rótulos em um único array contíguo: acima de 1 MB o próprio joblib os envia por memmap
+        y = np.ascontiguousarray(y)
+
+    dir_medicoes = None
+    if medir and modo != 'warm_start':
+        dir_medicoes = tempfile.mkdtemp(prefix='medicoes-')
+        pipeline = instrumentar_pipeline(pipeline, dir_medicoes)
+    busca = criar_busca(pipeline, param_grid, config, modo, n_jobs, n_amostras=len(X), medir=medir)
+
+    try:
+        inicio = time.perf_counter()
+        busca.fit(X, y)
+        tempo = time.perf_counter() - inicio
+        if dir_medicoes is not None:
+            busca.medicoes_ = ler_medicoes(dir_medicoes)
+    finally:
+        if dir_medicoes is not None:
+            shutil.rmtree(dir_medicoes, ignore_errors=True)
+        if compartilhadas is not None:
+            compartilhadas.liberar()
+
+    if compartilhadas is not None:
+        busca.bytes_publicados_ = compartilhadas.bytes_publicados
+    if dir_medicoes is not None:
+        associar_medicoes(busca, X, y)
+        medir_envio_busca(busca, pipeline, X, y)
+        relatar_envio(busca, n_jobs)
+        relatar_reajuste(busca.best_estimator_)
+        busca.best_estimator_ = remover_instrumentacao(busca.best_estimator_)
+    busca.best_estimator_ = remover_leitor(busca.best_estimator_)
+
+    return busca, tempo
+
+
+def contar_tarefas_externas(param_grid: Dict[str, List], config, modo: str, pipeline) -> int:
+    """Número de tarefas independentes (candidatos x folds) que a busca pode paralelizar"""
+    grade = adaptar_grade(param_grid, pipeline)
+    if modo == 'warm_start':
+        parametro_arvores = prefixo_parametros(pipeline) + 'n_estimators'
+        grade = {p: v for p, v in grade.items() if p != parametro_arvores}
+    return len(ParameterGrid(grade)) * config.CV_FOLDS
+
+
+def contar_ajustes(busca) -> int:
+    """Número de ajustes de pipeline realizados pela busca (candidatos x folds, por iteração)"""
+    if hasattr(busca, 'n_ajustes_'):
+        return busca.n_ajustes_
+    return len(busca.cv_results_['params']) * busca.n_splits_
+
+
+class ReferenciaTabela(NamedTuple):
+    """DataFrame publicado em memória compartilhada: um .npy por coluna, mais o índice
+
+    Colunas não numéricas são gravadas como códigos inteiros; categorias guarda os valores de cada
+    uma e categoricas, as que eram do tipo category (as demais voltam como object).
+    """
+    colunas: Tuple[str, ...]
+    caminhos: Tuple[str, ...]
+    indice: str
+    categorias: Dict[str, list]
+    categoricas: Tuple[str, ...]
+
+
+def publicar_tabela(compartilhadas: MatrizesCompartilhadas, X) -> ReferenciaTabela:
+    """Gravar as colunas e o índice de X uma única vez e devolver a referência a enviar aos workers"""
+    caminhos, categorias, categoricas = [], {}, []
+    for i, nome in enumerate(X.columns):
+        coluna = X[nome]
+        if isinstance(coluna.dtype, pd.CategoricalDtype):
+            valores, categorias[nome] = coluna.cat.codes.to_numpy(), list(coluna.cat.categories)
+            categoricas.append(nome)
+        elif pd.api.types.is_numeric_dtype(coluna) or pd.api.types.is_bool_dtype(coluna):
+            valores = coluna.to_numpy()
+        else:
+            valores, unicos = pd.factorize(coluna)
+            categorias[nome] = list(unicos)
+        caminhos.append(compartilhadas.publicar(f"coluna_{i}", valores))
+    indice = compartilhadas.publicar('indice', X.index.to_numpy())
+    return ReferenciaTabela(tuple(X.columns), tuple(caminhos), indice, categorias, tuple(categoricas))
+
+
+class LeitorCompartilhado(BaseEstimator, TransformerMixin):
+    """Primeiro passo do pipeline na busca com dados compartilhados: posições das linhas -> DataFrame
+
+    Lê (memory mapping) só as linhas pedidas da tabela publicada, com o índice e os tipos originais.
+    """
+
+    def __init__(self, referencia: ReferenciaTabela = None):
+        self.referencia = referencia
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        linhas = np.asarray(X).ravel()
+        referencia = self.referencia
+        dados = {}
+        for nome, caminho in zip(referencia.colunas, referencia.caminhos):
+            valores = abrir_compartilhada(caminho)[linhas]
+            if nome in referencia.categorias:
+                valores = pd.Categorical.from_codes(valores, categories=referencia.categorias[nome])
+                if nome not in referencia.categoricas:
+                    valores = np.asarray(valores, dtype=object)
+            dados[nome] = valores
+        return pd.DataFrame(dados, index=abrir_compartilhada(referencia.indice)[linhas])
+
+
+def ler_por_referencia(pipeline, referencia: ReferenciaTabela):
+    """Cópia do pipeline com LeitorCompartilhado à frente (os nomes dos demais passos não mudam)"""
+    return Pipeline([('leitor', LeitorCompartilhado(referencia))] + clone(pipeline).steps,
+                    memory=pipeline.memory, verbose=pipeline.verbose)
+
+
+def remover_leitor(pipeline):
+    """Pipeline ajustado sem o LeitorCompartilhado (o modelo salvo recebe DataFrames)"""
+    if not isinstance(pipeline.steps[0][1], LeitorCompartilhado):
+        return pipeline
+    return Pipeline(pipeline.steps[1:], memory=pipeline.memory, verbose=pipeline.verbose)
+
+
+def _bytes_dados(dados) -> int:
+    """Bytes de uma matriz densa, esparsa, DataFrame ou Series (sem serializar)"""
+    if sparse.issparse(dados):
+        return int(dados.data.nbytes + dados.indices.nbytes + dados.indptr.nbytes)
+    if hasattr(dados, 'memory_usage'):
+        return int(np.sum(dados.memory_usage(index=False, deep=True)))
+    return int(np.asarray(dados).nbytes)
+
+
+class FlorestaMedida(RandomForestClassifier):
+    """RandomForestClassifier que guarda, em medicao_, o processo, o tempo, o RSS e os bytes do seu ajuste
+
+    Os parâmetros são os mesmos da floresta, então os nomes da grade não mudam.
+    """
+
+    def fit(self, X, y, sample_weight=None):
+        inicio, antes = time.time(), memoria_atual_kb()
+        super().fit(X, y, sample_weight=sample_weight)
+        self.medicao_ = {'pid': os.getpid(), 'inicio': inicio, 'duracao_s': time.time() - inicio,
+                         'rss_antes_kb': antes, 'rss_depois_kb': memoria_atual_kb(),
+                         'bytes': _bytes_dados(X) + _bytes_dados(y)}
+        return self
+
+
+def _florestas_ajustadas(pipeline) -> List:
+    """Florestas ajustadas do pipeline (uma por alvo no MultiOutputClassifier)"""
+    classificador = pipeline.steps[-1][1]
+    if isinstance(classificador, MultiOutputClassifier):
+        return getattr(classificador, 'estimators_', [])
+    return [classificador]
+
+
+def _hash_indice(X) -> str:
+    """Identificação das linhas de um ajuste pelos rótulos do índice (associa cada ajuste ao seu fold)"""
+    # Com dados compartilhados, X são as posições das linhas (ver LeitorCompartilhado)
+    indice = X.index.to_numpy() if hasattr(X, 'index') else np.asarray(X).ravel()
+    return hashlib.sha1(np.ascontiguousarray(indice).tobytes()).hexdigest()[:16]
+
+
+class PipelineMedido(Pipeline):
+    """Pipeline que acrescenta a dir_medicoes uma linha JSON por ajuste (processo, tempo, RSS e florestas)
+
+    Os pipelines dos folds ficam nos workers e são descartados pela busca; as medições voltam pelo
+    arquivo, escrito em modo append por todos os processos.
+    """
+
+    def __init__(self, steps, *, memory=None, verbose=False, dir_medicoes=None):
+        super().__init__(steps, memory=memory, verbose=verbose)
+        self.dir_medicoes = dir_medicoes
+
+    def fit(self, X, y=None, **fit_params):
+        inicio, antes = time.time(), memoria_atual_kb()
+        super().fit(X, y, **fit_params)
+        if self.dir_medicoes is not None:
+            classificador = self.steps[-1][1]
+            floresta = classificador.estimator if isinstance(classificador, MultiOutputClassifier) else classificador
+            medicao = {'pid': os.getpid(), 'inicio': inicio, 'duracao_s': time.time() - inicio,
+                       'rss_antes_kb': antes, 'rss_depois_kb': memoria_atual_kb(), 'linhas': len(X),
+                       'hash_linhas': _hash_indice(X),
+                       'parametros': {nome: str(valor) for nome, valor in floresta.get_params().items()},
+                       'florestas': [getattr(f, 'medicao_', None) for f in _florestas_ajustadas(self)]}
+            with open(os.path.join(self.dir_medicoes, ARQUIVO_MEDICOES), 'a') as arquivo:
+                arquivo.write(json.dumps(medicao) + '\n')
+        return self
+
+
+def instrumentar_pipeline(pipeline, dir_medicoes: Optional[str] = None) -> PipelineMedido:
+    """Cópia não ajustada do pipeline com as florestas trocadas por FlorestaMedida"""
+    pipeline = clone(pipeline)
+    nome, classificador = pipeline.steps[-1]
+    if isinstance(classificador, MultiOutputClassifier):
+        classificador.set_params(estimator=FlorestaMedida(**classificador.estimator.get_params()))
+    else:
+        classificador = FlorestaMedida(**classificador.get_params())
+    return PipelineMedido(pipeline.steps[:-1] + [(nome, classificador)], memory=pipeline.memory,
+                          verbose=pipeline.verbose, dir_medicoes=dir_medicoes)
+
+
+def _floresta_simples(floresta):
+    """RandomForestClassifier ajustado com o estado de uma FlorestaMedida (sem a medição)"""
+    if not isinstance(floresta, FlorestaMedida):
+        return floresta
+    simples = RandomForestClassifier.__new__(RandomForestClassifier)
+    simples.__dict__.update({k: v for k, v in floresta.__dict__.items() if k != 'medicao_'})
+    return simples
+
+
+def remover_instrumentacao(pipeline):
+    """Pipeline comum com as florestas comuns (o modelo salvo não depende das classes de medição)"""
+    if not isinstance(pipeline, PipelineMedido):
+        return pipeline
+    nome, classificador = pipeline.steps[-1]
+    if isinstance(classificador, MultiOutputClassifier):
+        classificador.estimator = _floresta_simples(classificador.estimator)
+        if hasattr(classificador, 'estimators_'):
+            classificador.estimators_ = [_floresta_simples(f) for f in classificador.estimators_]
+    else:
+        classificador = _floresta_simples(classificador)
+    return Pipeline(pipeline.steps[:-1] + [(nome, classificador)], memory=pipeline.memory, verbose=pipeline.verbose)
+
+
+def ler_medicoes(dir_medicoes: str) -> List[Dict]:
+    """Medições gravadas por PipelineMedido, em ordem de início"""
+    caminho = os.path.join(dir_medicoes, ARQUIVO_MEDICOES)
+    if not os.path.exists(caminho):
+        return []
+    with open(caminho) as arquivo:
+        return sorted((json.loads(linha) for linha in arquivo if linha.strip()), key=lambda m: m['inicio'])
+
+
+def associar_medicoes(busca, X, y):
+    """Preencher 'candidato' (índice em cv_results_) e 'fold' de cada medição de busca.medicoes_
+
+    O candidato vem dos parâmetros da floresta (no halving, a mesma combinação em iterações
+    sucessivas é separada pelo número de linhas, que só cresce); o fold, das linhas de treino.
+    No halving por amostras as linhas são subamostras do fold e ficam sem fold (None).
+    """
+    y_array = np.asarray(y)
+    folds = {
+        _hash_indice(X.iloc[treino] if hasattr(X, 'iloc') else X[treino]): f
+        for f, (treino, _) in enumerate(check_cv(busca.cv, y_array, classifier=True).split(X, y_array))
+    }
+
+    def chave(parametros):
+        return tuple(sorted((nome.split('__')[-1], str(valor)) for nome, valor in parametros.items()))
+
+    resultados = busca.cv_results_
+    candidatos = {}
+    for i, parametros in enumerate(resultados['params']):
+        candidatos.setdefault(chave(parametros), []).append(i)
+
+    ajustes = {}
+    nomes = {nome.split('__')[-1] for nome in resultados['params'][0]}
+    for medicao in busca.medicoes_:
+        medicao['candidato'], medicao['fold'] = None, folds.get(medicao['hash_linhas'])
+    for medicao in busca.medicoes_[:contar_ajustes(busca)]:
+        parametros = {nome: valor for nome, valor in medicao['parametros'].items() if nome in nomes}
+        ajustes.setdefault(chave(parametros), []).append(medicao)
+
+    for grupo, indices in candidatos.items():
+        indices = sorted(indices, key=lambda i: resultados['iter'][i] if 'iter' in resultados else 0)
+        medicoes = sorted(ajustes.get(grupo, []), key=lambda m: (m['linhas'], m['inicio']))
+        for posicao, medicao in enumerate(medicoes):
+            medicao['candidato'] = indices[min(posicao // busca.n_splits_, len(indices) - 1)]
+
+
+def medir_envio_busca(busca, pipeline, X, y):
+    """Bytes enviados aos workers por GridSearchCV/HalvingGridSearchCV e RSS de cada worker
+
+    Cada tarefa recebe o pipeline, X, y e os índices do fold: (pipeline, X, y) é medido uma única
+    vez e multiplicado pelas tarefas; os índices (int64) entram pelo número de linhas de cada tarefa.
+    O reajuste final roda no processo principal e fica de fora.
+    """
+    por_tarefa, memmap = medir_envio((pipeline, X, y))
+    n_tarefas = contar_ajustes(busca)
+    if getattr(busca, 'resource', None) == 'n_samples':
+        linhas = int(np.sum(busca.cv_results_['n_resources'])) * busca.n_splits_
+    else:
+        linhas = len(X) * n_tarefas
+    busca.bytes_enviados_ = por_tarefa * n_tarefas + linhas * np.dtype(np.int64).itemsize
+    busca.bytes_memmap_ = sum(memmap.values())
+
+    # Só os ajustes dos folds (o reajuste é o último, com todas as linhas, no processo principal)
+    ajustes = busca.medicoes_[:n_tarefas]
+    busca.memoria_workers_ = resumir_memoria_workers(
+        [(m['pid'], m['inicio'], m['rss_antes_kb'], m['rss_depois_kb']) for m in ajustes]
+    )
+
+
+def relatar_envio(busca, n_jobs: int):
+    """Imprimir os bytes enviados às tarefas da busca e o RSS de cada worker"""
+    sequencial = effective_n_jobs(n_jobs) == 1
+    publicados = getattr(busca, 'bytes_publicados_', 0)
+    print(f"Dados enviados aos workers: {busca.bytes_enviados_ / 2 ** 20:.2f} MB serializados em "
+          f"{contar_ajustes(busca)} tarefas"
+          + (f" + {busca.bytes_memmap_ / 2 ** 20:.2f} MB em memmap do joblib (uma vez)" if busca.bytes_memmap_ else "")
+          + (f" (matrizes publicadas uma vez em memória compartilhada: {publicados / 2 ** 20:.2f} MB)"
+             if publicados else "")
+          + (" - n_jobs=1: execução sequencial, nada foi de fato serializado" if sequencial else ""))
+    for pid, memoria in busca.memoria_workers_.items():
+        origem = 'processo principal' if pid == os.getpid() else f"worker {pid}"
+        print(f"  {origem}: RSS {memoria['antes_mb']:.0f} MB antes -> "
+              f"{memoria['depois_mb']:.0f} MB depois ({memoria['tarefas']} tarefas)")
+
+
+def relatar_reajuste(pipeline):
+    """Imprimir bytes e RSS das florestas do reajuste final (cada alvo pode ir para um worker do n_jobs interno)"""
+    medicoes = [f.medicao_ for f in _florestas_ajustadas(pipeline) if hasattr(f, 'medicao_')]
+    if not medicoes:
+        return
+    principal = os.getpid()
+    enviados = sum(m['bytes'] for m in medicoes if m['pid'] != principal)
+    print(f"Reajuste final: {len(medicoes)} floresta(s) com {sum(m['bytes'] for m in medicoes) / 2 ** 20:.2f} MB "
+          f"de dados (X + rótulos de cada uma), {enviados / 2 ** 20:.2f} MB em florestas ajustadas por workers "
+          f"do n_jobs interno (arrays >= 1 MB vão uma única vez por memmap do joblib)")
+    memoria = resumir_memoria_workers(
+        [(m['pid'], m['inicio'], m['rss_antes_kb'], m['rss_depois_kb']) for m in medicoes]
+    )
+    for pid, registro in memoria.items():
+        origem = 'processo principal' if pid == principal else f"worker {pid}"
+        print(f"  {origem}: RSS {registro['antes_mb']:.0f} MB antes -> "
+              f"{registro['depois_mb']:.0f} MB depois ({registro['tarefas']} florestas)")
+
+
+def _avaliar_grupo_warm_start(estimador_base, params_grupo, n_arvores, nativo, n_jobs_interno,
+                              Xt_treino, y_treino, Xt_teste, y_teste):
+    """Crescer as florestas de um grupo em um fold e pontuar cada ponto de controle de n_estimators
+
+    Com random_state inteiro, crescer a floresta de 100 para 150 árvores gera exatamente as
+    mesmas árvores que um ajuste independente com 150.
+    """
+    n_alvos = y_treino.shape[1]
+    previsoes = np.empty((len(n_arvores), len(y_teste), n_alvos), dtype=y_teste.dtype)
+
+    # Uma floresta por alvo (MultiOutputClassifier) ou uma única floresta multi-saída
+    alvos = [slice(None)] if nativo else list(range(n_alvos))
+
+    # (alvo, instante de início, duração, pid) de cada floresta, para a instrumentação
+    ajustes = []
+    inicio = time.perf_counter()
+    for j in alvos:
+        inicio_alvo = time.time()
+        floresta = clone(estimador_base).set_params(warm_start=True, n_jobs=n_jobs_interno, **params_grupo)
+        for k, n in enumerate(n_arvores):
+            floresta.set_params(n_estimators=n)
+            with warnings.catch_warnings():
+                # class_weight='balanced' com warm_start: os dados são os mesmos, os pesos também
+                warnings.simplefilter('ignore', UserWarning)
+                floresta.fit(Xt_treino, y_treino[:, j])
+            previsoes[k, :, j] = floresta.predict(Xt_teste)
+        ajustes.append(('todos' if nativo else j, inicio_alvo, time.time() - inicio_alvo, os.getpid()))
+    tempo = time.perf_counter() - inicio
+
+    scores = [f1_score(y_teste, previsoes[k], average='weighted') for k in range(len(n_arvores))]
+    return scores, tempo, ajustes
+
+
+class ReferenciaFold(NamedTuple):
+    """Caminhos das matrizes de um fold publicadas em memória compartilhada (o que o worker recebe)"""
+    X_treino: str
+    y_treino: str
+    X_teste: str
+    y_teste: str
+
+    def abrir(self):
+        """Views só leitura (memory mapping) das matrizes do fold, sem cópia"""
+        return tuple(abrir_compartilhada(caminho) for caminho in self)
+
+
+def _tarefa_warm_start(estimador_base, params_grupo, n_arvores, nativo, n_jobs_interno, dados_fold):
+    """Avaliar um grupo em um fold (matrizes copiadas ou ReferenciaFold), medindo o RSS do worker antes e depois"""
+    inicio, antes = time.time(), memoria_atual_kb()
+    if isinstance(dados_fold, ReferenciaFold):
+        dados_fold = dados_fold.abrir()
+    scores, tempo, ajustes = _avaliar_grupo_warm_start(estimador_base, params_grupo, n_arvores, nativo,
+                                                       n_jobs_interno, *dados_fold)
+    return scores, tempo, ajustes, (os.getpid(), inicio, antes, memoria_atual_kb())
+
+
+def _matriz_densa(Xt) -> np.ndarray:
+    """Matriz transformada em float32 denso (o tipo usado internamente pelas árvores do sklearn)"""
+    if sparse.issparse(Xt):
+        Xt = Xt.toarray()
+    return np.asarray(Xt, dtype=np.float32)
+
+
+class BuscaWarmStart:
+    """Busca em grade que agrupa candidatos que diferem apenas em n_estimators
+
+    Cada grupo cresce uma única floresta por alvo e por fold (warm start), pontuando-a em cada
+    valor de n_estimators da grade. Expõe a mesma interface usada de GridSearchCV
+    (best_params_, best_score_, best_estimator_, cv_results_).
+
+    Com compartilhar, as matrizes pré-processadas e os rótulos de cada fold são publicados uma
+    única vez em memória compartilhada e cada tarefa recebe apenas os caminhos (ReferenciaFold).
+    Com medir, o reajuste final também mede as florestas de cada alvo (FlorestaMedida).
+    """
+
+    def __init__(self, estimator, param_grid: Dict[str, List], cv=3, n_jobs: int = -1,
+                 compartilhar: bool = True, dir_compartilhado: Optional[str] = None, medir: bool = False):
+        self.estimator = estimator
+        self.param_grid = param_grid
+        self.cv = cv
+        self.n_jobs = n_jobs
+        self.compartilhar = compartilhar
+        self.dir_compartilhado = dir_compartilhado
+        self.medir = medir
+
+    def _grupos(self):
+        """Separar a grade em grupos (parâmetros sem n_estimators) e a lista ordenada de n_estimators"""
+        prefixo = self._prefixo
+        fora_do_estimador = [p for p in self.param_grid
+                             if not p.startswith(prefixo) or '__' in p[len(prefixo):]]
+        if fora_do_estimador:
+            raise ValueError(f"Modo warm_start só aceita parâmetros da floresta: {fora_do_estimador}")
+
+        parametro_arvores = prefixo + 'n_estimators'
+        n_arvores = sorted(self.param_grid.get(parametro_arvores,
+                                               [self.estimator.get_params()[parametro_arvores]]))
+        resto = {p: v for p, v in self.param_grid.items() if p != parametro_arvores}
+        grupos = [
+            {p[len(prefixo):]: v for p, v in params.items()}
+            for params in ParameterGrid(resto)
+        ]
+        return grupos, n_arvores
+
+    def fit(self, X, y):
+        y_array = np.asarray(y)
+        folds = list(check_cv(self.cv, y_array, classifier=True).split(X, y_array))
+        self.n_splits_ = len(folds)
+
+        self._prefixo = prefixo_parametros(self.estimator)
+        nativo = self._prefixo == PREFIXO_NATIVO
+        parametro_arvores = self._prefixo + 'n_estimators'
+        grupos, n_arvores = self._grupos()
+
+        # O pré-processador é ajustado e aplicado uma única vez por fold
+        dados_folds = []
+        for treino, teste in folds:
+            preprocessador = clone(self.estimator.named_steps['preprocessor'])
+            Xt_treino = _matriz_densa(preprocessador.fit_transform(X.iloc[treino]))
+            Xt_teste = _matriz_densa(preprocessador.transform(X.iloc[teste]))
+            dados_folds.append((Xt_treino, y_array[treino], Xt_teste, y_array[teste]))
+
+        classificador = self.estimator.named_steps['classifier']
+        estimador_base = classificador if nativo else classificador.estimator
+        tarefas = [(g, f) for g in range(len(grupos)) for f in range(len(folds))]
+
+        print(f"Warm start: {len(grupos)} grupos x {len(folds)} folds, "
+              f"n_estimators {n_arvores} ({len(grupos) * len(n_arvores)} candidatos)")
+
+        compartilhadas = MatrizesCompartilhadas(self.dir_compartilhado) if self.compartilhar else None
+        try:
+            if compartilhadas is not None:
+                nomes = ('X_treino', 'y_treino', 'X_teste', 'y_teste')
+                dados_folds = [
+                    ReferenciaFold(*(compartilhadas.publicar(f"{nome}_{f}", matriz)
+                                     for nome, matriz in zip(nomes, dados)))
+                    for f, dados in enumerate(dados_folds)
+                ]
+
+            # Tamanho de cada parte distinta medido uma vez (grupo e fold), somado por tarefa
+            envio_grupos = [medir_envio((estimador_base, grupo, n_arvores, nativo, classificador.n_jobs))
+                            for grupo in grupos]
+            envio_folds = [medir_envio(dados) for dados in dados_folds]
+            self.bytes_enviados_ = sum(envio_grupos[g][0] + envio_folds[f][0] for g, f in tarefas)
+            self.bytes_memmap_ = sum({id_: n for _, memmap in envio_grupos + envio_folds
+                                      for id_, n in memmap.items()}.values())
+            self.bytes_publicados_ = compartilhadas.bytes_publicados if compartilhadas is not None else 0
+
+            argumentos = [(estimador_base, grupos[g], n_arvores, nativo, classificador.n_jobs, dados_folds[f])
+                          for g, f in tarefas]
+            resultados = Parallel(n_jobs=self.n_jobs)(delayed(_tarefa_warm_start)(*args) for args in argumentos)
+        finally:
+            if compartilhadas is not None:
+                compartilhadas.liberar()
+
+        self.memoria_workers_ = resumir_memoria_workers([r[3] for r in resultados])
+        self.n_ajustes_ = len(tarefas)
+        relatar_envio(self, self.n_jobs)
+
+        # Ajuste de cada floresta (por alvo, grupo e fold), com instante de início e processo
+        self.ajustes_florestas_ = [
+            {'alvo': alvo, 'grupo': g, 'fold': f, 'inicio': inicio, 'duracao_s': duracao, 'pid': pid}
+            for (g, f), (_, _, ajustes, _) in zip(tarefas, resultados)
+            for alvo, inicio, duracao, pid in ajustes
+        ]
+
+        # Pontuações por candidato, na mesma ordem de ParameterGrid usada pelo GridSearchCV
+        scores = {}
+        tempos = {}
+        for (g, f), (scores_fold, tempo, _, _) in zip(tarefas, resultados):
+            for k, n in enumerate(n_arvores):
+                chave = (g, n)
+                scores.setdefault(chave, [None] * len(folds))[f] = scores_fold[k]
+                tempos[chave] = tempos.get(chave, 0.0) + tempo / len(n_arvores)
+
+        params_candidatos, matriz_scores, tempos_candidatos = [], [], []
+        for params in ParameterGrid(self.param_grid):
+            grupo = {p[len(self._prefixo):]: v for p, v in params.items() if p != parametro_arvores}
+            n = params.get(parametro_arvores, n_arvores[0])
+            chave = (grupos.index(grupo), n)
+            params_candidatos.append(params)
+            matriz_scores.append(scores[chave])
+            tempos_candidatos.append(tempos[chave] / len(folds))
+
+        matriz_scores = np.array(matriz_scores)
+        medias = matriz_scores.mean(axis=1)
+        ranks = rankdata(-medias, method='min').astype(np.int32)
+
+        self.cv_results_ = {
+            'params': params_candidatos,
+            'mean_test_score': medias,
+            'std_test_score': matriz_scores.std(axis=1),
+            'rank_test_score': ranks,
+            'mean_fit_time': np.array(tempos_candidatos),
+            **{f"split{i}_test_score": matriz_scores[:, i] for i in range(len(folds))}
+        }
+        self.best_index_ = int(ranks.argmin())
+        self.best_params_ = params_candidatos[self.best_index_]
+        self.best_score_ = float(medias[self.best_index_])
+
+        # Reajuste final com os melhores parâmetros em todos os dados
+        inicio = time.perf_counter()
+        estimador = instrumentar_pipeline(self.estimator) if self.medir else self.estimator
+        reajuste = clone(estimador).set_params(**self.best_params_)
+        reajuste.fit(X, y)
+        self.refit_time_ = time.perf_counter() - inicio
+        if self.medir:
+            relatar_reajuste(reajuste)
+        self.best_estimator_ = remover_instrumentacao(reajuste)
+        return self
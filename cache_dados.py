@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Cache Colunar de Dados do Sistema de Manutenção Preditiva
+Converte os CSVs de sensores uma única vez para um layout NumPy (.npz) tipado,
+indexado pelo hash do conteúdo do arquivo de origem
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Versão do layout em disco (alterar invalida todos os caches existentes)
+VERSAO_FORMATO = 1
+
+CHAVE_META = '__meta__'
+
+
+def calcular_hash_arquivo(caminho: str, tamanho_bloco: int = 1 << 20) -> str:
+    """Calcular o hash SHA-256 do conteúdo de um arquivo"""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def caminho_cache(caminho_csv: str, dir_cache: str, hash_arquivo: str) -> Path:
+    """Caminho do arquivo de cache correspondente a um CSV e seu hash"""
+    return Path(dir_cache) / f"{Path(caminho_csv).stem}-v{VERSAO_FORMATO}-{hash_arquivo[:20]}.npz"
+
+
+def salvar_cache(df: pd.DataFrame, destino: Path):
+    """Salvar um DataFrame no layout colunar (.npz sem compressão)"""
+    arrays = {}
+    colunas = []
+
+    for i, col in enumerate(df.columns):
+        serie = df[col]
+        chave = f"c{i}"
+
+        if serie.dtype == object:
+            # Colunas de texto são fatoradas: códigos inteiros + tabela de valores únicos
+            codigos, unicos = pd.factorize(serie, use_na_sentinel=True)
+            arrays[chave] = codigos.astype(np.int32)
+            arrays[f"{chave}_unicos"] = np.asarray(unicos, dtype=str)
+            tipo = 'texto'
+        else:
+            arrays[chave] = serie.to_numpy()
+            tipo = 'nativo'
+
+        colunas.append({'nome': col, 'chave': chave, 'tipo': tipo})
+
+    meta = {'versao': VERSAO_FORMATO, 'linhas': len(df), 'colunas': colunas}
+    arrays[CHAVE_META] = np.array(json.dumps(meta))
+
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporario = destino.with_name(destino.name + '.tmp')
+    with open(temporario, 'wb') as arquivo:
+        np.savez(arquivo, **arrays)
+    os.replace(temporario, destino)
+
+
+def carregar_cache(origem: Path, usecols: Optional[List[str]] = None) -> pd.DataFrame:
+    """Carregar um DataFrame do layout colunar, lendo apenas as colunas pedidas"""
+    with np.load(origem, allow_pickle=False) as dados:
+        meta = json.loads(str(dados[CHAVE_META]))
+        colunas = {}
+
+        for info in meta['colunas']:
+            if usecols is not None and info['nome'] not in usecols:
+                continue
+
+            if info['tipo'] == 'texto':
+                codigos = dados[info['chave']]
+                unicos = dados[f"{info['chave']}_unicos"].astype(object)
+                valores = unicos.take(np.maximum(codigos, 0)) if len(unicos) else np.empty(len(codigos), dtype=object)
+                valores[codigos < 0] = np.nan
+                colunas[info['nome']] = valores
+            else:
+                colunas[info['nome']] = dados[info['chave']]
+
+    return pd.DataFrame(colunas, copy=False)
+
+
+def _remover_caches_antigos(caminho_csv: str, dir_cache: str, atual: Path):
+    """Remover caches do mesmo CSV gerados a partir de conteúdos anteriores"""
+    for antigo in Path(dir_cache).glob(f"{Path(caminho_csv).stem}-v*.npz"):
+        if antigo != atual:
+            antigo.unlink(missing_ok=True)
+
+
+def ler_csv_com_cache(caminho_csv: str, dir_cache: str,
+                      usecols: Optional[List[str]] = None) -> Tuple[pd.DataFrame, str]:
+    """Ler um CSV convertendo-o para o cache colunar na primeira leitura
+
+    Retorna o DataFrame e o hash do conteúdo do arquivo de origem.
+    """
+    hash_arquivo = calcular_hash_arquivo(caminho_csv)
+    destino = caminho_cache(caminho_csv, dir_cache, hash_arquivo)
+
+    if destino.exists():
+        try:
+            return carregar_cache(destino, usecols), hash_arquivo
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Cache inválido em '{destino}', recriando: {e}")
+
+    df = pd.read_csv(caminho_csv)
+    salvar_cache(df, destino)
+    _remover_caches_antigos(caminho_csv, dir_cache, destino)
+
+    if usecols is not None:
+        df = df[[c for c in df.columns if c in usecols]]
+
+    return df, hash_arquivo
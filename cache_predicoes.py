@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Cache de Predições do Sistema de Manutenção Preditiva
+Memoriza as probabilidades de vetores de features repetidos (máquinas paradas repetem a mesma
+leitura por horas): chave de 64 bits calculada de forma vetorizada sobre as features (opcionalmente
+arredondadas), ligada à versão do modelo; cada lote é deduplicado, consultado e só as linhas
+inéditas são pontuadas, com descarte LRU acima do número máximo de entradas
+"""
+
+import hashlib
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from registro_modelos import selecionar_linhas
+
+# Constantes do finalizador splitmix64 (mistura de 64 bits)
+_MISTURA_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MISTURA_2 = np.uint64(0x94D049BB133111EB)
+_DOURADO = 0x9E3779B97F4A7C15
+
+
+def _misturar(z: np.ndarray) -> np.ndarray:
+    """Finalizador splitmix64: espalha cada bit de entrada por toda a chave (aritmética módulo 2^64)"""
+    z = (z ^ (z >> np.uint64(30))) * _MISTURA_1
+    z = (z ^ (z >> np.uint64(27))) * _MISTURA_2
+    return z ^ (z >> np.uint64(31))
+
+
+def versao_modelo(modelo=None, caminho: Optional[str] = None) -> str:
+    """Identificador da versão do modelo: hash do arquivo salvo, do manifesto (artefato ou registro)
+    ou, para um modelo só em memória, do objeto serializado"""
+    if caminho is not None:
+        caminho = Path(caminho)
+        if caminho.is_dir():
+            for nome in ('manifesto.json', 'registro.json'):
+                if (caminho / nome).exists():
+                    caminho = caminho / nome
+                    break
+        sha = hashlib.sha256()
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(1 << 20), b''):
+                sha.update(bloco)
+        return sha.hexdigest()
+
+    import joblib
+    return joblib.hash(modelo)
+
+
+class CachePredicoes:
+    """Cache LRU de probabilidades por vetor de features, válido para uma versão do modelo
+
+    casas_decimais arredonda as features numéricas antes do hash (None = valores exatos): leituras
+    no mesmo intervalo recebem a pontuação da primeira delas. As probabilidades ficam numa matriz
+    pré-alocada (max_entradas, n_alvos); o índice guarda chave -> linha em ordem de uso.
+    """
+
+    def __init__(self, pontuar: Callable, features_numericas: List[str], features_categoricas: List[str],
+                 n_alvos: int, versao: str, max_entradas: int = 100_000, casas_decimais: Optional[int] = None):
+        self.pontuar = pontuar
+        self.features_numericas = features_numericas
+        self.features_categoricas = features_categoricas
+        self.casas_decimais = casas_decimais
+        self.max_entradas = max_entradas
+        self.versao = versao
+        # A versão entra na semente: a mesma leitura tem chaves diferentes em modelos diferentes
+        self._semente = np.uint64(int(hashlib.sha256(versao.encode('utf-8')).hexdigest()[:16], 16))
+
+        self._probabilidades = np.zeros((max_entradas, n_alvos))
+        self._indice: 'OrderedDict[int, int]' = OrderedDict()
+        self._trava = threading.Lock()
+
+        self.linhas = 0
+        self.acertos = 0
+        self.repetidas_no_lote = 0
+        self.pontuadas = 0
+        self.despejos = 0
+        self.tempo_chaves = 0.0
+        self.tempo_pontuacao = 0.0
+        self.tempo_total = 0.0
+
+    def chaves(self, X) -> np.ndarray:
+        """Chave de 64 bits de cada linha de X (DataFrame ou dicionário coluna -> array)"""
+        h = None
+        for i, col in enumerate(self.features_numericas):
+            valores = np.asarray(X[col], dtype=np.float64)
+            if self.casas_decimais is not None:
+                valores = np.round(valores, self.casas_decimais)
+            # -0.0 vira 0.0 e todo NaN fica com o mesmo padrão de bits
+            valores = np.where(np.isnan(valores), np.nan, valores + 0.0)
+            h = self._combinar(h, valores.view(np.uint64), i)
+
+        for j, col in enumerate(self.features_categoricas, start=len(self.features_numericas)):
+            unicos, inverso = np.unique(np.asarray(X[col]).astype(str), return_inverse=True)
+            codigos = np.array([zlib.crc32(u.encode('utf-8')) for u in unicos], dtype=np.uint64)
+            h = self._combinar(h, codigos[inverso], j)
+        return h
+
+    def _combinar(self, h: Optional[np.ndarray], valores: np.ndarray, posicao: int) -> np.ndarray:
+        base = self._semente if h is None else h
+        deslocamento = np.uint64(_DOURADO * (posicao + 1) % 2 ** 64)
+        return _misturar(base ^ (valores + deslocamento))
+
+    def prever(self, X) -> np.ndarray:
+        """Probabilidades (n, n_alvos): linhas repetidas no lote pontuadas uma vez, acertos do cache reaproveitados"""
+        inicio = time.perf_counter()
+        chaves = self.chaves(X)
+        unicas, primeira, inverso = np.unique(chaves, return_index=True, return_inverse=True)
+        tempo_chaves = time.perf_counter() - inicio
+
+        resultado = np.empty((len(unicas), self._probabilidades.shape[1]))
+        lista = unicas.tolist()
+        with self._trava:
+            linhas = np.fromiter((self._indice.get(k, -1) for k in lista), dtype=np.int64, count=len(lista))
+            encontradas = np.flatnonzero(linhas >= 0)
+            for i in encontradas:
+                self._indice.move_to_end(lista[i])
+            resultado[encontradas] = self._probabilidades[linhas[encontradas]]
+
+        faltantes = np.flatnonzero(linhas < 0)
+        tempo_pontuacao = 0.0
+        if faltantes.size:
+            inicio_pontuacao = time.perf_counter()
+            resultado[faltantes] = self.pontuar(selecionar_linhas(X, primeira[faltantes]))
+            tempo_pontuacao = time.perf_counter() - inicio_pontuacao
+            with self._trava:
+                self._guardar([lista[i] for i in faltantes], resultado[faltantes])
+
+        acertos = int(np.bincount(inverso, minlength=len(unicas))[encontradas].sum())
+        with self._trava:
+            self.linhas += len(chaves)
+            self.acertos += acertos
+            self.repetidas_no_lote += len(chaves) - acertos - len(faltantes)
+            self.pontuadas += len(faltantes)
+            self.tempo_chaves += tempo_chaves
+            self.tempo_pontuacao += tempo_pontuacao
+            self.tempo_total += time.perf_counter() - inicio
+        return resultado[inverso]
+
+    def _guardar(self, chaves: List[int], probabilidades: np.ndarray):
+        """Inserir entradas novas, reaproveitando as linhas das menos usadas quando o cache está cheio"""
+        for chave, linha_proba in zip(chaves[-self.max_entradas:], probabilidades[-self.max_entradas:]):
+            linha = self._indice.get(chave)
+            if linha is None:
+                if len(self._indice) < self.max_entradas:
+                    linha = len(self._indice)
+                else:
+                    _, linha = self._indice.popitem(last=False)
+                    self.despejos += 1
+                self._indice[chave] = linha
+            self._probabilidades[linha] = linha_proba
+
+    def estatisticas(self) -> Dict:
+        """Taxa de acerto e tempos: acertos vêm do cache, repetidas_no_lote de duplicatas do mesmo lote"""
+        with self._trava:
+            return self._estatisticas()
+
+    def _estatisticas(self) -> Dict:
+        return {
+            'versao_modelo': self.versao[:16],
+            'entradas': len(self._indice),
+            'max_entradas': self.max_entradas,
+            'casas_decimais': self.casas_decimais,
+            'linhas': self.linhas,
+            'acertos': self.acertos,
+            'repetidas_no_lote': self.repetidas_no_lote,
+            'pontuadas': self.pontuadas,
+            'taxa_acerto': 1 - self.pontuadas / self.linhas if self.linhas else 0.0,
+            'despejos': self.despejos,
+            'tempo_chaves_s': round(self.tempo_chaves, 4),
+            'tempo_pontuacao_s': round(self.tempo_pontuacao, 4),
+            'tempo_total_s': round(self.tempo_total, 4),
+        }
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Cache de Pré-processamento do Sistema de Manutenção Preditiva
+Reaproveita o ColumnTransformer ajustado (e as matrizes transformadas) de cada fold
+entre todos os candidatos de uma busca de hiperparâmetros; a chave de cada fold vem dos índices das
+linhas mais um único hash do conjunto inteiro, calculado uma vez por busca
+"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Dict
+
+import joblib
+import numpy as np
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+
+ARQUIVO_ESTATISTICAS = 'estatisticas.log'
+
+# Cache em memória do processo atual (o cache em disco é compartilhado entre os workers)
+_CACHE_MEMORIA: Dict[str, object] = {}
+
+
+def _registrar(dir_cache: str, evento: str, segundos: float, sobrecarga: float):
+    """Registrar um acerto ou falha do cache (linhas curtas em modo append são atômicas)
+
+    segundos é o tempo de cálculo (economizado num acerto); sobrecarga, o custo do próprio cache
+    (chave, leitura e gravação da entrada), descontado da economia.
+    """
+    with open(Path(dir_cache) / ARQUIVO_ESTATISTICAS, 'a') as arquivo:
+        arquivo.write(f"{evento}\t{segundos:.6f}\t{sobrecarga:.6f}\n")
+
+
+def _hash_linhas(X, hash_dados) -> str:
+    """Chave das linhas de X: índices das linhas sobre o hash do conjunto completo (ou hash de X inteiro)"""
+    if hash_dados is None or not hasattr(X, 'index'):
+        return joblib.hash(X)
+    sha = hashlib.sha256(hash_dados.encode())
+    sha.update(np.ascontiguousarray(X.index.to_numpy()).tobytes())
+    sha.update('\x1f'.join(map(str, X.columns)).encode())
+    return sha.hexdigest()
+
+
+def _obter(dir_cache: str, chave: str):
+    """Buscar uma entrada no cache em memória e depois no disco"""
+    if chave in _CACHE_MEMORIA:
+        return _CACHE_MEMORIA[chave]
+
+    caminho = Path(dir_cache) / f"{chave}.joblib"
+    if caminho.exists():
+        entrada = joblib.load(caminho)
+        _CACHE_MEMORIA[chave] = entrada
+        return entrada
+
+    return None
+
+
+def _guardar(dir_cache: str, chave: str, entrada):
+    """Guardar uma entrada no cache em memória e no disco (escrita atômica)"""
+    _CACHE_MEMORIA[chave] = entrada
+
+    caminho = Path(dir_cache) / f"{chave}.joblib"
+    temporario = caminho.with_name(f"{caminho.name}.{os.getpid()}.tmp")
+    joblib.dump(entrada, temporario)
+    os.replace(temporario, caminho)
+
+
+class PreprocessadorMemoizado(BaseEstimator, TransformerMixin):
+    """Envolve o pré-processador e memoiza ajustes e transformações por (linhas do fold, configuração)
+
+    Com hash_dados (hash do DataFrame completo da busca), as linhas de cada fold são identificadas
+    pelos rótulos do índice, sem hashear os dados de novo: válido só para subconjuntos desse DataFrame.
+    """
+
+    def __init__(self, preprocessador, dir_cache, hash_dados=None):
+        self.preprocessador = preprocessador
+        self.dir_cache = dir_cache
+        self.hash_dados = hash_dados
+
+    def _chave_configuracao(self) -> str:
+        """Hash da configuração do pré-processador (não ajustado)"""
+        return joblib.hash(clone(self.preprocessador))
+
+    def fit(self, X, y=None):
+        self.fit_transform(X, y)
+        return self
+
+    def fit_transform(self, X, y=None):
+        inicio = time.perf_counter()
+        chave = f"ajuste-{self._chave_configuracao()}-{_hash_linhas(X, self.hash_dados)}"
+        entrada = _obter(self.dir_cache, chave)
+
+        if entrada is not None:
+            self.preprocessador_, Xt, tempo = entrada
+            _registrar(self.dir_cache, 'acerto', tempo, time.perf_counter() - inicio)
+        else:
+            sobrecarga = time.perf_counter() - inicio
+            inicio_calculo = time.perf_counter()
+            self.preprocessador_ = clone(self.preprocessador)
+            Xt = self.preprocessador_.fit_transform(X, y)
+            tempo = time.perf_counter() - inicio_calculo
+            inicio_gravacao = time.perf_counter()
+            _guardar(self.dir_cache, chave, (self.preprocessador_, Xt, tempo))
+            _registrar(self.dir_cache, 'falha', tempo, sobrecarga + time.perf_counter() - inicio_gravacao)
+
+        self.chave_ajuste_ = chave
+        return Xt
+
+    def transform(self, X):
+        inicio = time.perf_counter()
+        chave = f"transformacao-{self.chave_ajuste_}-{_hash_linhas(X, self.hash_dados)}"
+        entrada = _obter(self.dir_cache, chave)
+
+        if entrada is not None:
+            Xt, tempo = entrada
+            _registrar(self.dir_cache, 'acerto', tempo, time.perf_counter() - inicio)
+            return Xt
+
+        sobrecarga = time.perf_counter() - inicio
+        inicio_calculo = time.perf_counter()
+        Xt = self.preprocessador_.transform(X)
+        tempo = time.perf_counter() - inicio_calculo
+        inicio_gravacao = time.perf_counter()
+        _guardar(self.dir_cache, chave, (Xt, tempo))
+        _registrar(self.dir_cache, 'falha', tempo, sobrecarga + time.perf_counter() - inicio_gravacao)
+        return Xt
+
+    def get_feature_names_out(self, input_features=None):
+        return self.preprocessador_.get_feature_names_out(input_features)
+
+
+def memoizar_preprocessador(pipeline, dir_cache: str, X=None):
+    """Substituir o passo 'preprocessor' do pipeline pela versão memoizada
+
+    X é o DataFrame completo da busca: hasheado uma única vez aqui (com índice sem repetições), os
+    folds passam a ser identificados só pelos seus índices.
+    """
+    Path(dir_cache).mkdir(parents=True, exist_ok=True)
+    hash_dados = None
+    if X is not None and hasattr(X, 'index') and X.index.is_unique:
+        inicio = time.perf_counter()
+        hash_dados = joblib.hash(X)
+        _registrar(dir_cache, 'hash_dados', 0.0, time.perf_counter() - inicio)
+    preprocessador = pipeline.named_steps['preprocessor']
+    return pipeline.set_params(preprocessor=PreprocessadorMemoizado(preprocessador, dir_cache, hash_dados))
+
+
+def desembrulhar_preprocessador(pipeline):
+    """Restaurar o pré-processador ajustado original (o modelo salvo não depende do cache)"""
+    passo = pipeline.named_steps['preprocessor']
+    if isinstance(passo, PreprocessadorMemoizado):
+        pipeline.set_params(preprocessor=passo.preprocessador_)
+    return pipeline
+
+
+def resumir_estatisticas(dir_cache: str) -> Dict[str, float]:
+    """Somar acertos, falhas e tempos registrados por todos os processos
+
+    economia_liquida_s = tempo de cálculo evitado nos acertos - sobrecarga do cache (hash dos
+    dados, chaves, leitura/gravação das entradas e registro) em acertos e falhas.
+    """
+    resumo = {'acertos': 0, 'falhas': 0, 'tempo_economizado_s': 0.0, 'tempo_calculo_s': 0.0,
+              'sobrecarga_s': 0.0, 'economia_liquida_s': 0.0}
+    caminho = Path(dir_cache) / ARQUIVO_ESTATISTICAS
+    if not caminho.exists():
+        return resumo
+
+    with open(caminho) as arquivo:
+        for linha in arquivo:
+            evento, segundos, sobrecarga = linha.split('\t')
+            resumo['sobrecarga_s'] += float(sobrecarga)
+            if evento == 'acerto':
+                resumo['acertos'] += 1
+                resumo['tempo_economizado_s'] += float(segundos)
+            elif evento == 'falha':
+                resumo['falhas'] += 1
+                resumo['tempo_calculo_s'] += float(segundos)
+
+    resumo['economia_liquida_s'] = resumo['tempo_economizado_s'] - resumo['sobrecarga_s']
+    return resumo
+
+
+def limpar_cache_memoria():
+    """Esvaziar o cache em memória do processo atual"""
+    _CACHE_MEMORIA.clear()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Compactação de Dados do Sistema de Manutenção Preditiva
+Representação enxuta dos DataFrames em memória: apenas as colunas usadas, categorias como
+'category', sensores em float32 quando a precisão dos dados permite e inteiros no menor tipo.
+O float32 é só armazenamento: antes do modelo os sensores voltam exatamente aos valores float64
+lidos do CSV (restaurar_float64), então o modelo treina e prevê com os mesmos números do modo normal
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+# Maior número de casas decimais procurado ao verificar se uma coluna cabe em float32
+MAX_CASAS_DECIMAIS = 6
+
+
+def colunas_necessarias(*grupos: Iterable[str]) -> List[str]:
+    """União ordenada (sem repetições) das colunas usadas pelo pipeline"""
+    return list(dict.fromkeys(col for grupo in grupos for col in grupo))
+
+
+def restaurar_float64(valores: np.ndarray, maximo: int = MAX_CASAS_DECIMAIS) -> np.ndarray:
+    """Valores float64 de uma coluna float32: arredondados no menor número de casas decimais que
+    volta aos mesmos float32 em todas as linhas (sem essa casa, só a conversão para float64)
+
+    Para uma coluna medida com N casas, o arredondamento em N casas dá exatamente o float64 lido
+    do CSV (300.1 em vez de 300.1000061035156).
+    """
+    valores = np.asarray(valores)
+    if valores.dtype != np.float32:
+        return valores.astype(np.float64)
+    largos = valores.astype(np.float64)
+    finitos = np.isfinite(valores)
+    for casas in range(maximo + 1):
+        candidatos = np.where(finitos, np.round(largos, casas), largos)
+        if np.array_equal(candidatos.astype(np.float32), valores, equal_nan=True):
+            return candidatos
+    return largos
+
+
+def cabe_em_float32(valores: np.ndarray) -> bool:
+    """True se a coluna guardada em float32 é restaurada exatamente aos mesmos valores float64"""
+    valores = np.asarray(valores, dtype=np.float64)
+    return np.array_equal(restaurar_float64(valores.astype(np.float32)), valores, equal_nan=True)
+
+
+def compactar_dataframe(df: pd.DataFrame, numericas: Iterable[str] = (), categoricas: Iterable[str] = (),
+                        inteiras: Iterable[str] = ()) -> pd.DataFrame:
+    """Novo DataFrame com as colunas convertidas para os tipos compactos
+
+    numericas (float ou inteiras) vão para float32 quando passam em cabe_em_float32, categoricas para
+    'category' e inteiras para o menor tipo inteiro que comporta os valores.
+    """
+    numericas, categoricas, inteiras = set(numericas), set(categoricas), set(inteiras)
+    colunas = {}
+    for col, serie in df.items():
+        if (col in numericas and serie.dtype.kind in 'iuf' and serie.dtype != np.float32
+                and cabe_em_float32(serie.to_numpy(dtype=np.float64))):
+            serie = serie.astype(np.float32)
+        elif col in categoricas and not isinstance(serie.dtype, pd.CategoricalDtype):
+            serie = serie.astype('category')
+        elif col in inteiras and pd.api.types.is_integer_dtype(serie):
+            serie = pd.to_numeric(serie, downcast='unsigned' if (serie >= 0).all() else 'integer')
+        colunas[col] = serie
+    return pd.DataFrame(colunas, index=df.index, copy=False)
+
+
+def memoria_mb(df: pd.DataFrame) -> float:
+    """Memória ocupada pelo DataFrame, incluindo o conteúdo das strings (MB)"""
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def tipos_compactados(antes: pd.DataFrame, depois: pd.DataFrame) -> Dict[str, str]:
+    """Colunas cujo tipo mudou na compactação: {coluna: 'antigo -> novo'}"""
+    return {col: f"{antes[col].dtype} -> {depois[col].dtype}"
+            for col in depois.columns if antes[col].dtype != depois[col].dtype}
+
+
+def restaurar_dataframe(df: pd.DataFrame, colunas: Iterable[str]) -> pd.DataFrame:
+    """Cópia rasa do DataFrame com as colunas float32 de `colunas` de volta aos valores float64"""
+    float32 = [col for col in colunas if col in df.columns and df[col].dtype == np.float32]
+    if not float32:
+        return df
+    return df.assign(**{col: restaurar_float64(df[col].to_numpy()) for col in float32})
+
+
+def preencher_faltantes(df: pd.DataFrame, valores: Dict[str, float]):
+    """fillna in-place com os valores float64 (medianas), mantendo float32 onde continua exato
+
+    Uma coluna float32 só continua float32 se, depois de preenchida, ainda restaura exatamente os
+    valores originais e o valor de preenchimento; do contrário volta a float64 antes do fillna.
+    """
+    for col, valor in valores.items():
+        if col not in df.columns or not df[col].isna().any():
+            continue
+        serie = df[col]
+        if serie.dtype == np.float32:
+            preenchida = serie.fillna(np.float32(valor)).to_numpy()
+            esperado = restaurar_float64(serie.to_numpy())
+            esperado[np.isnan(esperado)] = valor
+            if np.array_equal(restaurar_float64(preenchida), esperado):
+                df[col] = preenchida
+                continue
+            serie = pd.Series(restaurar_float64(serie.to_numpy()), index=df.index, name=col)
+        df[col] = serie.fillna(valor)
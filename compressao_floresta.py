@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Compressão de Florestas do Sistema de Manutenção Preditiva
+Reduz um pipeline treinado ao menor subconjunto de árvores de cada floresta (seleção gulosa) cuja
+AUC de validação fica a até uma tolerância da floresta completa, com poda opcional por
+profundidade e fusão de folhas irmãs de probabilidades próximas
+"""
+
+import copy
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy.stats import rankdata
+from sklearn.metrics import roc_auc_score
+from sklearn.multioutput import MultiOutputClassifier
+
+from dados_compartilhados import tamanho_serializado
+from inferencia import probabilidades_positivas
+from inferencia_compilada import compilar_pipeline
+
+# Marcadores de folha do sklearn (sklearn.tree._tree.TREE_LEAF / TREE_UNDEFINED)
+FOLHA = -1
+INDEFINIDO = -2
+
+
+def auc_colunas(y: np.ndarray, pontuacoes: np.ndarray) -> np.ndarray:
+    """AUC de cada coluna de pontuações contra o mesmo rótulo binário (estatística de Mann-Whitney)
+
+    pontuacoes tem forma (n, ...); empates recebem o posto médio, como em roc_auc_score.
+    """
+    y = np.asarray(y, dtype=bool)
+    positivos = int(y.sum())
+    negativos = len(y) - positivos
+    postos = rankdata(pontuacoes.reshape(len(y), -1), axis=0)
+    soma_positivos = postos[y].sum(axis=0)
+    auc = (soma_positivos - positivos * (positivos + 1) / 2) / (positivos * negativos)
+    return auc.reshape(pontuacoes.shape[1:])
+
+
+def _auc_ponderada(y: np.ndarray, pontuacoes: np.ndarray, saidas: List[int]) -> np.ndarray:
+    """AUC média das saídas avaliáveis, ponderada pelos positivos (average='weighted' do sklearn)
+
+    y: (n, k); pontuacoes: (n, ..., k). Devolve a forma intermediária (...).
+    """
+    pesos = np.array([y[:, s].sum() for s in saidas], dtype=np.float64)
+    aucs = np.stack([auc_colunas(y[:, s], pontuacoes[..., s]) for s in saidas], axis=-1)
+    return aucs @ (pesos / pesos.sum())
+
+
+def _saidas_avaliaveis(floresta, saidas: List[int], y: np.ndarray) -> List[int]:
+    """Saídas com duas classes no treino e os dois rótulos presentes na validação"""
+    avaliaveis = []
+    for k, s in enumerate(saidas):
+        classes = floresta.classes_[s] if isinstance(floresta.classes_, list) else floresta.classes_
+        if len(classes) == 2 and 0 < y[:, k].sum() < len(y):
+            avaliaveis.append(k)
+    return avaliaveis
+
+
+def probabilidades_por_arvore(arvores, Xt: np.ndarray, saidas: List[int]) -> np.ndarray:
+    """Probabilidade positiva de cada árvore para cada saída: matriz (n, n_arvores, n_saidas)"""
+    resultado = np.zeros((Xt.shape[0], len(arvores), len(saidas)))
+    for t, arvore in enumerate(arvores):
+        probas = arvore.predict_proba(Xt, check_input=False)
+        if not isinstance(probas, list):
+            probas = [probas]
+        for k, s in enumerate(saidas):
+            if probas[s].shape[1] == 2:
+                resultado[:, t, k] = probas[s][:, 1]
+    return resultado
+
+
+def selecionar_arvores(probabilidades: np.ndarray, y: np.ndarray, saidas: List[int], controle: np.ndarray,
+                       auc_alvo: float, auc_alvo_controle: float) -> List[int]:
+    """Seleção gulosa: adicionar a árvore que mais aumenta a AUC até atingir o alvo nas duas metades
+
+    As árvores são escolhidas pela AUC das linhas de seleção (~controle), avaliando todas as
+    candidatas de uma vez; a parada exige também o alvo nas linhas de controle, que não participam
+    da escolha (sem isso a seleção se ajusta ao ruído da validação). A soma das probabilidades
+    ordena as linhas como a média, então a divisão é dispensada.
+    """
+    selecao = ~controle
+    restantes = list(range(probabilidades.shape[1]))
+    selecionadas: List[int] = []
+    soma = np.zeros((probabilidades.shape[0], probabilidades.shape[2]))
+
+    while restantes:
+        candidatas = soma[selecao][:, None, :] + probabilidades[selecao][:, restantes, :]
+        aucs = _auc_ponderada(y[selecao], candidatas, saidas)
+        melhor = int(np.argmax(aucs))
+        arvore = restantes.pop(melhor)
+        selecionadas.append(arvore)
+        soma += probabilidades[:, arvore, :]
+        if (aucs[melhor] >= auc_alvo
+                and _auc_ponderada(y[controle], soma[controle], saidas) >= auc_alvo_controle):
+            break
+
+    return selecionadas
+
+
+def podar_arvore(arvore, profundidade_max: Optional[int] = None, fusao_folhas: float = 0.0):
+    """Cópia da árvore com os nós abaixo de profundidade_max removidos e folhas irmãs fundidas
+
+    Duas folhas irmãs viram uma (o nó pai) quando a probabilidade de cada classe difere no máximo
+    fusao_folhas em todas as saídas. Os nós internos guardam a distribuição de classes das amostras
+    que passaram por eles, então o pai transformado em folha já tem o valor correto.
+    """
+    estado = arvore.tree_.__getstate__()
+    nos, valores = estado['nodes'], estado['values']
+    n_nos = len(nos)
+    esquerda, direita = nos['left_child'], nos['right_child']
+
+    profundidade = np.zeros(n_nos, dtype=np.int64)
+    for i in range(n_nos):  # no sklearn os filhos sempre têm índice maior que o pai
+        if esquerda[i] != FOLHA:
+            profundidade[esquerda[i]] = profundidade[direita[i]] = profundidade[i] + 1
+
+    folha = esquerda == FOLHA
+    if profundidade_max is not None:
+        folha |= profundidade >= profundidade_max
+
+    if fusao_folhas > 0:
+        totais = valores.sum(axis=2, keepdims=True)
+        distribuicao = valores / np.where(totais > 0, totais, 1.0)
+        for i in range(n_nos - 1, -1, -1):
+            if folha[i]:
+                continue
+            e, d = esquerda[i], direita[i]
+            if folha[e] and folha[d] and np.abs(distribuicao[e] - distribuicao[d]).max() <= fusao_folhas:
+                folha[i] = True
+
+    mantido = np.zeros(n_nos, dtype=bool)
+    mantido[0] = True
+    for i in range(n_nos):
+        if mantido[i] and not folha[i]:
+            mantido[esquerda[i]] = mantido[direita[i]] = True
+
+    novo_indice = np.cumsum(mantido) - 1
+    novos_nos = nos[mantido].copy()
+    folhas_novas = folha[mantido]
+    internos = ~folhas_novas
+    novos_nos['left_child'][internos] = novo_indice[novos_nos['left_child'][internos]]
+    novos_nos['right_child'][internos] = novo_indice[novos_nos['right_child'][internos]]
+    novos_nos['left_child'][folhas_novas] = FOLHA
+    novos_nos['right_child'][folhas_novas] = FOLHA
+    novos_nos['feature'][folhas_novas] = INDEFINIDO
+    novos_nos['threshold'][folhas_novas] = INDEFINIDO
+
+    classe, argumentos, _ = arvore.tree_.__reduce__()
+    arvore_nova = classe(*argumentos)
+    arvore_nova.__setstate__({
+        'max_depth': int(profundidade[mantido].max()),
+        'node_count': int(mantido.sum()),
+        'nodes': novos_nos,
+        'values': np.ascontiguousarray(valores[mantido]),
+    })
+
+    podada = copy.copy(arvore)
+    podada.tree_ = arvore_nova
+    return podada
+
+
+def _comprimir_floresta(floresta, saidas: List[int], Xt: np.ndarray, y: np.ndarray, controle: np.ndarray,
+                        tolerancia: float, profundidade_max: Optional[int], fusao_folhas: float) -> Dict:
+    """Comprimir uma floresta (in-place) e devolver o que foi feito com ela"""
+    n_original = len(floresta.estimators_)
+    nos_original = sum(a.tree_.node_count for a in floresta.estimators_)
+    avaliaveis = [k for k in _saidas_avaliaveis(floresta, saidas, y[~controle])
+                  if k in _saidas_avaliaveis(floresta, saidas, y[controle])]
+    registro = {'arvores_original': n_original, 'nos_original': nos_original}
+
+    if not avaliaveis:
+        # Sem AUC para comparar (alvo constante no treino ou sem positivos na validação): nada muda
+        registro.update({'arvores': n_original, 'nos': nos_original, 'auc_original': None, 'auc': None,
+                         'podada': False, 'motivo': 'AUC indefinida na validação'})
+        return registro
+
+    def auc(probabilidades, linhas=slice(None)):
+        return float(_auc_ponderada(y[linhas], probabilidades[linhas].sum(axis=1), avaliaveis))
+
+    probabilidades = probabilidades_por_arvore(floresta.estimators_, Xt, saidas)
+    auc_alvo = auc(probabilidades, ~controle) - tolerancia
+    auc_alvo_controle = auc(probabilidades, controle) - tolerancia
+    registro['auc_original'] = auc(probabilidades)
+    registro['auc_controle_original'] = auc(probabilidades, controle)
+
+    arvores, podada = floresta.estimators_, False
+    if profundidade_max is not None or fusao_folhas > 0:
+        podadas = [podar_arvore(a, profundidade_max, fusao_folhas) for a in floresta.estimators_]
+        probabilidades_podadas = probabilidades_por_arvore(podadas, Xt, saidas)
+        # A poda só é mantida se a floresta podada inteira ainda respeitar a tolerância nas duas metades
+        if (auc(probabilidades_podadas, ~controle) >= auc_alvo
+                and auc(probabilidades_podadas, controle) >= auc_alvo_controle):
+            arvores, probabilidades, podada = podadas, probabilidades_podadas, True
+
+    selecionadas = selecionar_arvores(probabilidades, y, avaliaveis, controle, auc_alvo, auc_alvo_controle)
+    floresta.estimators_ = [arvores[t] for t in selecionadas]
+    floresta.n_estimators = len(selecionadas)
+
+    registro.update({
+        'arvores': len(selecionadas),
+        'nos': sum(a.tree_.node_count for a in floresta.estimators_),
+        'auc': auc(probabilidades[:, selecionadas, :]),
+        'auc_controle': auc(probabilidades[:, selecionadas, :], controle),
+        'podada': podada,
+    })
+    return registro
+
+
+def dividir_controle(y: np.ndarray, semente: int = 42) -> np.ndarray:
+    """Máscara com metade das linhas de validação (estratificada por linha com alguma falha) para controle"""
+    rng = np.random.default_rng(semente)
+    controle = np.zeros(len(y), dtype=bool)
+    alguma_falha = np.asarray(y).any(axis=1)
+    for grupo in (alguma_falha, ~alguma_falha):
+        linhas = rng.permutation(np.flatnonzero(grupo))
+        controle[linhas[:len(linhas) // 2]] = True
+    return controle
+
+
+def medir_latencia(prever, X, repeticoes_linha: int = 50) -> Dict[str, float]:
+    """Latência de um lote inteiro (ms por 1000 linhas) e de uma única linha (mediana, ms)"""
+    inicio = time.perf_counter()
+    prever(X)
+    lote = (time.perf_counter() - inicio) / len(X) * 1e6
+
+    linha = X.iloc[:1] if hasattr(X, 'iloc') else X[:1]
+    tempos = []
+    for _ in range(repeticoes_linha):
+        inicio = time.perf_counter()
+        prever(linha)
+        tempos.append(time.perf_counter() - inicio)
+    return {'lote_ms_por_1000': lote, 'linha_ms': float(np.median(tempos)) * 1000}
+
+
+def comprimir_pipeline(pipeline, X_val, y_val, alvos: List[str], tolerancia: float = 0.005,
+                       profundidade_max: Optional[int] = None, fusao_folhas: float = 0.0, semente: int = 42):
+    """Cópia comprimida do pipeline e relatório de árvores, nós, AUC, tamanho e latência por alvo"""
+    comprimido = copy.deepcopy(pipeline)
+    classificador = comprimido.named_steps['classifier']
+    Xt = np.asarray(comprimido.named_steps['preprocessor'].transform(X_val), dtype=np.float32)
+    y = np.asarray(y_val)
+    controle = dividir_controle(y, semente)
+
+    por_alvo = {}
+    if isinstance(classificador, MultiOutputClassifier):
+        # Uma floresta por alvo, comprimida separadamente
+        for i, (alvo, floresta) in enumerate(zip(alvos, classificador.estimators_)):
+            por_alvo[alvo] = _comprimir_floresta(floresta, [0], Xt, y[:, [i]], controle,
+                                                 tolerancia, profundidade_max, fusao_folhas)
+    else:
+        # Floresta multi-saída: as árvores são compartilhadas, então a seleção usa a AUC ponderada dos alvos
+        por_alvo['todos'] = _comprimir_floresta(classificador, list(range(len(alvos))), Xt, y, controle,
+                                                tolerancia, profundidade_max, fusao_folhas)
+
+    relatorio = {
+        'tolerancia_auc': tolerancia,
+        'profundidade_max': profundidade_max,
+        'fusao_folhas': fusao_folhas,
+        'por_alvo': por_alvo,
+    }
+    for nome, modelo in (('original', pipeline), ('comprimido', comprimido)):
+        compilado = compilar_pipeline(modelo)
+        probabilidades = probabilidades_positivas(modelo.predict_proba(X_val))
+        relatorio[nome] = {
+            'arvores': len(compilado.raizes),
+            'nos': len(compilado.esquerda),
+            'tamanho_mb': tamanho_serializado(modelo) / 2 ** 20,
+            'auc_validacao': float(roc_auc_score(y, probabilidades, average='weighted')),
+            'latencia_sklearn': medir_latencia(modelo.predict_proba, X_val),
+            'latencia_compilado': medir_latencia(compilado.prever_proba, X_val),
+        }
+    return comprimido, relatorio
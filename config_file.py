@@ -7,7 +7,7 @@ Centraliza todas as configurações do projeto
 import os
 from pathlib import Path
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 
 @dataclass
 class ConfiguracaoProjeto:
@@ -24,6 +24,10 @@ class ConfiguracaoProjeto:
     CAMINHO_DADOS_TESTE: str = "data/bootcamp_test.csv"
     CAMINHO_SUBMISSION: str = "outputs/submission.csv"
     CAMINHO_MODELO: str = "models/modelo_otimizado.pkl"
+    CAMINHO_MODELO_COMPILADO: str = "models/modelo_compilado.npz"
+    CAMINHO_MEDIANAS: str = "models/medianas_treino.json"
+    CAMINHO_LIMIARES: str = "models/limiares_decisao.json"
+    DIR_ARTEFATO_MODELO: str = "models/artefato"  # arrays .npy mapeáveis em memória + manifesto
     CAMINHO_METRICAS: str = "outputs/metricas.json"
     
     # Diretórios
@@ -32,6 +36,18 @@ class ConfiguracaoProjeto:
     DIR_OUTPUTS: str = "outputs"
     DIR_VISUALIZACOES: str = "visualizations"
     DIR_NOTEBOOKS: str = "notebooks"
+    CRIAR_DIRETORIOS: bool = True  # False nos pontos de entrada só de predição (predicao_rapida.py)
+    DIR_CACHE: str = "data/cache"
+    
+    # Cache colunar dos CSVs (convertidos uma vez, indexados pelo hash do conteúdo)
+    USAR_CACHE_DADOS: bool = True
+    
+    # Modo compacto: ler só as colunas usadas, 'tipo' e rótulos brutos como category, sensores em
+    # float32 (quando a precisão dos dados permite), rótulos limpos em uint8 e ids no menor inteiro
+    DADOS_COMPACTOS: bool = False
+    
+    # Falhar (em vez de apenas reportar) ao encontrar rótulos desconhecidos
+    ROTULOS_ESTRITOS: bool = False
     
     # Features do Modelo
     FEATURES: List[str] = None
@@ -43,15 +59,124 @@ class ConfiguracaoProjeto:
     RANDOM_STATE: int = 42
     TEST_SIZE: float = 0.2
     CV_FOLDS: int = 3
-    N_JOBS: int = -1
+    N_JOBS: int = -1  # orçamento total de núcleos, dividido entre busca e classificador
+    MEMORIA_MAXIMA_MB: Optional[int] = None  # limite de memória para os workers da busca
+    MEMORIA_POR_WORKER_MB: Optional[int] = None  # None = estimado a partir dos dados de treino
+    
+    # Modo do modelo: 'multioutput' (uma floresta por alvo) ou 'nativo' (uma floresta multi-saída)
+    MODO_MODELO: str = "multioutput"
+    
+    # Exportar o modelo treinado para o motor de inferência compilado (arrays planos). Com --motor auto,
+    # predicao_rapida.py só usa o motor compilado abaixo deste número de linhas. O motor compilado
+    # percorre as árvores mais devagar (processo já carregado: perde a partir de ~300 linhas), mas
+    # dispensa ~1 s de importação do sklearn e carga do .pkl. Pontuando um arquivo num processo novo,
+    # com o modelo de 500 árvores do bootcamp: 10k linhas 1,54 s vs 1,88 s; 20k linhas 2,87 s vs 1,80 s
+    EXPORTAR_MODELO_COMPILADO: bool = True
+    LIMITE_LINHAS_COMPILADO: int = 10_000
+    
+    # Compressão pós-treino: menor subconjunto de árvores de cada floresta (seleção gulosa) com AUC
+    # de validação a até TOLERANCIA_AUC_COMPRESSAO da floresta completa; opcionalmente com
+    # profundidade limitada e fusão de folhas irmãs cujas probabilidades diferem até FUSAO_FOLHAS_COMPRESSAO
+    COMPRIMIR_MODELO: bool = False
+    TOLERANCIA_AUC_COMPRESSAO: float = 0.005
+    PROFUNDIDADE_COMPRESSAO: Optional[int] = None
+    FUSAO_FOLHAS_COMPRESSAO: float = 0.0
+    CAMINHO_MODELO_COMPRIMIDO: str = "models/modelo_comprimido.pkl"
+    CAMINHO_RELATORIO_COMPRESSAO: str = "models/relatorio_compressao.json"
+    
+    # Modelos por segmento: um modelo por valor de COLUNAS_SEGMENTO (ex.: 'tipo', ou 'tipo' e 'site')
+    # com os hiperparâmetros do modelo global, gravados em DIR_REGISTRO_MODELOS; segmentos com menos
+    # de MIN_LINHAS_SEGMENTO linhas de treino, ou cuja AUC de validação fica mais de
+    # TOLERANCIA_AUC_SEGMENTO abaixo da do global (None = sem conferência), usam o modelo global.
+    # Na predição, os modelos ficam num cache LRU de até CACHE_MODELOS_MB (soma dos tamanhos dos artefatos)
+    MODELOS_POR_SEGMENTO: bool = False
+    COLUNAS_SEGMENTO: List[str] = None
+    DIR_REGISTRO_MODELOS: str = "models/segmentos"
+    MIN_LINHAS_SEGMENTO: int = 1000
+    TOLERANCIA_AUC_SEGMENTO: Optional[float] = 0.005
+    CACHE_MODELOS_MB: float = 256
+    
+    # Cache de predições: probabilidades memorizadas por vetor de features (arredondado em
+    # CACHE_PREDICOES_CASAS casas decimais; None = valores exatos) e pela versão do modelo, com
+    # até CACHE_PREDICOES_MAX entradas (LRU); só as leituras inéditas de cada lote são pontuadas
+    CACHE_PREDICOES: bool = False
+    CACHE_PREDICOES_MAX: int = 100_000
+    CACHE_PREDICOES_CASAS: Optional[int] = None
+    
+    # Limiar de decisão de cada tipo de falha ajustado na validação (maximiza o F-beta) e gravado
+    # em CAMINHO_LIMIARES para a API; desligado, todos ficam em 0,5 (equivalente a predict)
+    AJUSTAR_LIMIARES: bool = True
+    BETA_LIMIAR: float = 1.0
     
     # Grid de Hiperparâmetros
     PARAM_GRID: Dict[str, List] = None
     
+    # Modo de busca: 'grid' (exaustiva), 'halving' (divisões sucessivas) ou
+    # 'warm_start' (grade exaustiva crescendo cada floresta ao longo de n_estimators)
+    MODO_BUSCA: str = "grid"
+    HALVING_FATOR: int = 3
+    HALVING_RECURSO: str = "n_samples"  # ou um parâmetro, ex.: 'classifier__estimator__n_estimators'
+    HALVING_MIN_RECURSOS: Union[int, str] = "exhaust"
+    HALVING_MAX_RECURSOS: Union[int, str] = "auto"
+    
+    # Matrizes publicadas uma única vez em memória compartilhada (/dev/shm, ou DIR_DADOS_COMPARTILHADOS)
+    # e abertas pelos workers com memory mapping: no warm_start, as matrizes pré-processadas e rótulos
+    # de cada fold; em grid/halving com mais de um worker, as colunas de X (tarefas recebem só posições)
+    DADOS_COMPARTILHADOS: bool = True
+    DIR_DADOS_COMPARTILHADOS: Optional[str] = None
+    
+    # Reaproveitar o pré-processador ajustado de cada fold entre os candidatos da busca.
+    # Desligado por padrão: nos dados do bootcamp o ajuste custa ~12 ms e o ganho líquido
+    # (descontados hash e E/S, impresso ao fim da busca) some no ruído do tempo de parede
+    CACHE_PREPROCESSADOR: bool = False
+    
+    # Versionamento dos dados de treino: pular o retreinamento com dados inalterados, atualizar
+    # de forma incremental quando só há linhas anexadas ('arvores': novas árvores treinadas com as
+    # linhas novas; 'refit': reajuste dos melhores parâmetros) e refazer a busca completa a cada
+    # DIAS_ENTRE_BUSCAS dias ou quando o drift (deslocamento da média em desvios) passa do limiar
+    VERSIONAR_DADOS: bool = False
+    DIR_VERSIONAMENTO: str = "models/versionamento"
+    MODO_INCREMENTAL: str = "arvores"
+    DIAS_ENTRE_BUSCAS: int = 7
+    LIMIAR_DRIFT: float = 0.2
+    
+    # Predição em blocos: None = arquivo inteiro em memória; um número = linhas por bloco
+    # (memória constante, submissão escrita aos poucos), pontuadas por N_WORKERS_PREDICAO threads
+    # (rastreador, registro de modelos e cache de predições são compartilhados entre elas, com travas)
+    TAMANHO_BLOCO_PREDICAO: Optional[int] = None
+    N_WORKERS_PREDICAO: int = 1
+    
+    # Visualizações: 'off' (matplotlib/seaborn nunca importados), 'deferred' (processo em
+    # segundo plano, aguardado no fim do pipeline) ou 'inline' (renderiza e exibe na hora)
+    MODO_VISUALIZACAO: str = "inline"
+    
+    # Instrumentação: tempo, CPU, pico de memória e linhas de cada etapa do pipeline, com trace
+    # no formato Chrome/Perfetto e resumo em CAMINHO_METRICAS (desativada, o custo é desprezível)
+    RASTREAR_EXECUCAO: bool = False
+    CAMINHO_TRACE: str = "outputs/trace_pipeline.json"
+    
+    # Checkpoints dos estágios do pipeline (saída de cada estágio identificada pelo hash das
+    # entradas, do código e dos campos desta configuração que esse código lê): reexecuções pulam
+    # os estágios atualizados. Opcional, desligado por padrão
+    USAR_CHECKPOINTS: bool = False
+    DIR_CHECKPOINTS: str = "models/checkpoints"
+    
     # Configurações da API
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
     API_RELOAD: bool = True
+    API_MAX_LOTE: int = 64
+    API_ESPERA_MAX_MS: float = 5.0
+    API_MAX_CORPO_BYTES: int = 64 * 1024  # maior Content-Length aceito (acima: 413, corpo não lido)
+    
+    # Streaming de sensores (streaming_sensores.py): leituras em JSON por linha, janela circular
+    # por máquina com as últimas STREAM_JANELA leituras e fila limitada entre leitura e pontuação
+    STREAM_PORT: int = 8100
+    STREAM_JANELA: int = 16
+    STREAM_MAX_MAQUINAS: int = 200_000
+    STREAM_FILA_MAX: int = 10_000
+    STREAM_MAX_LOTE: int = 512
+    STREAM_ESPERA_MAX_MS: float = 10.0
     
     # Configurações do Jupyter
     JUPYTER_PORT: int = 8888
@@ -81,6 +206,9 @@ class ConfiguracaoProjeto:
             'FA (Falha Aleatoria)'
         ]
         
+        if self.COLUNAS_SEGMENTO is None:
+            self.COLUNAS_SEGMENTO = ['tipo']
+        
         # Grid de hiperparâmetros
         self.PARAM_GRID = {
             'classifier__estimator__n_estimators': [100, 150, 200],
@@ -91,7 +219,8 @@ class ConfiguracaoProjeto:
         }
         
         # Criar diretórios se não existirem
-        self._criar_diretorios()
+        if self.CRIAR_DIRETORIOS:
+            self._criar_diretorios()
     
     def _criar_diretorios(self):
         """Criar diretórios necessários"""
@@ -175,24 +304,40 @@ class ConfiguracaoProducao(ConfiguracaoProjeto):
 
 
 # Factory para obter configuração baseada no ambiente
-def obter_configuracao(ambiente: str = None) -> ConfiguracaoProjeto:
+def obter_configuracao(ambiente: str = None, criar_diretorios: bool = True) -> ConfiguracaoProjeto:
     """Obter configuração baseada no ambiente"""
     
     if ambiente is None:
         ambiente = os.getenv('AMBIENTE', 'desenvolvimento')
     
     if ambiente.lower() == 'producao':
-        return ConfiguracaoProducao()
+        return ConfiguracaoProducao(CRIAR_DIRETORIOS=criar_diretorios)
     else:
-        return ConfiguracaoDesenvolvimento()
+        return ConfiguracaoDesenvolvimento(CRIAR_DIRETORIOS=criar_diretorios)
+
+
+# Instância global da configuração, criada no primeiro acesso a config_file.config:
+# importar o módulo não cria diretórios
+_config = None
+
+
+def _configuracao_global() -> ConfiguracaoProjeto:
+    global _config
+    if _config is None:
+        _config = obter_configuracao()
+    return _config
+
 
+def __getattr__(nome: str):
+    if nome == 'config':
+        return _configuracao_global()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
-# Instância global da configuração
-config = obter_configuracao()
 
 # Funções utilitárias
 def imprimir_status_ambiente():
     """Imprimir status do ambiente atual"""
+    config = _configuracao_global()
     config.imprimir_configuracao()
     
     print("\n🔍 Validação do Ambiente:")
@@ -205,6 +350,7 @@ def imprimir_status_ambiente():
 
 def obter_variaveis_ambiente() -> Dict[str, Any]:
     """Obter variáveis de ambiente para Docker"""
+    config = _configuracao_global()
     return {
         'PROJECT_NAME': config.NOME_PROJETO,
         'VERSION': config.VERSAO,
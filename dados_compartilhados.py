@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Dados Compartilhados do Sistema de Manutenção Preditiva
+Publica matrizes (features pré-processadas, rótulos, índices dos folds) uma única vez em arquivos
+.npy mapeados em memória, em /dev/shm quando existir; os workers recebem só o nome e a posição
+e abrem as matrizes com memory mapping, sem cópias serializadas por tarefa
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Memória compartilhada do Linux (tmpfs): arquivos ali vivem só na RAM
+DIR_MEMORIA_COMPARTILHADA = '/dev/shm'
+
+# max_nbytes padrão do joblib.Parallel ('1M'): arrays numéricos maiores vão uma única vez para um memmap
+LIMITE_MEMMAP_JOBLIB = 2 ** 20
+
+# Matrizes já abertas no processo atual (cada worker mapeia um arquivo uma única vez)
+_MAPEADAS: Dict[str, np.ndarray] = {}
+
+
+def tamanho_serializado(objeto) -> int:
+    """Bytes do objeto serializado com pickle (o que é enviado a um worker por tarefa)"""
+    return len(pickle.dumps(objeto, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class _ContadorBytes:
+    """Destino de escrita que só conta os bytes recebidos"""
+
+    def __init__(self):
+        self.total = 0
+
+    def write(self, dados):
+        self.total += memoryview(dados).nbytes
+
+
+def medir_envio(objeto, limite_memmap: int = LIMITE_MEMMAP_JOBLIB) -> Tuple[int, Dict[int, int]]:
+    """Bytes serializados por tarefa como o joblib (loky) envia o objeto, sem guardar o pickle
+
+    Arrays numéricos com limite_memmap bytes ou mais (inclusive os blocos de um DataFrame) não entram
+    na conta: o joblib os grava uma vez por chamada em memmap. Devolve também {id do array: bytes}
+    desses arrays, para somar cada um uma única vez entre tarefas.
+    """
+    memmap = {}
+
+    class _Medidor(pickle.Pickler):
+        def reducer_override(self, obj):
+            if isinstance(obj, np.ndarray) and not obj.dtype.hasobject and obj.nbytes >= limite_memmap:
+                memmap[id(obj)] = obj.nbytes
+                return np.empty, (0,)
+            return NotImplemented
+
+    contador = _ContadorBytes()
+    _Medidor(contador, protocol=pickle.HIGHEST_PROTOCOL).dump(objeto)
+    return contador.total, memmap
+
+
+def abrir_compartilhada(caminho: str) -> np.ndarray:
+    """Abrir (só leitura, memory mapping) uma matriz publicada, reaproveitando o mapeamento do processo"""
+    matriz = _MAPEADAS.get(caminho)
+    if matriz is None:
+        matriz = np.load(caminho, mmap_mode='r')
+        _MAPEADAS[caminho] = matriz
+    return matriz
+
+
+class MatrizesCompartilhadas:
+    """Diretório temporário com as matrizes publicadas para os workers; removido ao sair do bloco with"""
+
+    def __init__(self, diretorio_base: Optional[str] = None):
+        if diretorio_base is None:
+            diretorio_base = DIR_MEMORIA_COMPARTILHADA if os.path.isdir(DIR_MEMORIA_COMPARTILHADA) else None
+        self.diretorio = Path(tempfile.mkdtemp(prefix='compartilhado-', dir=diretorio_base))
+        self.caminhos: Dict[str, str] = {}
+        self.bytes_publicados = 0
+
+    def publicar(self, nome: str, matriz: np.ndarray) -> str:
+        """Gravar a matriz uma vez e devolver o caminho a enviar aos workers"""
+        caminho = str(self.diretorio / f"{nome}.npy")
+        np.save(caminho, np.ascontiguousarray(matriz))
+        self.caminhos[nome] = caminho
+        self.bytes_publicados += matriz.nbytes
+        return caminho
+
+    def liberar(self):
+        """Remover os arquivos (mapeamentos já abertos continuam válidos até serem descartados)"""
+        for caminho in self.caminhos.values():
+            _MAPEADAS.pop(caminho, None)
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.liberar()
+
+
+def resumir_memoria_workers(medicoes) -> Dict[int, Dict[str, float]]:
+    """RSS de cada worker antes da primeira e depois da última tarefa (MB)
+
+    medicoes: (pid, instante de início, RSS inicial em kB, RSS final em kB) de cada tarefa.
+    """
+    resumo = {}
+    for pid, inicio, antes_kb, depois_kb in sorted(medicoes, key=lambda m: m[1]):
+        if antes_kb is None:
+            continue
+        registro = resumo.setdefault(pid, {'antes_mb': antes_kb / 1024, 'tarefas': 0})
+        registro['depois_mb'] = depois_kb / 1024
+        registro['tarefas'] += 1
+    return resumo
+
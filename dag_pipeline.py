@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Grafo de Estágios do Sistema de Manutenção Preditiva
+Executa os estágios do pipeline em ordem topológica, gravando a saída de cada um em um checkpoint
+identificado pelo hash das entradas, do código e das configurações relevantes; estágios com
+checkpoint atualizado são pulados (ou restaurados, quando um estágio posterior precisa da saída)
+"""
+
+import ast
+import hashlib
+import inspect
+import json
+import os
+import re
+import sys
+import textwrap
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import joblib
+
+from instrumentacao import Rastreador
+
+ARQUIVO_ESTADO = 'estado.json'
+
+# Só módulos deste diretório entram na versão do código (bibliotecas instaladas ficam de fora)
+RAIZ_PROJETO = Path(__file__).resolve().parent
+
+# Ações possíveis para um estágio em uma execução
+EXECUTAR, RESTAURAR, PULAR = 'executar', 'restaurar', 'pular'
+
+# Campos da configuração que não mudam a saída de nenhum estágio (só observam ou guardam a execução)
+CAMPOS_SEM_EFEITO = frozenset({'RASTREAR_EXECUCAO', 'CAMINHO_TRACE', 'USAR_CHECKPOINTS', 'DIR_CHECKPOINTS'})
+
+# Nomes de campo citados no código: self.config.X, config.X ou 'X' (getattr, listas de campos)
+PADRAO_CAMPO = re.compile(r'\b[A-Z][A-Z0-9_]*\b')
+
+
+@dataclass
+class Estagio:
+    """Nó do grafo: produz uma saída a partir das saídas das dependências"""
+    nome: str
+    executar: Callable[[Dict[str, Any]], Any]  # recebe as saídas já disponíveis, devolve a sua
+    dependencias: List[str] = field(default_factory=list)
+    restaurar: Optional[Callable[[Any], None]] = None  # reaplica uma saída lida do checkpoint
+    codigo: List[Any] = field(default_factory=list)  # código extra, além de executar, que entra na chave
+    configuracao: List[str] = field(default_factory=list)  # campos extras, além dos lidos pelo código
+    entradas: Dict[str, Any] = field(default_factory=dict)  # valores externos (hash de arquivos, parâmetros)
+    arquivos: List[str] = field(default_factory=list)  # arquivos gerados que precisam continuar existindo
+    linhas: Optional[Callable[[Any], Optional[int]]] = None  # linhas processadas, para a instrumentação
+
+
+def _fonte(objeto) -> str:
+    try:
+        return inspect.getsource(objeto)
+    except (OSError, TypeError):
+        return f"{getattr(objeto, '__module__', '')}.{getattr(objeto, '__qualname__', repr(objeto))}"
+
+
+def _modulo_do_projeto(modulo) -> bool:
+    arquivo = getattr(modulo, '__file__', None)
+    return arquivo is not None and Path(arquivo).resolve().parent == RAIZ_PROJETO
+
+
+def _modulo_de(objeto):
+    """Módulo onde o objeto foi definido (o próprio objeto, se for um módulo)"""
+    return objeto if inspect.ismodule(objeto) else sys.modules.get(getattr(objeto, '__module__', None) or '')
+
+
+def _nomes_lidos(codigo) -> Set[str]:
+    """Nomes globais e atributos lidos pelo código, inclusive em funções e lambdas aninhadas"""
+    nomes = set(codigo.co_names)
+    for constante in codigo.co_consts:
+        if inspect.iscode(constante):
+            nomes |= _nomes_lidos(constante)
+    return nomes
+
+
+def _atributos_instancia(classe) -> Dict[str, Set[str]]:
+    """Nomes usados em cada atribuição self.<atributo> = ... do __init__ da classe"""
+    try:
+        arvore = ast.parse(textwrap.dedent(inspect.getsource(classe.__init__)))
+    except (OSError, TypeError, SyntaxError):
+        return {}
+    atributos = {}
+    for no in ast.walk(arvore):
+        if not isinstance(no, ast.Assign):
+            continue
+        for alvo in no.targets:
+            if isinstance(alvo, ast.Attribute) and isinstance(alvo.value, ast.Name) and alvo.value.id == 'self':
+                atributos.setdefault(alvo.attr, set()).update(
+                    n.id for n in ast.walk(no.value) if isinstance(n, ast.Name))
+    return atributos
+
+
+def dependencias_codigo(objetos: List[Any], ignorar: Set[str] = frozenset()) -> Dict[str, str]:
+    """Código-fonte de tudo o que os objetos alcançam no projeto, por nome qualificado
+
+    No módulo de cada função a busca segue, função a função, os nomes globais lidos e os atributos
+    da classe dona (self.metodo, e self.atributo pelo que o __init__ atribui a ele; o __init__ entra
+    sempre). Um nome de outro módulo do projeto traz o módulo inteiro e os módulos do projeto que
+    ele importa. Módulos em ignorar (p. ex. o da configuração, que entra na chave por valor) ficam de fora.
+    """
+    fontes: Dict[str, str] = {}
+    modulos = []
+    vistos = set()
+    pendentes = list(objetos)
+
+    def incluir_modulo(modulo):
+        if (modulo is not None and _modulo_do_projeto(modulo) and modulo.__name__ not in ignorar
+                and f"modulo:{modulo.__name__}" not in fontes):
+            fontes[f"modulo:{modulo.__name__}"] = _fonte(modulo)
+            modulos.append(modulo)
+
+    while pendentes:
+        objeto = pendentes.pop()
+        if isinstance(objeto, property):
+            pendentes.extend(f for f in (objeto.fget, objeto.fset) if f is not None)
+            continue
+        objeto = inspect.unwrap(getattr(objeto, '__func__', objeto))
+        modulo = _modulo_de(objeto)
+        if inspect.ismodule(objeto) or not (inspect.isfunction(objeto) or inspect.isclass(objeto)):
+            incluir_modulo(modulo)
+            continue
+        if modulo is None or not _modulo_do_projeto(modulo) or modulo.__name__ in ignorar:
+            continue
+        if id(objeto) in vistos:
+            continue
+        vistos.add(id(objeto))
+        fonte = _fonte(objeto)
+        nome = f"{modulo.__name__}.{objeto.__qualname__}"
+        if nome in fontes:
+            # Lambdas e funções locais repetem o nome qualificado
+            nome += '#' + hashlib.sha256(fonte.encode('utf-8')).hexdigest()[:12]
+        fontes[nome] = fonte
+        if inspect.isclass(objeto):
+            pendentes.extend(v for v in vars(objeto).values() if inspect.isfunction(v) or isinstance(v, property))
+            continue
+
+        dona = objeto.__globals__.get(objeto.__qualname__.split('.')[0])
+        dona = dona if inspect.isclass(dona) else None
+        atributos = _atributos_instancia(dona) if dona is not None else {}
+        if dona is not None and '__init__' in vars(dona):
+            fontes[f"{modulo.__name__}.{dona.__qualname__}.__init__ (estado)"] = _fonte(dona.__init__)
+
+        nomes = _nomes_lidos(objeto.__code__)
+        for nome_lido in set(nomes):
+            nomes |= atributos.get(nome_lido, set())
+        for nome_lido in sorted(nomes):
+            if dona is not None and nome_lido in vars(dona) and nome_lido != '__init__':
+                pendentes.append(vars(dona)[nome_lido])
+            if nome_lido not in objeto.__globals__:
+                continue
+            valor = objeto.__globals__[nome_lido]
+            if _modulo_de(valor) is modulo and not inspect.ismodule(valor):
+                if inspect.isfunction(valor) or inspect.isclass(valor):
+                    pendentes.append(valor)
+                elif isinstance(valor, (str, int, float, bool, tuple, list, dict, frozenset, type(None))):
+                    fontes[f"{modulo.__name__}.{nome_lido}"] = repr(valor)
+            else:
+                incluir_modulo(_modulo_de(valor))
+
+    # Módulos inteiros: os módulos do projeto que eles importam também entram
+    while modulos:
+        for valor in list(vars(modulos.pop()).values()):
+            incluir_modulo(_modulo_de(valor))
+    return fontes
+
+
+def hash_fontes(fontes: Dict[str, str]) -> str:
+    """Hash de um conjunto de fontes por nome (saída de dependencias_codigo)"""
+    sha = hashlib.sha256()
+    for nome, fonte in sorted(fontes.items()):
+        sha.update(nome.encode('utf-8'))
+        sha.update(fonte.encode('utf-8'))
+    return sha.hexdigest()
+
+
+def versao_codigo(objetos: List[Any], ignorar: Set[str] = frozenset()) -> str:
+    """Hash do código-fonte de funções, classes ou módulos e de tudo o que eles alcançam no projeto"""
+    return hash_fontes(dependencias_codigo(objetos, ignorar))
+
+
+def campos_lidos(fontes: Dict[str, str], config) -> List[str]:
+    """Campos da configuração citados no código alcançado por um estágio (ver dependencias_codigo)
+
+    A busca é textual: um nome de campo em qualquer fonte alcançada conta como lido. Pode incluir
+    campos a mais (só invalidam o checkpoint com mais frequência), nunca deixa de fora um lido.
+    """
+    citados = set()
+    for fonte in fontes.values():
+        citados.update(PADRAO_CAMPO.findall(fonte))
+    return sorted((citados & set(vars(config))) - CAMPOS_SEM_EFEITO)
+
+
+class DepositoCheckpoints:
+    """Último checkpoint de cada estágio (um arquivo joblib por estágio) e o índice estado.json"""
+
+    def __init__(self, diretorio: str):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+        self.estado: Dict[str, Dict] = {}
+        caminho = self.diretorio / ARQUIVO_ESTADO
+        if caminho.exists():
+            with open(caminho, encoding='utf-8') as f:
+                self.estado = json.load(f)
+
+    def valido(self, estagio: Estagio, chave: str) -> bool:
+        """Checkpoint com a mesma chave, arquivo presente e arquivos gerados ainda existentes"""
+        registro = self.estado.get(estagio.nome)
+        return (registro is not None and registro['chave'] == chave
+                and (self.diretorio / registro['arquivo']).exists()
+                and all(os.path.exists(caminho) for caminho in estagio.arquivos))
+
+    def carregar(self, nome: str) -> Any:
+        return joblib.load(self.diretorio / self.estado[nome]['arquivo'])
+
+    def salvar(self, nome: str, chave: str, saida: Any, tempo_s: float):
+        """Gravar a saída de um estágio (de forma atômica) e remover o checkpoint anterior"""
+        arquivo = f"{nome}-{chave[:16]}.joblib"
+        temporario = self.diretorio / f"{arquivo}.tmp"
+        joblib.dump(saida, temporario)
+        os.replace(temporario, self.diretorio / arquivo)
+
+        anterior = self.estado.get(nome, {}).get('arquivo')
+        if anterior not in (None, arquivo):
+            (self.diretorio / anterior).unlink(missing_ok=True)
+
+        self.estado[nome] = {
+            'chave': chave,
+            'arquivo': arquivo,
+            'criado_em': datetime.now().isoformat(timespec='seconds'),
+            'tempo_s': round(tempo_s, 3),
+        }
+        temporario = self.diretorio / f"{ARQUIVO_ESTADO}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(self.estado, f, indent=2, ensure_ascii=False)
+        os.replace(temporario, self.diretorio / ARQUIVO_ESTADO)
+
+
+class PipelineDAG:
+    """Executa um conjunto de estágios reaproveitando os checkpoints atualizados
+
+    Sem dir_checkpoints, todos os estágios selecionados são executados e nada é gravado.
+    """
+
+    def __init__(self, estagios: List[Estagio], config, dir_checkpoints: Optional[str] = None,
+                 rastreador: Optional[Rastreador] = None):
+        self.estagios = {estagio.nome: estagio for estagio in estagios}
+        self.config = config
+        self.deposito = DepositoCheckpoints(dir_checkpoints) if dir_checkpoints else None
+        self.rastreador = rastreador or Rastreador(ativo=False)
+        self.saidas: Dict[str, Any] = {}
+
+        for estagio in estagios:
+            desconhecidas = [d for d in estagio.dependencias if d not in self.estagios]
+            if desconhecidas:
+                raise ValueError(f"Estágio '{estagio.nome}' depende de estágios inexistentes: {desconhecidas}")
+        self.ordem = list(TopologicalSorter({e.nome: e.dependencias for e in estagios}).static_order())
+
+    def chaves(self) -> Dict[str, str]:
+        """Chave de cada estágio: código, configuração, entradas externas e chaves das dependências"""
+        # A configuração entra por valor (campos lidos pelo código do estágio), não pelo código do seu módulo
+        ignorar = {type(self.config).__module__}
+        chaves = {}
+        for nome in self.ordem:
+            estagio = self.estagios[nome]
+            fontes = dependencias_codigo([estagio.executar] + estagio.codigo, ignorar)
+            campos = set(campos_lidos(fontes, self.config)) | set(estagio.configuracao)
+            conteudo = {
+                'estagio': nome,
+                'versao_projeto': self.config.VERSAO,
+                'codigo': hash_fontes(fontes),
+                'configuracao': {campo: getattr(self.config, campo) for campo in sorted(campos)},
+                'entradas': estagio.entradas,
+                'dependencias': {dep: chaves[dep] for dep in estagio.dependencias},
+            }
+            texto = json.dumps(conteudo, sort_keys=True, default=str, ensure_ascii=False)
+            chaves[nome] = hashlib.sha256(texto.encode('utf-8')).hexdigest()
+        return chaves
+
+    def descendentes(self, nome: str) -> List[str]:
+        """O estágio e todos os que dependem dele, direta ou indiretamente"""
+        resultado = {nome}
+        for atual in self.ordem:
+            if any(dep in resultado for dep in self.estagios[atual].dependencias):
+                resultado.add(atual)
+        return [n for n in self.ordem if n in resultado]
+
+    def planejar(self, chaves: Dict[str, str], a_partir_de: Optional[str] = None,
+                 apenas: Optional[str] = None) -> Dict[str, str]:
+        """Decidir a ação de cada estágio
+
+        a_partir_de força o estágio e seus descendentes; apenas força um único estágio. As
+        dependências de um estágio a executar são restauradas do checkpoint ou, sem checkpoint
+        atualizado, também executadas.
+        """
+        for nome in (a_partir_de, apenas):
+            if nome is not None and nome not in self.estagios:
+                raise ValueError(f"Estágio desconhecido: '{nome}' (opções: {self.ordem})")
+
+        def valido(nome):
+            return self.deposito is not None and self.deposito.valido(self.estagios[nome], chaves[nome])
+
+        if apenas is not None:
+            executar = {apenas}
+        else:
+            forcados = set(self.descendentes(a_partir_de)) if a_partir_de else set()
+            executar = {nome for nome in self.ordem if nome in forcados or not valido(nome)}
+
+        restaurar = set()
+        for nome in reversed(self.ordem):
+            if nome not in executar:
+                continue
+            for dep in self.estagios[nome].dependencias:
+                if dep not in executar:
+                    (restaurar if valido(dep) else executar).add(dep)
+
+        return {nome: EXECUTAR if nome in executar else RESTAURAR if nome in restaurar else PULAR
+                for nome in self.ordem}
+
+    def executar(self, a_partir_de: Optional[str] = None, apenas: Optional[str] = None) -> Dict[str, str]:
+        """Executar o plano; devolve a ação tomada em cada estágio"""
+        chaves = self.chaves()
+        plano = self.planejar(chaves, a_partir_de, apenas)
+
+        for nome in self.ordem:
+            estagio, acao = self.estagios[nome], plano[nome]
+            if acao == PULAR:
+                print(f"[estágio] {nome}: checkpoint atualizado, pulado")
+                continue
+
+            with self.rastreador.etapa(nome, acao=acao) as intervalo:
+                if acao == RESTAURAR:
+                    saida = self.deposito.carregar(nome)
+                    if estagio.restaurar is not None:
+                        estagio.restaurar(saida)
+                    print(f"[estágio] {nome}: restaurado do checkpoint")
+                else:
+                    inicio = time.perf_counter()
+                    saida = estagio.executar(self.saidas)
+                    tempo = time.perf_counter() - inicio
+                    if self.deposito is not None:
+                        self.deposito.salvar(nome, chaves[nome], saida, tempo)
+                    print(f"[estágio] {nome}: executado em {tempo:.1f} s")
+
+                self.saidas[nome] = saida
+                if estagio.linhas is not None:
+                    intervalo.linhas = estagio.linhas(saida)
+
+        return plano
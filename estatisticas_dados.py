@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Estatísticas de Dados do Sistema de Manutenção Preditiva
+Acumulador de uma única passada, alimentado por blocos e combinável entre workers: valores
+ausentes, média/desvio/mín./máx. (Welford/Chan), quantis aproximados, frequências de categorias
+e rótulos e estimativa de linhas duplicadas por hash
+"""
+
+import json
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+QUANTIS = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+class AcumuladorEstatisticas:
+    """Estatísticas por coluna acumuladas bloco a bloco; dois acumuladores podem ser mesclados"""
+
+    def __init__(self, colunas_rotulo: Optional[List[str]] = None, tamanho_amostra: int = 4096,
+                 max_categorias: int = 1000, max_hashes: int = 1_000_000, semente: int = 0):
+        self.colunas_rotulo = list(colunas_rotulo or [])
+        self.tamanho_amostra = tamanho_amostra
+        self.max_categorias = max_categorias
+        self.max_hashes = max_hashes
+        self._rng = np.random.default_rng(semente)
+
+        self.linhas = 0
+        self.colunas: List[str] = []
+        self.numericas: List[str] = []
+        self.tipos: Dict[str, set] = {}
+        self.faltantes: Dict[str, int] = {}
+
+        # Momentos por coluna numérica: n, média, M2 (soma dos quadrados dos desvios), mín., máx.
+        self.momentos: Dict[str, List[float]] = {}
+        # Amostra bottom-k por coluna (prioridade aleatória, valor): combinável entre workers
+        self.amostras: Dict[str, tuple] = {}
+
+        self.categorias: Dict[str, Counter] = {}
+        self.categorias_truncadas: Dict[str, bool] = {}
+
+        # Hashes de linha amostrados (h % taxa == 0) -> ocorrências
+        self.taxa_hash = 1
+        self.hashes: Counter = Counter()
+
+    def _registrar_colunas(self, bloco: pd.DataFrame):
+        """Fixar o esquema (e o tipo numérico/categórico de cada coluna) no primeiro bloco"""
+        self.colunas = list(bloco.columns)
+        for col in self.colunas:
+            serie = bloco[col]
+            if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+                self.numericas.append(col)
+                self.momentos[col] = [0, 0.0, 0.0, np.inf, -np.inf]
+                self.amostras[col] = (np.empty(0), np.empty(0))
+            if col not in self.numericas or col in self.colunas_rotulo:
+                self.categorias[col] = Counter()
+                self.categorias_truncadas[col] = False
+            self.tipos[col] = set()
+            self.faltantes[col] = 0
+
+    def atualizar(self, bloco: pd.DataFrame) -> 'AcumuladorEstatisticas':
+        """Incorporar um bloco de linhas"""
+        if not self.colunas:
+            self._registrar_colunas(bloco)
+
+        self.linhas += len(bloco)
+        for col, n in bloco.isna().sum().items():
+            self.faltantes[col] += int(n)
+
+        for col in self.colunas:
+            serie = bloco[col]
+            self.tipos[col].add(str(serie.dtype))
+
+            if col in self.momentos:
+                valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=np.float64)
+                valores = valores[~np.isnan(valores)]
+                if valores.size:
+                    media = valores.mean()
+                    m2 = ((valores - media) ** 2).sum()
+                    self._combinar_momentos(col, [valores.size, media, m2, valores.min(), valores.max()])
+                    self._combinar_amostra(col, (self._rng.random(valores.size), valores))
+
+            if col in self.categorias:
+                contagens = serie.value_counts(dropna=False)
+                self._combinar_categorias(col, Counter({str(k): int(v) for k, v in contagens.items()}))
+
+        self._combinar_hashes(self._hashes_linhas(bloco))
+        return self
+
+    def _hashes_linhas(self, bloco: pd.DataFrame) -> Counter:
+        """Hash de cada linha (numéricas em float64, para não depender do dtype inferido por bloco)"""
+        normalizado = bloco.astype({col: np.float64 for col in self.numericas
+                                    if pd.api.types.is_numeric_dtype(bloco[col])})
+        hashes = pd.util.hash_pandas_object(normalizado, index=False).to_numpy()
+        hashes = hashes[hashes % np.uint64(self.taxa_hash) == 0]
+        unicos, contagens = np.unique(hashes, return_counts=True)
+        return Counter(dict(zip(unicos.tolist(), contagens.tolist())))
+
+    def _combinar_momentos(self, col: str, outro: List[float]):
+        """Fórmula de Chan para combinar (n, média, M2) de duas partições"""
+        n_a, media_a, m2_a, min_a, max_a = self.momentos[col]
+        n_b, media_b, m2_b, min_b, max_b = outro
+        n = n_a + n_b
+        if n == 0:
+            return
+        delta = media_b - media_a
+        self.momentos[col] = [
+            n,
+            media_a + delta * n_b / n,
+            m2_a + m2_b + delta ** 2 * n_a * n_b / n,
+            min(min_a, min_b),
+            max(max_a, max_b),
+        ]
+
+    def _combinar_amostra(self, col: str, outra: tuple):
+        """Manter os tamanho_amostra valores de menor prioridade (amostra uniforme sem reposição)"""
+        prioridades = np.concatenate([self.amostras[col][0], outra[0]])
+        valores = np.concatenate([self.amostras[col][1], outra[1]])
+        if prioridades.size > self.tamanho_amostra:
+            manter = np.argpartition(prioridades, self.tamanho_amostra)[:self.tamanho_amostra]
+            prioridades, valores = prioridades[manter], valores[manter]
+        self.amostras[col] = (prioridades, valores)
+
+    def _combinar_categorias(self, col: str, contagens: Counter):
+        """Somar frequências, mantendo no máximo max_categorias valores (os mais frequentes)"""
+        self.categorias[col].update(contagens)
+        if len(self.categorias[col]) > self.max_categorias:
+            self.categorias[col] = Counter(dict(self.categorias[col].most_common(self.max_categorias)))
+            self.categorias_truncadas[col] = True
+
+    def _combinar_hashes(self, hashes: Counter, taxa: int = 1):
+        """Unir hashes amostrados; ao exceder max_hashes, dobrar a taxa de amostragem e refiltrar"""
+        taxa = max(taxa, self.taxa_hash)
+        if taxa != self.taxa_hash:
+            self._refiltrar_hashes(taxa)
+        self.hashes.update({h: c for h, c in hashes.items() if h % taxa == 0})
+
+        while len(self.hashes) > self.max_hashes:
+            self._refiltrar_hashes(self.taxa_hash * 2)
+
+    def _refiltrar_hashes(self, taxa: int):
+        self.taxa_hash = taxa
+        self.hashes = Counter({h: c for h, c in self.hashes.items() if h % taxa == 0})
+
+    def mesclar(self, outro: 'AcumuladorEstatisticas') -> 'AcumuladorEstatisticas':
+        """Incorporar o estado de outro acumulador (p. ex. de outro worker)"""
+        if not outro.colunas:
+            return self
+        if not self.colunas:
+            self.colunas, self.numericas = list(outro.colunas), list(outro.numericas)
+            self.tipos = {col: set() for col in self.colunas}
+            self.faltantes = {col: 0 for col in self.colunas}
+            self.momentos = {col: [0, 0.0, 0.0, np.inf, -np.inf] for col in self.numericas}
+            self.amostras = {col: (np.empty(0), np.empty(0)) for col in self.numericas}
+            self.categorias = {col: Counter() for col in outro.categorias}
+            self.categorias_truncadas = {col: False for col in outro.categorias}
+        elif outro.colunas != self.colunas:
+            raise ValueError("Acumuladores com colunas diferentes não podem ser mesclados")
+
+        self.linhas += outro.linhas
+        for col in self.colunas:
+            self.tipos[col] |= outro.tipos[col]
+            self.faltantes[col] += outro.faltantes[col]
+        for col in self.numericas:
+            self._combinar_momentos(col, outro.momentos[col])
+            self._combinar_amostra(col, outro.amostras[col])
+        for col in self.categorias:
+            self._combinar_categorias(col, outro.categorias[col])
+            self.categorias_truncadas[col] |= outro.categorias_truncadas[col]
+        self._combinar_hashes(outro.hashes, outro.taxa_hash)
+        return self
+
+    def duplicatas_estimadas(self) -> int:
+        """Linhas repetidas (além da primeira ocorrência), extrapoladas da fração de hashes amostrada"""
+        repetidas = sum(self.hashes.values()) - len(self.hashes)
+        return int(round(repetidas * self.taxa_hash))
+
+    def resultado(self) -> Dict:
+        """Estatísticas finais em um dicionário serializável em JSON"""
+        colunas = {}
+        for col in self.colunas:
+            info = {
+                'tipo': '|'.join(sorted(self.tipos[col])),
+                'numerica': col in self.numericas,
+                'faltantes': self.faltantes[col],
+            }
+            if col in self.numericas:
+                n, media, m2, minimo, maximo = self.momentos[col]
+                amostra = self.amostras[col][1]
+                info.update({
+                    'contagem': int(n),
+                    'media': float(media) if n else None,
+                    'desvio': float(np.sqrt(m2 / (n - 1))) if n > 1 else None,
+                    'min': float(minimo) if n else None,
+                    'max': float(maximo) if n else None,
+                    'quantis': ({f"p{int(q * 100):02d}": float(v) for q, v in zip(QUANTIS, np.quantile(amostra, QUANTIS))}
+                                if amostra.size else {}),
+                })
+            if col in self.categorias:
+                info['frequencias'] = dict(self.categorias[col].most_common())
+                info['frequencias_truncadas'] = self.categorias_truncadas[col]
+            colunas[col] = info
+
+        return {
+            'linhas': self.linhas,
+            'colunas': colunas,
+            'duplicatas_estimadas': self.duplicatas_estimadas(),
+            'taxa_amostragem_duplicatas': self.taxa_hash,
+        }
+
+
+def acumular_blocos(blocos: Iterable[pd.DataFrame], n_workers: int = 1, **parametros) -> AcumuladorEstatisticas:
+    """Alimentar acumuladores com blocos (um acumulador por worker) e mesclar o resultado"""
+    n_workers = max(1, n_workers)
+    acumuladores = [AcumuladorEstatisticas(semente=i, **parametros) for i in range(n_workers)]
+    if n_workers == 1:
+        for bloco in blocos:
+            acumuladores[0].atualizar(bloco)
+        return acumuladores[0]
+
+    # Um executor de uma thread por acumulador: cada acumulador recebe seus blocos em série
+    executores = [ThreadPoolExecutor(max_workers=1) for _ in range(n_workers)]
+    try:
+        pendentes = []
+        for i, bloco in enumerate(blocos):
+            if len(pendentes) >= 2 * n_workers:
+                pendentes.pop(0).result()
+            pendentes.append(executores[i % n_workers].submit(acumuladores[i % n_workers].atualizar, bloco))
+        for futuro in pendentes:
+            futuro.result()
+    finally:
+        for executor in executores:
+            executor.shutdown()
+
+    total = acumuladores[0]
+    for acumulador in acumuladores[1:]:
+        total.mesclar(acumulador)
+    return total
+
+
+def perfilar_csv(caminho: str, tamanho_bloco: int = 100_000, n_workers: int = 1,
+                 **parametros) -> AcumuladorEstatisticas:
+    """Estatísticas de um CSV lido em blocos (memória limitada ao tamanho do bloco)"""
+    return acumular_blocos(pd.read_csv(caminho, chunksize=tamanho_bloco), n_workers, **parametros)
+
+
+def perfilar_dataframe(df: pd.DataFrame, tamanho_bloco: int = 100_000, n_workers: int = 1,
+                       **parametros) -> AcumuladorEstatisticas:
+    """Estatísticas de um DataFrame em memória, percorrido em fatias"""
+    blocos = (df.iloc[inicio:inicio + tamanho_bloco] for inicio in range(0, len(df), tamanho_bloco))
+    return acumular_blocos(blocos, n_workers, **parametros)
+
+
+def salvar_metricas(caminho: str, chave: str, valor: Dict):
+    """Gravar valor sob chave no JSON de métricas, preservando as demais chaves"""
+    metricas = {}
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            metricas = json.load(f)
+
+    metricas[chave] = valor
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(metricas, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, caminho)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Utilitários de Inferência do Sistema de Manutenção Preditiva
+Funções compartilhadas entre o pipeline em lote e os caminhos de serviço
+"""
+
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+def probabilidades_positivas(probas) -> np.ndarray:
+    """Empilhar a probabilidade da classe positiva de cada alvo em uma matriz (n, n_alvos)
+
+    Alvos treinados com uma única classe recebem probabilidade zero.
+    """
+    saida = np.zeros((probas[0].shape[0], len(probas)))
+    for i, p in enumerate(probas):
+        if p.shape[1] == 2:
+            saida[:, i] = p[:, 1]
+    return saida
+
+
+def montar_entrada(leituras: List[Dict], features: List[str]) -> pd.DataFrame:
+    """Montar o DataFrame de entrada do modelo a partir de leituras individuais"""
+    return pd.DataFrame.from_records(leituras, columns=features)
+
+
+def criar_pontuador(modelo, features: List[str]) -> Callable:
+    """Função X -> probabilidades (n, n_alvos) para o motor compilado, o registro por segmento ou o pipeline
+
+    X pode ser um DataFrame ou um dicionário coluna -> array.
+    """
+    from inferencia_compilada import FlorestaCompilada
+    from registro_modelos import RegistroModelos
+
+    if isinstance(modelo, (FlorestaCompilada, RegistroModelos)):
+        return modelo.prever_proba
+
+    def pontuar(X):
+        return probabilidades_positivas(modelo.predict_proba(pd.DataFrame(X, columns=features)))
+    return pontuar
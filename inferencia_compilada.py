@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Motor de Inferência Compilado do Sistema de Manutenção Preditiva
+Achata o pré-processador (StandardScaler + OneHotEncoder) e as florestas treinadas em arrays
+NumPy contíguos e percorre todas as árvores de forma vetorizada
+"""
+
+import json
+from typing import Dict, List
+
+import numpy as np
+
+VERSAO_FORMATO = 1
+
+# Pares (linha, árvore) percorridos por bloco: limita a memória e mantém o bloco no cache da CPU
+MAX_PARES_POR_BLOCO = 250_000
+
+
+class FlorestaCompilada:
+    """Pré-processador e florestas de um pipeline treinado, representados em arrays planos"""
+
+    # Arrays que compõem o modelo compilado
+    CAMPOS = ('media', 'escala', 'feature', 'limiar', 'esquerda', 'direita',
+              'valor', 'raizes', 'inicio_alvos')
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict):
+        for campo in self.CAMPOS:
+            setattr(self, campo, arrays[campo])
+
+        self.meta = meta
+        self.features_numericas: List[str] = meta['features_numericas']
+        self.features_categoricas: List[str] = meta['features_categoricas']
+        self.categorias: List[np.ndarray] = [np.asarray(c, dtype=object) for c in meta['categorias']]
+        self.alvos_constantes: List[int] = meta['alvos_constantes']
+        self.n_alvos: int = meta['n_alvos']
+        self.profundidade_max: int = meta['profundidade_max']
+
+        # Pode vir pronta (artefato mapeado em memória) para não ser recalculada em cada processo
+        folha = arrays.get('folha')
+        self.folha = folha if folha is not None else self.esquerda == np.arange(len(self.esquerda))
+
+        # Número de árvores de cada alvo (a média é feita por alvo)
+        self._arvores_por_alvo = np.diff(np.append(self.inicio_alvos, len(self.raizes)))
+
+    def transformar(self, X) -> np.ndarray:
+        """Aplicar o pré-processamento compilado, no mesmo dtype usado pelas árvores (float32)
+
+        X pode ser um DataFrame ou um dicionário coluna -> array (dispensa o pandas na predição).
+        """
+        numericas = np.column_stack([np.asarray(X[col], dtype=np.float64) for col in self.features_numericas])
+        numericas = (numericas - self.media) / self.escala
+
+        blocos = [numericas]
+        for col, categorias in zip(self.features_categoricas, self.categorias):
+            valores = np.asarray(X[col], dtype=object)
+            # Categorias desconhecidas ficam com todas as colunas zeradas (handle_unknown='ignore')
+            blocos.append((valores[:, None] == categorias[None, :]).astype(np.float64))
+
+        return np.hstack(blocos).astype(np.float32)
+
+    def _percorrer(self, Xt: np.ndarray) -> np.ndarray:
+        """Levar cada linha até a folha de cada árvore e retornar a soma das folhas por alvo"""
+        n, d = Xt.shape
+        n_arvores = len(self.raizes)
+
+        # Pares (linha, árvore) achatados; só os pares que ainda não chegaram a uma folha seguem ativos
+        no = np.tile(self.raizes, n)
+        base = np.repeat(np.arange(n, dtype=np.int64) * d, n_arvores)
+        ativos = np.flatnonzero(~self.folha[no])
+        Xplano = Xt.ravel()
+
+        while ativos.size:
+            atual = no[ativos]
+            x = Xplano[base[ativos] + self.feature[atual]]
+            proximo = np.where(x <= self.limiar[atual], self.esquerda[atual], self.direita[atual])
+            no[ativos] = proximo
+            ativos = ativos[~self.folha[proximo]]
+
+        return np.add.reduceat(self.valor[no].reshape(n, n_arvores), self.inicio_alvos, axis=1)
+
+    def prever_proba(self, X) -> np.ndarray:
+        """Matriz (n, n_alvos) com a probabilidade de falha de cada alvo"""
+        Xt = self.transformar(X)
+        n = Xt.shape[0]
+        resultado = np.zeros((n, self.n_alvos))
+        alvos_ativos = [i for i in range(self.n_alvos) if i not in self.alvos_constantes]
+        if not alvos_ativos:
+            return resultado
+
+        tamanho_bloco = max(1, MAX_PARES_POR_BLOCO // max(1, len(self.raizes)))
+        for inicio in range(0, n, tamanho_bloco):
+            bloco = slice(inicio, inicio + tamanho_bloco)
+            resultado[bloco, alvos_ativos] = self._percorrer(Xt[bloco]) / self._arvores_por_alvo
+
+        return resultado
+
+    def salvar(self, caminho: str):
+        """Salvar o modelo compilado em um arquivo .npz"""
+        arrays = {campo: getattr(self, campo) for campo in self.CAMPOS}
+        np.savez(caminho, __meta__=np.array(json.dumps(self.meta)), **arrays)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> 'FlorestaCompilada':
+        """Carregar um modelo compilado salvo com salvar()"""
+        with np.load(caminho, allow_pickle=False) as dados:
+            meta = json.loads(str(dados['__meta__']))
+            if meta.get('versao') != VERSAO_FORMATO:
+                raise ValueError(f"Versão de formato incompatível: {meta.get('versao')}")
+            arrays = {campo: dados[campo] for campo in cls.CAMPOS}
+        return cls(arrays, meta)
+
+
+def _extrair_preprocessador(preprocessor):
+    """Obter médias/escalas numéricas e categorias do ColumnTransformer ajustado"""
+    media = escala = None
+    features_numericas, features_categoricas, categorias = [], [], []
+
+    for nome, transformador, colunas in preprocessor.transformers_:
+        if nome == 'remainder' or transformador == 'drop':
+            continue
+
+        tipo = type(transformador).__name__
+        if tipo == 'StandardScaler':
+            if features_categoricas:
+                raise ValueError("Colunas numéricas devem preceder as categóricas no pré-processador")
+            n = len(colunas)
+            media = transformador.mean_ if transformador.mean_ is not None else np.zeros(n)
+            escala = transformador.scale_ if transformador.scale_ is not None else np.ones(n)
+            features_numericas = list(colunas)
+        elif tipo == 'OneHotEncoder':
+            if transformador.drop is not None:
+                raise ValueError("OneHotEncoder com 'drop' não é suportado pelo motor compilado")
+            features_categoricas = list(colunas)
+            categorias = [[str(c) for c in cats] for cats in transformador.categories_]
+        else:
+            raise ValueError(f"Transformador não suportado pelo motor compilado: {tipo}")
+
+    return media, escala, features_numericas, features_categoricas, categorias
+
+
+def _florestas_por_alvo(classificador):
+    """Listar (floresta, índice da saída) de cada alvo, para MultiOutputClassifier ou floresta multi-saída"""
+    if hasattr(classificador, 'estimators_') and hasattr(classificador.estimators_[0], 'estimators_'):
+        return [(floresta, 0) for floresta in classificador.estimators_]
+    return [(classificador, k) for k in range(classificador.n_outputs_)]
+
+
+def compilar_pipeline(pipeline) -> FlorestaCompilada:
+    """Exportar um Pipeline (pré-processador + florestas) treinado para arrays planos"""
+    preprocessor = pipeline.named_steps['preprocessor']
+    classificador = pipeline.named_steps['classifier']
+
+    media, escala, features_numericas, features_categoricas, categorias = _extrair_preprocessador(preprocessor)
+
+    feature, limiar, esquerda, direita, valor = [], [], [], [], []
+    raizes, inicio_alvos, alvos_constantes = [], [], []
+    deslocamento = 0
+    profundidade_max = 0
+
+    for i_alvo, (floresta, saida) in enumerate(_florestas_por_alvo(classificador)):
+        classes = floresta.classes_[saida] if isinstance(floresta.classes_, list) else floresta.classes_
+        if len(classes) != 2:
+            # Mesmo comportamento de probabilidades_positivas: alvo com uma só classe vale zero
+            alvos_constantes.append(i_alvo)
+            continue
+
+        inicio_alvos.append(len(raizes))
+        for arvore in floresta.estimators_:
+            t = arvore.tree_
+            n_nos = t.node_count
+            indices = np.arange(deslocamento, deslocamento + n_nos)
+            folha = t.children_left == -1
+
+            # Folhas apontam para si mesmas (identificadas no carregamento por esquerda == índice)
+            feature.append(np.where(folha, 0, t.feature))
+            limiar.append(np.where(folha, np.inf, t.threshold))
+            esquerda.append(np.where(folha, indices, t.children_left + deslocamento))
+            direita.append(np.where(folha, indices, t.children_right + deslocamento))
+
+            contagens = t.value[:, saida, :]
+            totais = contagens.sum(axis=1)
+            totais[totais == 0] = 1.0
+            valor.append(contagens[:, 1] / totais)
+
+            raizes.append(deslocamento)
+            deslocamento += n_nos
+            profundidade_max = max(profundidade_max, t.max_depth)
+
+    arrays = {
+        'media': np.asarray(media, dtype=np.float64),
+        'escala': np.asarray(escala, dtype=np.float64),
+        'feature': np.concatenate(feature).astype(np.int32) if feature else np.zeros(0, np.int32),
+        'limiar': np.concatenate(limiar) if limiar else np.zeros(0),
+        'esquerda': np.concatenate(esquerda).astype(np.int32) if esquerda else np.zeros(0, np.int32),
+        'direita': np.concatenate(direita).astype(np.int32) if direita else np.zeros(0, np.int32),
+        'valor': np.concatenate(valor) if valor else np.zeros(0),
+        'raizes': np.asarray(raizes, dtype=np.int32),
+        'inicio_alvos': np.asarray(inicio_alvos, dtype=np.int64),
+    }
+    meta = {
+        'versao': VERSAO_FORMATO,
+        'features_numericas': features_numericas,
+        'features_categoricas': features_categoricas,
+        'categorias': categorias,
+        'alvos_constantes': alvos_constantes,
+        'n_alvos': len(_florestas_por_alvo(classificador)),
+        'profundidade_max': int(profundidade_max),
+    }
+    return FlorestaCompilada(arrays, meta)
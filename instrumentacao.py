@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Instrumentação do Sistema de Manutenção Preditiva
+Rastreia etapas e sub-etapas do pipeline (tempo de parede, CPU, pico de RSS e linhas), exporta
+um trace no formato Chrome/Perfetto e monta uma tabela-resumo; desativado, abrir uma etapa custa
+uma chamada de função que devolve um objeto nulo compartilhado
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _ler_status_kb(campo: str) -> Optional[int]:
+    """Valor de um campo de /proc/self/status (kB), ou None fora do Linux"""
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith(campo):
+                    return int(linha.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def memoria_atual_kb() -> Optional[int]:
+    """RSS atual do processo (kB)"""
+    return _ler_status_kb('VmRSS:')
+
+
+def pico_memoria_kb() -> Optional[int]:
+    """Pico de RSS desde o último reinício (VmHWM) ou, sem /proc, desde o início do processo"""
+    pico = _ler_status_kb('VmHWM:')
+    if pico is None and resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico
+
+
+def reiniciar_pico_memoria() -> bool:
+    """Zerar o pico de RSS do processo; False se o kernel não permitir"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class _IntervaloNulo:
+    """Etapa de um rastreador desativado: ignora tudo"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+    def __setattr__(self, nome, valor):
+        pass
+
+    def anotar(self, **args):
+        pass
+
+
+INTERVALO_NULO = _IntervaloNulo()
+
+
+class Intervalo:
+    """Etapa em andamento; linhas e args podem ser preenchidos dentro do bloco with"""
+
+    def __init__(self, rastreador: 'Rastreador', nome: str, categoria: str, linhas: Optional[int], args: Dict):
+        self.rastreador = rastreador
+        self.nome = nome
+        self.categoria = categoria
+        self.linhas = linhas
+        self.args = args
+        self.pico_kb = 0
+
+    def anotar(self, **args):
+        self.args.update(args)
+
+    def __enter__(self):
+        self.rastreador._abrir(self)
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        self.rastreador._fechar(self, erro=tipo is not None)
+        return False
+
+
+class Rastreador:
+    """Coleta as etapas executadas; etapas aninhadas formam um caminho (pipeline > treinar > busca)
+
+    O pico de memória é medido por etapa na thread principal (VmHWM reiniciado ao abrir cada
+    etapa e propagado para a etapa-mãe ao fechar). Etapas abertas em outras threads (p. ex. blocos
+    da predição) medem o tempo de CPU da própria thread e ficam sob a etapa principal corrente.
+    """
+
+    def __init__(self, ativo: bool = False):
+        self.ativo = ativo
+        self.registros: List[Dict] = []
+        self._origem = time.perf_counter()
+        self._origem_epoch = time.time()
+        self._pilha_principal: List[Intervalo] = []
+        self._local = threading.local()
+        self._trava = threading.Lock()
+        self._trilhas: Dict[str, int] = {}
+        self._pico_por_etapa = ativo and reiniciar_pico_memoria()
+
+    def etapa(self, nome: str, categoria: str = 'etapa', linhas: Optional[int] = None, **args):
+        """Context manager que mede o bloco como uma etapa"""
+        if not self.ativo:
+            return INTERVALO_NULO
+        return Intervalo(self, nome, categoria, linhas, args)
+
+    def _pilha(self) -> List[Intervalo]:
+        if threading.current_thread() is threading.main_thread():
+            return self._pilha_principal
+        pilha = getattr(self._local, 'pilha', None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def _caminho_atual(self, pilha: List[Intervalo]) -> tuple:
+        """Caminho da etapa aberta mais interna (nas outras threads, o da thread principal)"""
+        if pilha:
+            return pilha[-1].caminho
+        # Fatia em vez de teste + [-1]: a thread principal pode fechar a etapa entre os dois
+        principal = self._pilha_principal[-1:]
+        return principal[0].caminho if principal else ()
+
+    def _abrir(self, intervalo: Intervalo):
+        pilha = self._pilha()
+        intervalo.caminho = self._caminho_atual(pilha) + (intervalo.nome,)
+        intervalo.principal = pilha is self._pilha_principal
+        intervalo.tid = threading.get_ident()
+
+        if intervalo.principal and self._pico_por_etapa:
+            if pilha:
+                pilha[-1].pico_kb = max(pilha[-1].pico_kb, pico_memoria_kb() or 0)
+            reiniciar_pico_memoria()
+
+        pilha.append(intervalo)
+        intervalo.cpu_inicio = time.process_time() if intervalo.principal else time.thread_time()
+        intervalo.inicio = time.perf_counter()
+
+    def _fechar(self, intervalo: Intervalo, erro: bool = False):
+        fim = time.perf_counter()
+        cpu = (time.process_time() if intervalo.principal else time.thread_time()) - intervalo.cpu_inicio
+        pilha = self._pilha()
+        pilha.pop()
+
+        pico_mb = None
+        if intervalo.principal:
+            intervalo.pico_kb = max(intervalo.pico_kb, pico_memoria_kb() or 0)
+            if pilha:
+                pilha[-1].pico_kb = max(pilha[-1].pico_kb, intervalo.pico_kb)
+            pico_mb = intervalo.pico_kb / 1024 if intervalo.pico_kb else None
+
+        rss = memoria_atual_kb() if intervalo.principal else None
+        self._registrar({
+            'nome': intervalo.nome,
+            'categoria': intervalo.categoria,
+            'caminho': intervalo.caminho,
+            'inicio_s': intervalo.inicio - self._origem,
+            'duracao_s': fim - intervalo.inicio,
+            'cpu_s': cpu,
+            'pico_memoria_mb': pico_mb,
+            'rss_mb': rss / 1024 if rss else None,
+            'linhas': intervalo.linhas,
+            'pid': os.getpid(),
+            'trilha': 'principal' if intervalo.principal else f"thread {intervalo.tid}",
+            'args': {**intervalo.args, **({'erro': True} if erro else {})},
+        })
+
+    def _registrar(self, registro: Dict):
+        with self._trava:
+            self.registros.append(registro)
+
+    def _copiar_registros(self) -> List[Dict]:
+        """Registros até agora (threads de predição podem estar registrando ao mesmo tempo)"""
+        with self._trava:
+            return list(self.registros)
+
+    def evento(self, nome: str, inicio_epoch: float, duracao_s: float, categoria: str = 'sub-etapa',
+               trilha: str = 'principal', linhas: Optional[int] = None, pid: Optional[int] = None, **args):
+        """Registrar uma etapa medida fora do rastreador (p. ex. em um worker), sob a etapa corrente"""
+        if not self.ativo:
+            return
+        self._registrar({
+            'nome': nome,
+            'categoria': categoria,
+            'caminho': self._caminho_atual(self._pilha()) + (nome,),
+            'inicio_s': inicio_epoch - self._origem_epoch,
+            'duracao_s': duracao_s,
+            'cpu_s': None,
+            'pico_memoria_mb': None,
+            'rss_mb': None,
+            'linhas': linhas,
+            'pid': pid or os.getpid(),
+            'trilha': trilha,
+            'args': args,
+        })
+
+    def registrar_candidatos(self, cv_results: Dict, n_splits: int, inicio_epoch: float):
+        """Um evento estimado por candidato da busca, a partir de cv_results_
+
+        cv_results_ só traz tempos médios (sem instantes de início), então os candidatos são
+        dispostos em sequência, em uma trilha própria, a partir do início da busca; o nome
+        'candidato (estimado)' os separa, na tabela-resumo, dos ajustes medidos (registrar_ajustes).
+        """
+        if not self.ativo:
+            return
+        instante = inicio_epoch
+        tempos_score = cv_results.get('mean_score_time')
+        for i, params in enumerate(cv_results['params']):
+            tempo_score = tempos_score[i] if tempos_score is not None else 0.0
+            duracao = (cv_results['mean_fit_time'][i] + tempo_score) * n_splits
+            extras = {chave: int(cv_results[chave][i]) for chave in ('iter', 'n_resources') if chave in cv_results}
+            self.evento('candidato (estimado)', instante, float(duracao), categoria='busca',
+                        trilha='candidatos (estimados de cv_results_)',
+                        indice=i, parametros={p.split('__')[-1]: str(v) for p, v in params.items()},
+                        score=float(cv_results['mean_test_score'][i]),
+                        rank=int(cv_results['rank_test_score'][i]), **extras)
+            instante += duracao
+
+    def registrar_ajustes(self, cv_results: Dict, medicoes: List[Dict], nomes_alvos: List[str]):
+        """Um evento por ajuste medido da busca (candidato x fold) e um por floresta de cada alvo
+
+        medicoes: as de PipelineMedido, com 'candidato' e 'fold' já associados; o reajuste final
+        (sem candidato) entra só com as suas florestas.
+        """
+        if not self.ativo:
+            return
+        for medicao in medicoes:
+            i = medicao['candidato']
+            rotulo = {'candidato': i, 'fold': medicao['fold']} if i is not None else {'fold': 'reajuste'}
+            if i is not None:
+                extras = {chave: int(cv_results[chave][i]) for chave in ('iter', 'n_resources') if chave in cv_results}
+                self.evento('candidato', medicao['inicio'], medicao['duracao_s'], categoria='busca',
+                            trilha='candidatos (ajustes medidos)', linhas=medicao['linhas'], pid=medicao['pid'],
+                            parametros={p.split('__')[-1]: str(v) for p, v in cv_results['params'][i].items()},
+                            score=float(cv_results['mean_test_score'][i]),
+                            rank=int(cv_results['rank_test_score'][i]), **rotulo, **extras)
+            florestas = medicao['florestas']
+            for alvo, floresta in enumerate(florestas):
+                if floresta is None:
+                    continue
+                nome = nomes_alvos[alvo] if len(florestas) > 1 else 'floresta multi-saída'
+                self.evento(nome, floresta['inicio'], floresta['duracao_s'], categoria='ajuste',
+                            trilha='florestas', pid=floresta['pid'], **rotulo)
+
+    def resumo(self) -> List[Dict]:
+        """Uma linha por caminho de etapa (chamadas repetidas somadas), em ordem de árvore"""
+        agregados: Dict[tuple, Dict] = {}
+        for r in sorted(self._copiar_registros(), key=lambda r: r['inicio_s']):
+            linha = agregados.setdefault(r['caminho'], {
+                'etapa': ' > '.join(r['caminho']),
+                'profundidade': len(r['caminho']) - 1,
+                'inicio_s': r['inicio_s'],
+                'chamadas': 0,
+                'tempo_s': 0.0,
+                'cpu_s': None,
+                'pico_memoria_mb': None,
+                'linhas': None,
+            })
+            linha['chamadas'] += 1
+            linha['tempo_s'] += r['duracao_s']
+            if r['cpu_s'] is not None:
+                linha['cpu_s'] = (linha['cpu_s'] or 0.0) + r['cpu_s']
+            if r['pico_memoria_mb'] is not None:
+                linha['pico_memoria_mb'] = max(linha['pico_memoria_mb'] or 0.0, r['pico_memoria_mb'])
+            if r['linhas'] is not None:
+                linha['linhas'] = (linha['linhas'] or 0) + r['linhas']
+
+        def chave(caminho):
+            return tuple(agregados[caminho[:i + 1]]['inicio_s'] if caminho[:i + 1] in agregados else 0.0
+                         for i in range(len(caminho)))
+
+        linhas = []
+        for caminho in sorted(agregados, key=chave):
+            linha = agregados[caminho]
+            # Etapas de menos de 1 ms (p. ex. puladas) não têm vazão significativa
+            linha['linhas_por_s'] = (linha['linhas'] / linha['tempo_s']
+                                     if linha['linhas'] and linha['tempo_s'] >= 1e-3 else None)
+            del linha['inicio_s']
+            linhas.append(linha)
+        return linhas
+
+    def imprimir_resumo(self):
+        """Imprimir a tabela-resumo das etapas"""
+        print(f"\n{'etapa':<40} {'chamadas':>8} {'tempo (s)':>10} {'cpu (s)':>9} {'pico (MB)':>10} "
+              f"{'linhas':>10} {'linhas/s':>10}")
+        for linha in self.resumo():
+            nome = '  ' * linha['profundidade'] + linha['etapa'].split(' > ')[-1]
+
+            def formatar(valor, formato):
+                return format(valor, formato) if valor is not None else '-'
+
+            print(f"{nome[:40]:<40} {linha['chamadas']:>8} {linha['tempo_s']:>10.2f} "
+                  f"{formatar(linha['cpu_s'], '.2f'):>9} {formatar(linha['pico_memoria_mb'], '.0f'):>10} "
+                  f"{formatar(linha['linhas'], 'd'):>10} {formatar(linha['linhas_por_s'], '.0f'):>10}")
+
+    def _tid(self, trilha: str) -> int:
+        return self._trilhas.setdefault(trilha, len(self._trilhas) + 1)
+
+    def exportar_chrome_trace(self, caminho: str) -> str:
+        """Gravar o trace no formato JSON do Chrome (chrome://tracing, ui.perfetto.dev)"""
+        eventos = []
+        registros = self._copiar_registros()
+        for r in registros:
+            eventos.append({
+                'name': r['nome'],
+                'cat': r['categoria'],
+                'ph': 'X',
+                'ts': r['inicio_s'] * 1e6,
+                'dur': r['duracao_s'] * 1e6,
+                'pid': r['pid'],
+                'tid': self._tid(r['trilha']),
+                'args': {
+                    **{k: r[k] for k in ('cpu_s', 'pico_memoria_mb', 'linhas') if r[k] is not None},
+                    **r['args'],
+                },
+            })
+            if r['rss_mb'] is not None:
+                eventos.append({'name': 'memória (MB)', 'ph': 'C', 'ts': (r['inicio_s'] + r['duracao_s']) * 1e6,
+                                'pid': r['pid'], 'args': {'rss': r['rss_mb']}})
+
+        for pid in sorted({r['pid'] for r in registros}):
+            nome = 'pipeline' if pid == os.getpid() else f"worker {pid}"
+            eventos.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': nome}})
+            for trilha, tid in self._trilhas.items():
+                eventos.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': trilha}})
+
+        Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+        return caminho
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Normalização de Rótulos do Sistema de Manutenção Preditiva
+Converte as colunas de falha ('sim'/'Não'/'y'/True/False/...) para 0/1 em uma única passada vetorizada
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Tokens conhecidos e seus valores binários
+MAPA_ROTULOS = {
+    'sim': 1, 'Sim': 1, 'y': 1, '1': 1, 1: 1, True: 1, 'True': 1,
+    'não': 0, 'Não': 0, 'nao': 0, 'N': 0, '0': 0, 0: 0, False: 0, 'n': 0, 'False': 0
+}
+
+# Valor atribuído a tokens desconhecidos e a valores ausentes
+VALOR_PADRAO = 0
+
+
+class NormalizadorRotulos:
+    """Normaliza várias colunas de rótulos de uma vez, reaproveitando o mapeamento entre treino e teste"""
+
+    def __init__(self, mapa: Optional[Dict] = None, estrito: bool = False):
+        self.mapa = dict(MAPA_ROTULOS if mapa is None else mapa)
+        self.estrito = estrito
+
+        # Tokens já resolvidos em chamadas anteriores (treino, teste, novos lotes)
+        self._resolvidos: Dict = {}
+
+        # Tokens desconhecidos encontrados na última normalização: {coluna: {token: contagem}}
+        self.tokens_desconhecidos: Dict[str, Dict] = {}
+
+    def _resolver(self, token):
+        """Obter o valor de um token, retornando None se for desconhecido"""
+        if token in self._resolvidos:
+            return self._resolvidos[token]
+
+        valor = self.mapa.get(token)
+        if valor is None:
+            # Tokens numéricos fora da tabela valem só se forem 0 ou 1 ('1.0', 0.0, ...); '2', -1 e
+            # afins são desconhecidos (reportados, e erro no modo estrito)
+            numero = pd.to_numeric(pd.Series([token]), errors='coerce').iloc[0]
+            if numero in (0, 1):
+                valor = int(numero)
+
+        self._resolvidos[token] = valor
+        return valor
+
+    def normalizar(self, df: pd.DataFrame, colunas: List[str], dtype=np.int64) -> pd.DataFrame:
+        """Normalizar as colunas de rótulos de df (in-place, com o tipo inteiro dtype) e retornar o DataFrame"""
+        colunas = [c for c in colunas if c in df.columns]
+        self.tokens_desconhecidos = {}
+        if not colunas:
+            return df
+
+        # Fatorar a união dos tokens de todas as colunas de uma só vez
+        valores = df[colunas].to_numpy(dtype=object)
+        codigos, unicos = pd.factorize(valores.ravel(order='F'), use_na_sentinel=True)
+
+        resolvidos = [self._resolver(token) for token in unicos]
+        desconhecido = np.array([v is None for v in resolvidos] + [False], dtype=bool)
+        tabela = np.array([VALOR_PADRAO if v is None else v for v in resolvidos] + [VALOR_PADRAO],
+                          dtype=dtype)
+
+        # Código -1 (ausente) aponta para a última posição da tabela
+        codigos = np.where(codigos < 0, len(unicos), codigos).reshape(len(df), len(colunas), order='F')
+
+        if desconhecido.any():
+            self._registrar_desconhecidos(codigos, unicos, desconhecido, colunas)
+
+        resultado = tabela[codigos]
+        for i, col in enumerate(colunas):
+            df[col] = resultado[:, i]
+
+        return df
+
+    def _registrar_desconhecidos(self, codigos, unicos, desconhecido, colunas):
+        """Contar e reportar tokens desconhecidos por coluna"""
+        for i, col in enumerate(colunas):
+            codigos_col = codigos[:, i]
+            codigos_col = codigos_col[desconhecido[codigos_col]]
+            if len(codigos_col):
+                contagem = np.bincount(codigos_col, minlength=len(unicos))
+                self.tokens_desconhecidos[col] = {
+                    unicos[c]: int(contagem[c]) for c in np.flatnonzero(contagem)
+                }
+
+        print("Aviso: tokens de rótulo desconhecidos (convertidos para "
+              f"{VALOR_PADRAO}):")
+        for col, tokens in self.tokens_desconhecidos.items():
+            print(f"  {col}: {tokens}")
+
+        if self.estrito:
+            raise ValueError(f"Tokens de rótulo desconhecidos: {self.tokens_desconhecidos}")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Orçamento de Recursos do Sistema de Manutenção Preditiva
+Divide um orçamento de núcleos/memória entre o paralelismo externo (candidatos/folds)
+e o interno (alvos/árvores), evitando pools aninhados com n_jobs=-1
+"""
+
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from joblib import parallel_backend
+from threadpoolctl import threadpool_limits
+
+# Memória mínima assumida por worker quando não há estimativa melhor (MB)
+MEMORIA_MINIMA_WORKER_MB = 200
+
+# Fator aplicado ao tamanho dos dados de treino para estimar o pico de memória de um worker
+FATOR_MEMORIA_DADOS = 20
+
+
+@dataclass
+class LayoutParalelismo:
+    """Distribuição escolhida de workers e threads"""
+    nucleos_total: int
+    externo: int
+    interno: int
+    threads_blas: int
+    memoria_por_worker_mb: Optional[float] = None
+
+    def descrever(self) -> str:
+        """Resumo legível do layout para o log de treinamento"""
+        texto = (f"{self.nucleos_total} núcleos -> {self.externo} workers externos (candidatos/folds) x "
+                 f"{self.interno} internos (alvos/árvores), {self.threads_blas} thread(s) BLAS/OpenMP por worker")
+        if self.memoria_por_worker_mb is not None:
+            texto += f", ~{self.memoria_por_worker_mb:.0f} MB por worker"
+        return texto
+
+
+def nucleos_disponiveis() -> int:
+    """Núcleos que este processo pode usar (respeita afinidade de CPU/cgroups quando disponível)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def resolver_n_jobs(n_jobs: Optional[int]) -> int:
+    """Converter n_jobs no estilo joblib (-1 = todos, -2 = todos menos um, ...) em um número de núcleos"""
+    disponiveis = nucleos_disponiveis()
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return max(1, disponiveis + 1 + n_jobs)
+    return min(n_jobs, disponiveis)
+
+
+def estimar_memoria_worker_mb(X) -> float:
+    """Estimar o pico de memória de um worker a partir do tamanho dos dados de treino"""
+    if hasattr(X, 'memory_usage'):
+        tamanho = X.memory_usage(deep=True).sum()
+    else:
+        tamanho = getattr(X, 'nbytes', 0)
+    return max(MEMORIA_MINIMA_WORKER_MB, FATOR_MEMORIA_DADOS * tamanho / 1e6)
+
+
+def planejar_paralelismo(n_jobs: Optional[int], n_tarefas_externas: int, n_tarefas_internas: int,
+                         memoria_max_mb: Optional[float] = None,
+                         memoria_por_worker_mb: Optional[float] = None) -> LayoutParalelismo:
+    """Dividir o orçamento de núcleos entre paralelismo externo e interno
+
+    O nível externo (candidatos x folds) tem prioridade, pois suas tarefas são independentes e
+    numerosas; os núcleos que sobram vão para o nível interno (alvos ou árvores) e, por último,
+    para as bibliotecas BLAS/OpenMP. O limite de memória reduz o número de workers externos.
+    """
+    total = resolver_n_jobs(n_jobs)
+
+    externo = max(1, min(total, n_tarefas_externas))
+    if memoria_max_mb is not None and memoria_por_worker_mb:
+        externo = max(1, min(externo, int(memoria_max_mb // memoria_por_worker_mb)))
+
+    interno = max(1, min(n_tarefas_internas, total // externo))
+    threads_blas = max(1, total // (externo * interno))
+
+    return LayoutParalelismo(total, externo, interno, threads_blas, memoria_por_worker_mb)
+
+
+@contextmanager
+def aplicar_layout(layout: LayoutParalelismo):
+    """Limitar threads BLAS/OpenMP no processo atual e nos workers loky criados dentro do bloco"""
+    with parallel_backend('loky', inner_max_num_threads=layout.threads_blas):
+        with threadpool_limits(limits=layout.threads_blas):
+            yield layout
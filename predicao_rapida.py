@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Predição Rápida do Sistema de Manutenção Preditiva
+Ponto de entrada só de predição: importa apenas o necessário para pontuar um arquivo com o
+modelo salvo (motor compilado com NumPy, ou pipeline scikit-learn carregado com joblib)
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from config_file import obter_configuracao
+
+MOTORES = ('auto', 'compilado', 'artefato', 'sklearn')
+
+
+def contar_linhas(caminho: str) -> int:
+    """Número de linhas de dados de um CSV (sem o cabeçalho), sem interpretar os campos"""
+    with open(caminho, 'rb') as f:
+        return max(0, sum(1 for _ in f) - 1)
+
+
+def escolher_motor(motor: str, caminho_compilado: str, caminho_modelo: str,
+                   n_linhas: int = None, limite_linhas: int = None) -> str:
+    """Resolver o motor 'auto': compilado quando existe, não é mais antigo que o pipeline salvo e o
+    arquivo tem menos de limite_linhas linhas (acima disso o predict_proba do sklearn é mais rápido)"""
+    if motor != 'auto':
+        return motor
+
+    if not os.path.exists(caminho_compilado):
+        return 'sklearn'
+    if os.path.exists(caminho_modelo) and os.path.getmtime(caminho_compilado) < os.path.getmtime(caminho_modelo):
+        print(f"Aviso: '{caminho_compilado}' é mais antigo que '{caminho_modelo}'; usando o pipeline scikit-learn")
+        return 'sklearn'
+    if n_linhas is not None and limite_linhas is not None and n_linhas >= limite_linhas:
+        return 'sklearn'
+    return 'compilado'
+
+
+def carregar_medianas(caminho: str) -> dict:
+    """Medianas de treino salvas pelo pipeline de treinamento"""
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)['medianas']
+
+
+def ler_entrada_numpy(caminho: str, coluna_id: str, features_numericas, features_categoricas, medianas):
+    """Ler o CSV com o módulo csv e devolver (ids, dicionário coluna -> array), sem pandas"""
+    import numpy as np
+
+    with open(caminho, newline='', encoding='utf-8') as f:
+        leitor = csv.reader(f)
+        cabecalho = next(leitor)
+        linhas = list(leitor)
+
+    posicao = {nome: i for i, nome in enumerate(cabecalho)}
+    faltando = [c for c in [coluna_id] + features_numericas + features_categoricas if c not in posicao]
+    if faltando:
+        raise ValueError(f"Colunas ausentes em '{caminho}': {faltando}")
+
+    colunas = {}
+    for col in features_numericas:
+        valores = np.array([linha[posicao[col]] for linha in linhas], dtype=object)
+        valores[valores == ''] = 'nan'
+        valores = valores.astype(np.float64)
+        valores[np.isnan(valores)] = medianas[col]
+        colunas[col] = valores
+    for col in features_categoricas:
+        colunas[col] = np.array([linha[posicao[col]] for linha in linhas], dtype=object)
+
+    ids = [linha[posicao[coluna_id]] for linha in linhas]
+    return ids, colunas
+
+
+def pontuar_compilado(caminho_entrada: str, caminho_modelo: str, medianas: dict, artefato: bool = False,
+                      features=None, alvos=None):
+    """Pontuar com o motor compilado (.npz ou diretório do artefato): apenas NumPy é importado"""
+    if artefato:
+        from artefato_modelo import carregar_artefato
+        modelo = carregar_artefato(caminho_modelo, features, alvos)
+    else:
+        from inferencia_compilada import FlorestaCompilada
+        modelo = FlorestaCompilada.carregar(caminho_modelo)
+
+    ids, colunas = ler_entrada_numpy(caminho_entrada, 'id', modelo.features_numericas,
+                                     modelo.features_categoricas, medianas)
+    return ids, modelo.prever_proba(colunas)
+
+
+def pontuar_sklearn(caminho_entrada: str, caminho_modelo: str, medianas: dict, features):
+    """Pontuar com o pipeline scikit-learn salvo (.pkl)"""
+    import joblib
+    import pandas as pd
+    from inferencia import probabilidades_positivas
+
+    modelo = joblib.load(caminho_modelo)
+    df = pd.read_csv(caminho_entrada, usecols=['id'] + list(features))
+    df = df.fillna({col: valor for col, valor in medianas.items() if col in df.columns})
+    probabilidades = probabilidades_positivas(modelo.predict_proba(df[list(features)]))
+    return df['id'].tolist(), probabilidades
+
+
+def salvar_saida(caminho: str, ids, probabilidades, alvos):
+    """Escrever o arquivo de submissão (id + probabilidade de cada alvo)"""
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    with open(caminho, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(['id'] + list(alvos))
+        for id_linha, linha in zip(ids, probabilidades.tolist()):
+            escritor.writerow([id_linha] + linha)
+
+
+def perfil_importacao(argv, top: int = 15):
+    """Reexecutar o comando com '-X importtime' e listar os módulos mais caros (tempo acumulado)"""
+    import subprocess
+
+    comando = [sys.executable, '-X', 'importtime', os.path.abspath(__file__)] + list(argv)
+    resultado = subprocess.run(comando, capture_output=True, text=True)
+
+    modulos = []
+    for linha in resultado.stderr.splitlines():
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        # Formato: "import time: <próprio us> | <acumulado us> | <indentação><módulo>"
+        proprio, acumulado, nome = linha[len('import time:'):].split('|')
+        proprio = int(proprio)
+        profundidade = (len(nome) - len(nome.lstrip())) // 2
+        modulos.append((nome.strip(), proprio, int(acumulado), profundidade))
+
+    total_us = sum(proprio for _, proprio, _, _ in modulos)
+    print(f"\nImportações: {len(modulos)} módulos, {total_us / 1000:.1f} ms no total")
+    print(f"{'módulo':<40} {'acumulado (ms)':>15} {'próprio (ms)':>13}")
+    for nome, proprio, acumulado, _ in sorted((m for m in modulos if m[3] == 0),
+                                              key=lambda m: m[2], reverse=True)[:top]:
+        print(f"{nome:<40} {acumulado / 1000:>15.1f} {proprio / 1000:>13.1f}")
+
+    return resultado.returncode
+
+
+def main(argv=None):
+    """Função principal"""
+    # Só leitura de modelos e escrita da saída: nenhum diretório do projeto é criado
+    config = obter_configuracao(criar_diretorios=False)
+
+    parser = argparse.ArgumentParser(description="Pontuar um arquivo com o modelo salvo (sem treinamento)")
+    parser.add_argument('entrada', nargs='?', default=config.CAMINHO_DADOS_TESTE, help="CSV a pontuar")
+    parser.add_argument('--saida', default=config.CAMINHO_SUBMISSION)
+    parser.add_argument('--motor', default='auto', choices=MOTORES,
+                        help="'compilado' (.npz, só NumPy), 'artefato' (diretório mapeado em memória), "
+                             "'sklearn' (.pkl) ou 'auto' (compilado abaixo de LIMITE_LINHAS_COMPILADO linhas)")
+    parser.add_argument('--modelo', default=None, help="Caminho do modelo (padrão conforme o motor)")
+    parser.add_argument('--medianas', default=config.CAMINHO_MEDIANAS)
+    parser.add_argument('--perfil-importacao', action='store_true',
+                        help="Mostrar o tempo de importação por módulo (-X importtime)")
+    args = parser.parse_args(argv)
+
+    if args.perfil_importacao:
+        argv_filho = [a for a in (sys.argv[1:] if argv is None else argv) if a != '--perfil-importacao']
+        return perfil_importacao(argv_filho)
+
+    inicio = time.perf_counter()
+    n_linhas = contar_linhas(args.entrada) if args.motor == 'auto' else None
+    motor = escolher_motor(args.motor, config.CAMINHO_MODELO_COMPILADO, config.CAMINHO_MODELO,
+                           n_linhas, config.LIMITE_LINHAS_COMPILADO)
+    padroes = {'compilado': config.CAMINHO_MODELO_COMPILADO, 'artefato': config.DIR_ARTEFATO_MODELO,
+               'sklearn': config.CAMINHO_MODELO}
+    caminho_modelo = args.modelo or padroes[motor]
+    medianas = carregar_medianas(args.medianas)
+
+    if motor in ('compilado', 'artefato'):
+        ids, probabilidades = pontuar_compilado(args.entrada, caminho_modelo, medianas, motor == 'artefato',
+                                                config.FEATURES, config.COLUNAS_TARGET)
+    else:
+        ids, probabilidades = pontuar_sklearn(args.entrada, caminho_modelo, medianas, config.FEATURES)
+
+    salvar_saida(args.saida, ids, probabilidades, config.COLUNAS_TARGET)
+    print(f"{len(ids)} linhas pontuadas com o motor '{motor}' em {time.perf_counter() - inicio:.2f} s "
+          f"-> '{args.saida}'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,15 +4,19 @@ Projeto Final - Bootcamp de Ciência de Dados e IA
 Sistema de Manutenção Preditiva
 """
 
+import argparse
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
+import json
+import time
+import shutil
+import tempfile
 import joblib
 from pathlib import Path
 
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
@@ -20,14 +24,69 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.multioutput import MultiOutputClassifier
 from sklearn.metrics import classification_report, roc_auc_score, confusion_matrix
 
+from config_file import obter_configuracao
+from cache_dados import calcular_hash_arquivo, ler_csv_com_cache
+from normalizacao_rotulos import NormalizadorRotulos
+from inferencia import probabilidades_positivas
+from avaliacao import auc_avaliavel, avaliar_probabilidades, salvar_limiares
+from compressao_floresta import comprimir_pipeline
+from inferencia_compilada import compilar_pipeline
+from artefato_modelo import salvar_artefato
+from cache_predicoes import CachePredicoes, versao_modelo
+from registro_modelos import (
+    ARQUIVO_REGISTRO, RegistroModelos, agrupar_por_chave, chaves_segmento, registro_existe, salvar_registro,
+    salvar_segmento
+)
+from predicao_streaming import pontuar_csv_em_blocos
+from estatisticas_dados import perfilar_csv, perfilar_dataframe, salvar_metricas
+from versionamento_dados import (
+    RegistroVersoes, adicionar_arvores, criar_snapshot, decidir_retreinamento, sortear_validacao_novas
+)
+from busca_hiperparametros import (
+    executar_busca, contar_ajustes, contar_tarefas_externas, adaptar_nome_parametro, prefixo_parametros,
+    METRICA_BUSCA
+)
+from visualizacoes import (
+    GerenciadorVisualizacoes, agregados_analise_exploratoria,
+    renderizar_analise_exploratoria, renderizar_matrizes_confusao
+)
+from instrumentacao import Rastreador
+from compactacao_dados import (
+    colunas_necessarias, compactar_dataframe, memoria_mb, preencher_faltantes, restaurar_dataframe,
+    tipos_compactados
+)
+from dag_pipeline import Estagio, PipelineDAG
+from orcamento_recursos import aplicar_layout, estimar_memoria_worker_mb, planejar_paralelismo
+from cache_preprocessador import (
+    memoizar_preprocessador, desembrulhar_preprocessador, resumir_estatisticas, limpar_cache_memoria
+)
+
+# Estágios de executar_pipeline_completo, na ordem de execução (ver _estagios_pipeline)
+ESTAGIOS_PIPELINE = (
+    'carregar_dados', 'diagnostico_dados', 'limpar_dados', 'analise_exploratoria',
+    'preparar_dados', 'treinar_modelo', 'comprimir_modelo', 'treinar_segmentos', 'avaliar_modelo',
+    'gerar_predicoes'
+)
+
+
 class ManutencaoPreditiva:
     """Classe principal para o sistema de manutenção preditiva"""
     
-    def __init__(self):
+    def __init__(self, config=None):
+        self.config = config if config is not None else obter_configuracao()
         self.df_train = None
         self.df_test = None
         self.model_pipeline = None
         self.best_model = None
+        self.hash_dados_treino = None
+        self.resultado_busca = None
+        self.medianas_treino = None
+        self.snapshot_dados = None
+        self.registro_modelos = None
+        self.cache_predicoes = None
+        self.normalizador_rotulos = NormalizadorRotulos(estrito=self.config.ROTULOS_ESTRITOS)
+        self.visualizacoes = GerenciadorVisualizacoes(self.config.MODO_VISUALIZACAO)
+        self.rastreador = Rastreador(self.config.RASTREAR_EXECUCAO)
         
         # Definir colunas
         self.features = [
@@ -59,86 +118,137 @@ class ManutencaoPreditiva:
         for directory in directories:
             Path(directory).mkdir(exist_ok=True)
     
+    def _ler_csv(self, caminho):
+        """Ler um CSV usando o cache colunar quando habilitado (no modo compacto, só as colunas usadas)"""
+        usecols = None
+        if self.config.DADOS_COMPACTOS:
+            usecols = colunas_necessarias(['id'], self.features + self._colunas_extras_segmento(),
+                                          ['falha_maquina'], self.target_cols)
+        
+        if self.config.USAR_CACHE_DADOS:
+            df, hash_arquivo = ler_csv_com_cache(caminho, self.config.DIR_CACHE, usecols)
+        else:
+            df, hash_arquivo = pd.read_csv(caminho, usecols=(lambda c: c in usecols) if usecols else None), None
+        
+        if self.config.DADOS_COMPACTOS:
+            df = self._compactar(df, Path(caminho).name)
+        return df, hash_arquivo
+    
+    def _compactar(self, df, nome):
+        """Converter para os tipos compactos (rótulos brutos e 'tipo' como category, sensores em float32)"""
+        antes = memoria_mb(df)
+        compacto = compactar_dataframe(
+            df, numericas=self.numerical_features,
+            categoricas=self.categorical_features + ['falha_maquina'] + self.target_cols, inteiras=['id']
+        )
+        depois = memoria_mb(compacto)
+        print(f"Modo compacto: '{nome}' {df.shape[1]} colunas, {antes:.2f} MB -> {depois:.2f} MB "
+              f"(-{1 - depois / antes:.0%})" if antes else f"Modo compacto: '{nome}' vazio")
+        print(f"  Tipos: {tipos_compactados(df, compacto)}")
+        return compacto
+    
     def carregar_dados(self, caminho_train="data/bootcamp_train.csv", caminho_test=None):
         """Carregar dados de treino e teste"""
         try:
             print("Carregando dados de treino...")
-            self.df_train = pd.read_csv(caminho_train)
+            self.df_train, self.hash_dados_treino = self._ler_csv(caminho_train)
             print(f"Dados de treino carregados: {self.df_train.shape}")
             
+            # Snapshot dos dados brutos (antes da limpeza) para o versionamento
+            if self.config.VERSIONAR_DADOS:
+                self.snapshot_dados = criar_snapshot(self.df_train, self.numerical_features)
+            
             if caminho_test and os.path.exists(caminho_test):
                 print("Carregando dados de teste...")
-                self.df_test = pd.read_csv(caminho_test)
+                self.df_test, _ = self._ler_csv(caminho_test)
                 print(f"Dados de teste carregados: {self.df_test.shape}")
                 
         except FileNotFoundError as e:
             print(f"Erro ao carregar dados: {e}")
             print("Certifique-se de que os arquivos estão no diretório 'data/'")
     
-    def diagnostico_dados(self):
-        """Realizar diagnóstico completo dos dados"""
-        if self.df_train is None:
+    def diagnostico_dados(self, caminho=None, tamanho_bloco=100_000, n_workers=1):
+        """Realizar diagnóstico completo dos dados
+        
+        Uma única passada (em blocos) calcula todas as estatísticas; com caminho, o CSV é lido em
+        blocos sem ser carregado inteiro. O resultado também é gravado em CAMINHO_METRICAS.
+        """
+        if caminho is None and self.df_train is None:
             print("Erro: Dados de treino não carregados!")
             return
         
         print("Executando diagnóstico completo do arquivo de treino...")
         print("-" * 50)
         
+        colunas_rotulo = ['falha_maquina'] + self.target_cols
+        if caminho is not None:
+            acumulador = perfilar_csv(caminho, tamanho_bloco, n_workers, colunas_rotulo=colunas_rotulo)
+        else:
+            acumulador = perfilar_dataframe(self.df_train, tamanho_bloco, n_workers, colunas_rotulo=colunas_rotulo)
+        estatisticas = acumulador.resultado()
+        colunas = estatisticas['colunas']
+        
         # 1. Formato dos dados
         print("Formato dos dados:")
-        print(f" - df_train: {self.df_train.shape}")
+        print(f" - df_train: ({estatisticas['linhas']}, {len(colunas)})")
         print()
         
         # 2. Nomes das colunas
         print("Colunas encontradas:")
-        print(list(self.df_train.columns))
+        print(list(colunas))
         print()
         
         # 3. Tipos de dados
         print("Tipos de dados por coluna:")
-        print(self.df_train.dtypes.sort_index())
+        print(pd.Series({col: info['tipo'] for col, info in colunas.items()}).sort_index())
         print()
         
         # 4. Separação de colunas numéricas e categóricas
-        num_cols = self.df_train.select_dtypes(include=np.number).columns.tolist()
-        cat_cols = self.df_train.select_dtypes(exclude=np.number).columns.tolist()
+        num_cols = [col for col, info in colunas.items() if info['numerica']]
+        cat_cols = [col for col, info in colunas.items() if not info['numerica']]
         print(f"Colunas Numéricas ({len(num_cols)}): {num_cols}")
         print(f"Colunas Categóricas ({len(cat_cols)}): {cat_cols}")
         print()
         
         # 5. Valores ausentes
         print("Colunas com valores ausentes:")
-        missing = self.df_train.isna().sum().sort_values(ascending=False)
+        missing = pd.Series({col: info['faltantes'] for col, info in colunas.items()}).sort_values(ascending=False)
         print(missing[missing > 0])
         print()
         
-        # 6. Linhas duplicadas
-        dup = int(self.df_train.duplicated().sum())
-        print(f"Linhas duplicadas encontradas: {dup}")
+        # 6. Linhas duplicadas (estimativa por hash quando os dados são grandes)
+        dup = estatisticas['duplicatas_estimadas']
+        aproximado = " (estimativa)" if estatisticas['taxa_amostragem_duplicatas'] > 1 else ""
+        print(f"Linhas duplicadas encontradas: {dup}{aproximado}")
         print()
         
         # 7. Estatísticas básicas
         print("Estatísticas das variáveis numéricas:")
-        stats = self.df_train[self.numerical_features].describe().T[['mean','std','min','max']]
-        print(stats)
+        stats = pd.DataFrame({col: colunas[col] for col in self.numerical_features if col in colunas}).T
+        print(stats[['media', 'desvio', 'min', 'max']].rename(
+            columns={'media': 'mean', 'desvio': 'std'}).astype(float))
         print()
         
         # 8. Análise das targets
         print("Análise das Colunas-Alvo:")
-        present_targets = [c for c in self.target_cols if c in self.df_train.columns]
+        present_targets = [c for c in self.target_cols if c in colunas]
         
         if present_targets:
             print("Alvos encontrados:", present_targets)
             for t in present_targets:
-                vc = self.df_train[t].value_counts(dropna=False)
-                total = vc.sum()
+                vc = colunas[t]['frequencias']
+                total = sum(vc.values())
                 print(f"\n— Distribuição de '{t}':")
                 for k, v in vc.items():
                     pct = 100.0 * v / total
                     print(f"    {str(k):<10}: {v:>6} ({pct:.2f}%)")
         
+        salvar_metricas(self.config.CAMINHO_METRICAS, 'diagnostico_dados', estatisticas)
+        
         print("-" * 50)
-        print("Diagnóstico concluído.")
+        print(f"Diagnóstico concluído. Estatísticas salvas em '{self.config.CAMINHO_METRICAS}'")
+        
+        return estatisticas
     
     def limpar_dados(self):
         """Limpar e preparar os dados"""
@@ -148,25 +258,19 @@ class ManutencaoPreditiva:
         
         print("Iniciando a limpeza dos dados de treino...")
         
-        # Mapeamento para limpar colunas de falha
-        mapa_valores = {
-            'sim': 1, 'Sim': 1, 'y': 1, '1': 1, 1: 1, True: 1,
-            'não': 0, 'Não': 0, 'N': 0, '0': 0, 0: 0, False: 0, 'n': 0
-        }
-        
-        # Limpar colunas de falha
+        # Limpar colunas de falha (todas de uma vez, com o mesmo mapeamento)
         colunas_para_limpar = ['falha_maquina'] + self.target_cols
-        
-        for col in colunas_para_limpar:
-            if col in self.df_train.columns:
-                self.df_train[col] = self.df_train[col].replace(mapa_valores)
-                self.df_train[col] = pd.to_numeric(self.df_train[col], errors='coerce').fillna(0).astype(int)
-        
-        # Preencher valores faltantes nas features numéricas
-        for col in self.numerical_features:
-            if col in self.df_train.columns:
-                mediana = self.df_train[col].median()
-                self.df_train[col].fillna(mediana, inplace=True)
+        tipo_rotulos = np.uint8 if self.config.DADOS_COMPACTOS else np.int64
+        self.normalizador_rotulos.normalizar(self.df_train, colunas_para_limpar, dtype=tipo_rotulos)
+        
+        # Preencher valores faltantes nas features numéricas (medianas guardadas para a predição,
+        # calculadas sobre os valores float64 também no modo compacto)
+        sensores = restaurar_dataframe(self.df_train, self.numerical_features)
+        self.medianas_treino = {
+            col: float(sensores[col].median())
+            for col in self.numerical_features if col in self.df_train.columns
+        }
+        preencher_faltantes(self.df_train, self.medianas_treino)
         
         print("Limpeza de dados concluída!")
         
@@ -180,39 +284,16 @@ class ManutencaoPreditiva:
             print("Erro: Dados não carregados!")
             return
         
+        if not self.visualizacoes.ativo:
+            print("Análise exploratória ignorada (visualizações desativadas).")
+            return
+        
         print("Iniciando a Análise Exploratória de Dados...")
         
-        # 1. Distribuição da falha geral
-        plt.figure(figsize=(12, 10))
-        
-        plt.subplot(2, 2, 1)
-        falha_counts = self.df_train['falha_maquina'].value_counts()
-        sns.barplot(x=falha_counts.index, y=falha_counts.values, palette='viridis')
-        plt.title('Distribuição da Falha Geral da Máquina')
-        plt.xticks([0, 1], ['Sem Falha', 'Com Falha'])
-        
-        # 2. Contagem por tipo específico de falha
-        plt.subplot(2, 2, 2)
-        falhas_especificas = self.df_train[self.target_cols].sum().sort_values(ascending=False)
-        sns.barplot(x=range(len(falhas_especificas)), y=falhas_especificas.values, palette='crest')
-        plt.title('Contagem de Cada Tipo de Falha Específica')
-        plt.xticks(range(len(falhas_especificas)), falhas_especificas.index, rotation=45, ha='right')
-        
-        # 3. Distribuição das variáveis numéricas
-        plt.subplot(2, 2, 3)
-        self.df_train[self.numerical_features].hist(bins=20, ax=plt.gca())
-        plt.title('Distribuição das Variáveis Numéricas')
-        
-        # 4. Matriz de correlação
-        plt.subplot(2, 2, 4)
-        cols_for_corr = self.numerical_features + ['falha_maquina']
-        correlation_matrix = self.df_train[cols_for_corr].corr()
-        sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt='.2f', cbar=True)
-        plt.title('Matriz de Correlação')
-        
-        plt.tight_layout()
-        plt.savefig('visualizations/analise_exploratoria.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        agregados = agregados_analise_exploratoria(self.df_train, self.numerical_features, self.target_cols)
+        self.visualizacoes.submeter(
+            renderizar_analise_exploratoria, agregados, 'visualizations/analise_exploratoria.png'
+        )
         
         print("Análise exploratória concluída. Gráficos salvos em 'visualizations/'")
     
@@ -224,8 +305,8 @@ class ManutencaoPreditiva:
         
         print("Preparando dados para treinamento...")
         
-        # Definir X e y
-        X = self.df_train[self.features]
+        # Definir X e y (sensores float32 do modo compacto voltam aos valores float64 lidos do CSV)
+        X = restaurar_dataframe(self.df_train[self.features], self.numerical_features)
         y = self.df_train[self.target_cols]
         
         # Criar preprocessador
@@ -236,67 +317,424 @@ class ManutencaoPreditiva:
             ]
         )
         
-        # Dividir dados
-        X_train, X_val, y_train, y_val = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=self.df_train['falha_maquina']
-        )
+        # Dividir dados (com versionamento, a validação das versões anteriores é mantida)
+        validacao = self._validacao_versionada() if self.config.VERSIONAR_DADOS else None
+        if validacao is None:
+            X_train, X_val, y_train, y_val = train_test_split(
+                X, y, test_size=0.2, random_state=42, stratify=self.df_train['falha_maquina']
+            )
+        else:
+            na_validacao = X.index.isin(validacao)
+            X_train, X_val, y_train, y_val = X[~na_validacao], X[na_validacao], y[~na_validacao], y[na_validacao]
         
         print(f"Conjunto de treino: {X_train.shape}")
         print(f"Conjunto de validação: {X_val.shape}")
         
         return X_train, X_val, y_train, y_val, preprocessor
     
-    def treinar_modelo(self, X_train, y_train, preprocessor, otimizar=True):
-        """Treinar modelo de machine learning"""
-        print("Iniciando o treinamento do modelo...")
-        
-        # Modelo base
-        base_classifier = RandomForestClassifier(random_state=42, class_weight='balanced')
-        multi_output_model = MultiOutputClassifier(estimator=base_classifier, n_jobs=-1)
+    def _validacao_versionada(self):
+        """Linhas de validação da última versão mais uma parte sorteada só entre as linhas anexadas
+        
+        Refazer o train_test_split com outro número de linhas embaralha tudo de novo e leva para a
+        validação linhas em que as florestas já foram treinadas. None (divisão nova) quando não há
+        divisão gravada ou quando as linhas da última versão foram alteradas.
+        """
+        if self.snapshot_dados is None:
+            return None
+        registro = RegistroVersoes(self.config.DIR_VERSIONAMENTO)
+        salvas = registro.linhas_validacao(registro.ultima) if registro.ultima else None
+        if salvas is None or not registro.prefixo_preservado(self.snapshot_dados):
+            return None
+        
+        posicoes = self.df_train.index.to_numpy()
+        novas = posicoes >= registro.ultima['linhas']
+        sorteadas = sortear_validacao_novas(posicoes[novas], self.df_train['falha_maquina'].to_numpy()[novas])
+        print(f"Divisão versionada: {len(salvas)} linhas de validação mantidas, "
+              f"{len(sorteadas)} de {novas.sum()} linhas novas sorteadas")
+        return np.concatenate([salvas, sorteadas])
+    
+    def _criar_pipeline(self, preprocessor, modo_modelo=None):
+        """Montar o pipeline (pré-processador + classificador multi-saída) ainda não treinado
+        
+        modo_modelo 'multioutput' treina uma floresta por alvo (MultiOutputClassifier);
+        'nativo' treina uma única floresta multi-saída compartilhando as árvores entre os alvos.
+        """
+        modo_modelo = modo_modelo or self.config.MODO_MODELO
+        
+        if modo_modelo == 'multioutput':
+            # Modelo base
+            base_classifier = RandomForestClassifier(random_state=42, class_weight='balanced')
+            classifier = MultiOutputClassifier(estimator=base_classifier, n_jobs=-1)
+        elif modo_modelo == 'nativo':
+            classifier = RandomForestClassifier(random_state=42, class_weight='balanced', n_jobs=-1)
+        else:
+            raise ValueError(f"Modo de modelo desconhecido: '{modo_modelo}' (opções: 'multioutput', 'nativo')")
         
         # Pipeline
-        pipeline = Pipeline(steps=[
+        return Pipeline(steps=[
             ('preprocessor', preprocessor),
-            ('classifier', multi_output_model)
+            ('classifier', classifier)
         ])
+    
+    def _planejar_paralelismo(self, X_train, pipeline, n_tarefas_externas):
+        """Dividir ConfiguracaoProjeto.N_JOBS entre a busca (externo) e o classificador (interno)"""
+        classifier = pipeline.named_steps['classifier']
+        if isinstance(classifier, MultiOutputClassifier):
+            n_tarefas_internas = len(self.target_cols)
+        else:
+            n_tarefas_internas = classifier.n_estimators
+        
+        memoria_por_worker = self.config.MEMORIA_POR_WORKER_MB or estimar_memoria_worker_mb(X_train)
+        layout = planejar_paralelismo(
+            self.config.N_JOBS, n_tarefas_externas, n_tarefas_internas,
+            memoria_max_mb=self.config.MEMORIA_MAXIMA_MB, memoria_por_worker_mb=memoria_por_worker
+        )
+        pipeline.set_params(classifier__n_jobs=layout.interno)
+        
+        print(f"Layout de paralelismo: {layout.descrever()}")
+        return layout
+    
+    def treinar_modelo(self, X_train, y_train, preprocessor, otimizar=True, modo_busca=None, param_grid=None,
+                       modo_modelo=None, parametros=None):
+        """Treinar modelo de machine learning"""
+        modo_modelo = modo_modelo or self.config.MODO_MODELO
+        print(f"Iniciando o treinamento do modelo (modo '{modo_modelo}')...")
+        
+        pipeline = self._criar_pipeline(preprocessor, modo_modelo)
         
         if otimizar:
-            print("Executando otimização de hiperparâmetros...")
+            modo_busca = modo_busca or self.config.MODO_BUSCA
+            print(f"Executando otimização de hiperparâmetros (modo '{modo_busca}')...")
             
-            param_grid = {
-                'classifier__estimator__n_estimators': [100, 150],
-                'classifier__estimator__max_depth': [10, 20],
-                'classifier__estimator__min_samples_leaf': [5, 10]
-            }
+            # Grid do ambiente (config_file): desenvolvimento, produção ou o que o usuário definir
+            param_grid = param_grid if param_grid is not None else self.config.PARAM_GRID
             
-            grid_search = GridSearchCV(
-                estimator=pipeline,
-                param_grid=param_grid,
-                scoring='f1_weighted',
-                cv=3,
-                n_jobs=-1,
-                verbose=1
+            layout = self._planejar_paralelismo(
+                X_train, pipeline, contar_tarefas_externas(param_grid, self.config, modo_busca, pipeline)
             )
             
-            grid_search.fit(X_train, y_train)
+            # No modo warm_start o pré-processador já é ajustado uma única vez por fold
+            dir_cache_preprocessador = None
+            if self.config.CACHE_PREPROCESSADOR and modo_busca != 'warm_start':
+                Path(self.config.DIR_CACHE).mkdir(parents=True, exist_ok=True)
+                dir_cache_preprocessador = tempfile.mkdtemp(prefix='preprocessador-', dir=self.config.DIR_CACHE)
+                memoizar_preprocessador(pipeline, dir_cache_preprocessador, X_train)
+            
+            try:
+                with aplicar_layout(layout), \
+                        self.rastreador.etapa('busca', 'busca', linhas=len(X_train), modo=modo_busca):
+                    inicio_busca = time.time()
+                    busca, tempo_busca = executar_busca(
+                        pipeline, X_train, y_train, param_grid, self.config,
+                        modo=modo_busca, n_jobs=layout.externo, medir=self.rastreador.ativo
+                    )
+                    self._rastrear_busca(busca, inicio_busca)
+            finally:
+                if dir_cache_preprocessador is not None:
+                    resumo_cache = resumir_estatisticas(dir_cache_preprocessador)
+                    print(f"Cache do pré-processador: {resumo_cache['acertos']} acertos, "
+                          f"{resumo_cache['falhas']} falhas, {resumo_cache['tempo_economizado_s']:.2f} s "
+                          f"de cálculo evitados - {resumo_cache['sobrecarga_s']:.2f} s de hash/E-S = "
+                          f"{resumo_cache['economia_liquida_s']:+.2f} s líquidos")
+                    shutil.rmtree(dir_cache_preprocessador, ignore_errors=True)
+                    limpar_cache_memoria()
             
             print("\nMelhores parâmetros encontrados:")
-            print(grid_search.best_params_)
+            print(busca.best_params_)
+            print(f"Tempo da busca: {tempo_busca:.1f} s | {contar_ajustes(busca)} ajustes | "
+                  f"melhor {METRICA_BUSCA} (CV): {busca.best_score_:.4f}")
             
-            self.best_model = grid_search.best_estimator_
+            self.resultado_busca = {
+                'modo': modo_busca,
+                'tempo_s': tempo_busca,
+                'melhor_score': busca.best_score_,
+                'melhores_parametros': busca.best_params_
+            }
+            self.best_model = desembrulhar_preprocessador(busca.best_estimator_)
             
             # Salvar modelo
             joblib.dump(self.best_model, 'models/modelo_otimizado.pkl')
             print("Modelo salvo em 'models/modelo_otimizado.pkl'")
             
         else:
-            pipeline.fit(X_train, y_train)
+            if parametros:
+                prefixo = prefixo_parametros(pipeline)
+                pipeline.set_params(**{adaptar_nome_parametro(nome, prefixo): valor
+                                       for nome, valor in parametros.items()})
+            layout = self._planejar_paralelismo(X_train, pipeline, n_tarefas_externas=1)
+            with aplicar_layout(layout), self.rastreador.etapa('ajuste', 'ajuste', linhas=len(X_train)):
+                pipeline.fit(X_train, y_train)
             self.best_model = pipeline
             joblib.dump(self.best_model, 'models/modelo_basico.pkl')
         
+        self.salvar_medianas_treino()
+        
+        if self.config.EXPORTAR_MODELO_COMPILADO:
+            self.exportar_modelo_compilado()
+        
         print("Treinamento concluído!")
         return self.best_model
     
+    def _rastrear_busca(self, busca, inicio_epoch):
+        """Registrar na instrumentação os candidatos, as florestas por alvo e o reajuste final da busca"""
+        if not self.rastreador.ativo:
+            return
+        
+        # grid/halving medem cada ajuste nos workers; no warm_start os candidatos são estimados de cv_results_
+        if hasattr(busca, 'medicoes_'):
+            self.rastreador.registrar_ajustes(busca.cv_results_, busca.medicoes_, self.target_cols)
+        else:
+            self.rastreador.registrar_candidatos(busca.cv_results_, busca.n_splits_, inicio_epoch)
+        
+        # O warm_start mede o crescimento de cada floresta dentro das suas próprias tarefas
+        for ajuste in getattr(busca, 'ajustes_florestas_', []):
+            alvo = ajuste['alvo']
+            nome = self.target_cols[alvo] if isinstance(alvo, int) else 'floresta multi-saída'
+            self.rastreador.evento(nome, ajuste['inicio'], ajuste['duracao_s'], categoria='ajuste',
+                                   trilha='florestas', pid=ajuste['pid'], grupo=ajuste['grupo'], fold=ajuste['fold'])
+        
+        if hasattr(busca, 'refit_time_'):
+            self.rastreador.evento('reajuste final', time.time() - busca.refit_time_, busca.refit_time_,
+                                   categoria='ajuste')
+    
+    def treinar_com_versionamento(self, X_train, y_train, preprocessor, X_val=None):
+        """Treinar conforme a versão dos dados: pular, atualizar de forma incremental ou buscar do zero
+        
+        As linhas de X_val ficam gravadas com a versão para que as próximas mantenham a mesma validação.
+        """
+        if self.snapshot_dados is None:
+            print("Erro: Snapshot dos dados não criado (habilite VERSIONAR_DADOS antes de carregar os dados)!")
+            return
+        
+        inicio = time.perf_counter()
+        modo_modelo = self.config.MODO_MODELO
+        registro = RegistroVersoes(self.config.DIR_VERSIONAMENTO)
+        decisao = decidir_retreinamento(self.snapshot_dados, registro, self.config,
+                                        os.path.exists(self.config.CAMINHO_MODELO), modo_modelo)
+        print(f"Versionamento de dados: '{decisao.acao}' ({decisao.motivo})")
+        
+        melhores_parametros = registro.ultima['melhores_parametros'] if registro.ultima else None
+        
+        if decisao.acao == 'pular':
+            self.best_model = joblib.load(self.config.CAMINHO_MODELO)
+        
+        elif decisao.acao == 'incremental':
+            novas_arvores = 0
+            if self.config.MODO_INCREMENTAL == 'arvores':
+                self.best_model = joblib.load(self.config.CAMINHO_MODELO)
+                novas = X_train.index >= registro.ultima['linhas']
+                fracao = novas.sum() / max(1, (~novas).sum())
+                novas_arvores = adicionar_arvores(self.best_model, X_train[novas], y_train[novas], fracao)
+                if novas_arvores:
+                    print(f"{novas_arvores} árvores treinadas com {novas.sum()} linhas novas adicionadas ao modelo")
+                else:
+                    print("Linhas novas sem as duas classes em algum alvo; reajustando os melhores parâmetros")
+            
+            if novas_arvores:
+                self.salvar_medianas_treino()
+                if self.config.EXPORTAR_MODELO_COMPILADO:
+                    self.exportar_modelo_compilado()
+            else:
+                self.treinar_modelo(X_train, y_train, preprocessor, otimizar=False,
+                                    modo_modelo=modo_modelo, parametros=melhores_parametros)
+            
+            joblib.dump(self.best_model, self.config.CAMINHO_MODELO)
+        
+        else:
+            self.treinar_modelo(X_train, y_train, preprocessor, otimizar=True, modo_modelo=modo_modelo)
+            melhores_parametros = self.resultado_busca['melhores_parametros']
+        
+        linhas_validacao = X_val.index.to_numpy() if X_val is not None else None
+        entrada = registro.registrar(self.snapshot_dados, decisao, time.perf_counter() - inicio,
+                                     melhores_parametros, modo_modelo, linhas_validacao)
+        if entrada['tempo_economizado_s'] is not None:
+            print(f"Tempo economizado em relação à busca completa: {entrada['tempo_economizado_s']:.1f} s")
+        
+        return self.best_model
+    
+    def exportar_modelo_compilado(self, caminho=None, dir_artefato=None):
+        """Exportar o pipeline treinado para o motor de inferência compilado"""
+        if self.best_model is None:
+            print("Erro: Modelo não treinado!")
+            return
+        
+        caminho = caminho or self.config.CAMINHO_MODELO_COMPILADO
+        modelo_compilado = compilar_pipeline(self.best_model)
+        modelo_compilado.salvar(caminho)
+        print(f"Modelo compilado salvo em '{caminho}' ({len(modelo_compilado.raizes)} árvores)")
+        
+        # Mesmos arrays em blocos .npy mapeáveis em memória, com manifesto, para servir com vários workers
+        dir_artefato = dir_artefato or self.config.DIR_ARTEFATO_MODELO
+        salvar_artefato(modelo_compilado, dir_artefato, self.features, self.target_cols, self.hash_dados_treino)
+        print(f"Artefato do modelo salvo em '{dir_artefato}/'")
+        
+        return modelo_compilado
+    
+    def comprimir_modelo(self, X_val, y_val):
+        """Comprimir as florestas treinadas mantendo a AUC de validação dentro da tolerância"""
+        if self.best_model is None:
+            print("Erro: Modelo não treinado!")
+            return
+        
+        config = self.config
+        print(f"Comprimindo o modelo (tolerância de AUC {config.TOLERANCIA_AUC_COMPRESSAO})...")
+        
+        with self.rastreador.etapa('comprimir', 'ajuste', linhas=len(X_val)):
+            comprimido, relatorio = comprimir_pipeline(
+                self.best_model, X_val, y_val, self.target_cols, config.TOLERANCIA_AUC_COMPRESSAO,
+                config.PROFUNDIDADE_COMPRESSAO, config.FUSAO_FOLHAS_COMPRESSAO, config.RANDOM_STATE
+            )
+        
+        # Modelo comprimido ao lado do original
+        joblib.dump(comprimido, config.CAMINHO_MODELO_COMPRIMIDO)
+        relatorio['caminho'] = config.CAMINHO_MODELO_COMPRIMIDO
+        relatorio['comprimido']['tamanho_arquivo_mb'] = os.path.getsize(config.CAMINHO_MODELO_COMPRIMIDO) / 2 ** 20
+        
+        largura = max(map(len, relatorio['por_alvo']))
+        print(f"{'Alvo':<{largura}} {'árvores':>11} {'nós':>17} {'AUC':>15} {'AUC controle':>15} {'poda':>5}")
+        for alvo, registro in relatorio['por_alvo'].items():
+            if registro['auc'] is not None:
+                auc = f"{registro['auc_original']:.4f}->{registro['auc']:.4f}"
+                auc_controle = f"{registro['auc_controle_original']:.4f}->{registro['auc_controle']:.4f}"
+            else:
+                auc = auc_controle = 'indefinida'
+            print(f"{alvo:<{largura}} {registro['arvores_original']:>5}->{registro['arvores']:<5} "
+                  f"{registro['nos_original']:>8}->{registro['nos']:<8} {auc:>15} {auc_controle:>15} "
+                  f"{'sim' if registro['podada'] else 'não':>5}")
+        
+        original, novo = relatorio['original'], relatorio['comprimido']
+        print(f"Tamanho: {original['tamanho_mb']:.1f} MB -> {novo['tamanho_mb']:.1f} MB | "
+              f"AUC de validação: {original['auc_validacao']:.4f} -> {novo['auc_validacao']:.4f}")
+        for motor in ('sklearn', 'compilado'):
+            antes, depois = original[f'latencia_{motor}'], novo[f'latencia_{motor}']
+            print(f"Latência ({motor}): {antes['lote_ms_por_1000']:.1f} -> {depois['lote_ms_por_1000']:.1f} "
+                  f"ms/1000 linhas, {antes['linha_ms']:.2f} -> {depois['linha_ms']:.2f} ms por linha")
+        
+        with open(config.CAMINHO_RELATORIO_COMPRESSAO, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=2, ensure_ascii=False)
+        print(f"Modelo comprimido salvo em '{config.CAMINHO_MODELO_COMPRIMIDO}' "
+              f"(relatório em '{config.CAMINHO_RELATORIO_COMPRESSAO}')")
+        
+        return relatorio
+    
+    def _colunas_extras_segmento(self):
+        """Colunas de segmento que não são features (ex.: 'site'), lidas junto com as features"""
+        if not self.config.MODELOS_POR_SEGMENTO:
+            return []
+        return [col for col in self.config.COLUNAS_SEGMENTO if col not in self.features]
+    
+    def _chaves_segmento(self, X):
+        """Chave do segmento de cada linha de X (colunas que não são features vêm de df_train)"""
+        extras = [col for col in self.config.COLUNAS_SEGMENTO if col not in X.columns]
+        if extras:
+            X = X.join(self.df_train.loc[X.index, extras])
+        return chaves_segmento(X, self.config.COLUNAS_SEGMENTO)
+    
+    def treinar_modelos_segmento(self, X_train, y_train, X_val, y_val):
+        """Treinar um modelo por segmento com os hiperparâmetros do modelo global e gravar o registro"""
+        if self.best_model is None:
+            print("Erro: Modelo não treinado!")
+            return
+        
+        config = self.config
+        print(f"Treinando modelos por segmento ({', '.join(config.COLUNAS_SEGMENTO)})...")
+        
+        grupos_validacao = dict(agrupar_por_chave(self._chaves_segmento(X_val)))
+        nos_global = len(compilar_pipeline(self.best_model).esquerda)
+        y_val = y_val.to_numpy()
+        
+        avaliados, segmentos = {}, {}
+        for chave, indices in agrupar_por_chave(self._chaves_segmento(X_train)):
+            if len(indices) < config.MIN_LINHAS_SEGMENTO:
+                print(f"  Segmento '{chave}': {len(indices)} linhas (< {config.MIN_LINHAS_SEGMENTO}), "
+                      f"usa o modelo global")
+                continue
+            
+            modelo = clone(self.best_model)
+            with self.rastreador.etapa(f'segmento {chave}', 'ajuste', linhas=len(indices)):
+                modelo.fit(X_train.iloc[indices], y_train.iloc[indices])
+            compilado = compilar_pipeline(modelo)
+            
+            # AUC do modelo do segmento e do global nas linhas de validação do segmento
+            indices_val = grupos_validacao.get(chave, np.array([], dtype=np.int64))
+            X_seg, y_seg = X_val.iloc[indices_val], y_val[indices_val]
+            info = {
+                'linhas_treino': len(indices),
+                'linhas_validacao': len(indices_val),
+                'auc_validacao': auc_avaliavel(y_seg, compilado.prever_proba(X_seg)),
+                'auc_global': auc_avaliavel(y_seg, probabilidades_positivas(self.best_model.predict_proba(X_seg))),
+                'nos': int(len(compilado.esquerda)),
+            }
+            
+            # Modelo do segmento só entra no registro se não for pior que o global além da tolerância
+            tolerancia = config.TOLERANCIA_AUC_SEGMENTO
+            info['registrado'] = (tolerancia is None or info['auc_validacao'] is None
+                                  or info['auc_validacao'] >= info['auc_global'] - tolerancia)
+            if info['registrado']:
+                segmentos[chave] = dict(info, **salvar_segmento(
+                    config.DIR_REGISTRO_MODELOS, config.COLUNAS_SEGMENTO, chave, compilado,
+                    self.features, self.target_cols, self.hash_dados_treino
+                ))
+            avaliados[chave] = info
+        
+        caminho = salvar_registro(config.DIR_REGISTRO_MODELOS, config.COLUNAS_SEGMENTO, segmentos)
+        
+        largura = max([len('Segmento')] + [len(chave) for chave in avaliados])
+        print(f"{'Segmento':<{largura}} {'linhas':>7} {'nós (global)':>19} {'AUC (global)':>17} {'modelo':>9}")
+        for chave, info in avaliados.items():
+            auc = (f"{info['auc_validacao']:.4f} ({info['auc_global']:.4f})"
+                   if info['auc_validacao'] is not None else 'indefinida')
+            print(f"{chave:<{largura}} {info['linhas_treino']:>7} {info['nos']:>8} ({nos_global:>8}) {auc:>17} "
+                  f"{'segmento' if info['registrado'] else 'global':>9}")
+        print(f"Registro de {len(segmentos)} modelos salvo em '{caminho}'")
+        
+        return segmentos
+    
+    def _pontuador_predicao(self):
+        """Função X -> probabilidades: registro de modelos por segmento (se houver) ou modelo global,
+        com o cache de predições na frente quando habilitado"""
+        def pontuar_global(X):
+            return probabilidades_positivas(self.best_model.predict_proba(X[self.features]))
+        
+        config = self.config
+        pontuar, versao, extras = pontuar_global, None, []
+        if config.MODELOS_POR_SEGMENTO and registro_existe(config.DIR_REGISTRO_MODELOS):
+            self.registro_modelos = RegistroModelos(config.DIR_REGISTRO_MODELOS, self.features, self.target_cols,
+                                                    config.CACHE_MODELOS_MB, pontuar_padrao=pontuar_global)
+            print(f"Usando {len(self.registro_modelos.segmentos)} modelos por segmento de "
+                  f"'{config.DIR_REGISTRO_MODELOS}' (modelo global para os demais)")
+            pontuar = self.registro_modelos.prever_proba
+            versao = versao_modelo(caminho=config.DIR_REGISTRO_MODELOS)
+            extras = [col for col in self.registro_modelos.colunas if col not in self.features]
+        
+        if not config.CACHE_PREDICOES:
+            return pontuar
+        
+        # A versão cobre o modelo global e, com segmentos, o registro: outro modelo invalida o cache.
+        # Colunas de segmento que não são features (ex.: 'site') entram na chave, pois mudam o modelo usado
+        versao = versao_modelo(self.best_model) + (versao or '')
+        if self.cache_predicoes is None or self.cache_predicoes.versao != versao:
+            self.cache_predicoes = CachePredicoes(
+                pontuar, self.numerical_features, self.categorical_features + extras, len(self.target_cols),
+                versao, config.CACHE_PREDICOES_MAX, config.CACHE_PREDICOES_CASAS
+            )
+        self.cache_predicoes.pontuar = pontuar
+        return self.cache_predicoes.prever
+    
+    def _imprimir_estatisticas_predicao(self):
+        """Métricas do registro de modelos e do cache de predições, quando usados"""
+        if self.registro_modelos is not None:
+            estatisticas = self.registro_modelos.estatisticas()
+            cache = estatisticas['cache']
+            print(f"Linhas por segmento: {estatisticas['linhas_por_segmento']} | modelo global: "
+                  f"{estatisticas['linhas_modelo_padrao']} | cache: {cache['carregamentos']} carregamentos, "
+                  f"{cache['acertos']} acertos, {cache['despejos']} despejos, {cache['mb_carregados']:.1f} MB")
+        if self.cache_predicoes is not None:
+            e = self.cache_predicoes.estatisticas()
+            print(f"Cache de predições: {e['linhas']} linhas, {e['acertos']} acertos, {e['repetidas_no_lote']} "
+                  f"repetidas no lote, {e['pontuadas']} pontuadas (taxa de acerto {e['taxa_acerto']:.1%}), "
+                  f"{e['despejos']} despejos, {e['tempo_total_s']:.2f} s")
+    
     def avaliar_modelo(self, X_val, y_val):
         """Avaliar desempenho do modelo"""
         if self.best_model is None:
@@ -305,8 +743,12 @@ class ManutencaoPreditiva:
         
         print("Avaliando modelo no conjunto de validação...")
         
-        # Previsões
-        y_pred_val = self.best_model.predict(X_val)
+        # Uma única passagem de inferência: rótulos derivados das probabilidades (limiar 0,5 = predict)
+        with self.rastreador.etapa('predict_proba', 'predicao', linhas=len(X_val)):
+            y_proba_val = probabilidades_positivas(self.best_model.predict_proba(X_val))
+        avaliacao = avaliar_probabilidades(y_val, y_proba_val, self.target_cols,
+                                           self.config.AJUSTAR_LIMIARES, self.config.BETA_LIMIAR)
+        y_pred_val = avaliacao['rotulos']
         
         # Relatório de classificação
         print("\nRelatório de Classificação:")
@@ -317,127 +759,288 @@ class ManutencaoPreditiva:
         
         # Tentar calcular AUC-ROC
         try:
-            y_proba_val = self.best_model.predict_proba(X_val)
-            probabilities = []
-            
-            for p in y_proba_val:
-                if p.shape[1] == 2:
-                    probabilities.append(p[:, 1])
-                else:
-                    probabilities.append(np.zeros(p.shape[0]))
-            
-            y_proba_val_reformatted = np.array(probabilities).T
-            auc_score = roc_auc_score(y_val, y_proba_val_reformatted, average='weighted')
+            auc_score = roc_auc_score(y_val, y_proba_val, average='weighted')
             print(f"\nAUC-ROC Score (Média Ponderada): {auc_score:.4f}")
             
         except ValueError as e:
             print(f"\nNão foi possível calcular o AUC Score. Motivo: {e}")
+            auc_score = None
+        
+        # Limiares de decisão por tipo de falha
+        if self.config.AJUSTAR_LIMIARES:
+            print(f"\nLimiares de decisão (F{self.config.BETA_LIMIAR:g} na validação):")
+            largura = max(map(len, self.target_cols))
+            print(f"{'Alvo':<{largura}} {'limiar':>7} {'F (0,5)':>8} {'F (ajust.)':>11}")
+            for alvo, metricas in avaliacao['metricas'].items():
+                print(f"{alvo:<{largura}} {metricas['limiar']:>7.3f} {metricas['f_padrao']:>8.3f} "
+                      f"{metricas['f_ajustado']:>11.3f}")
+            salvar_limiares(self.config.CAMINHO_LIMIARES, avaliacao['limiares'],
+                            self.config.BETA_LIMIAR, avaliacao['metricas'])
+            print(f"Limiares salvos em '{self.config.CAMINHO_LIMIARES}'")
+        
+        return {'predicoes': y_pred_val, 'probabilidades': y_proba_val, 'auc': auc_score,
+                'limiares': avaliacao['limiares']}
     
     def _plot_confusion_matrices(self, y_val, y_pred_val):
         """Plotar matrizes de confusão"""
-        fig, axes = plt.subplots(2, 3, figsize=(15, 8))
-        axes = axes.flatten()
+        if not self.visualizacoes.ativo:
+            return
         
-        for i, col in enumerate(self.target_cols):
-            cm = confusion_matrix(y_val[col], y_pred_val[:, i])
-            
-            labels = [
-                ['Verdadeiro Negativo\n'+str(cm[0,0]), 'Falso Positivo\n'+str(cm[0,1])],
-                ['Falso Negativo\n'+str(cm[1,0]), 'Verdadeiro Positivo\n'+str(cm[1,1])]
-            ]
-            
-            label_text = np.asarray(labels).reshape(2,2)
-            sns.heatmap(cm, annot=label_text, fmt='', cmap='Blues', ax=axes[i], cbar=False)
-            
-            axes[i].set_title(col)
-            axes[i].set_ylabel('Rótulo Verdadeiro')
-            axes[i].set_xlabel('Rótulo Previsto')
+        matrizes = [
+            (col, confusion_matrix(y_val[col], y_pred_val[:, i], labels=[0, 1]))
+            for i, col in enumerate(self.target_cols)
+        ]
+        self.visualizacoes.submeter(
+            renderizar_matrizes_confusao, matrizes, 'visualizations/confusion_matrices.png'
+        )
+    
+    def _mediana_treino(self, col):
+        """Mediana de treino de uma feature (guardada na limpeza ou lida do arquivo salvo)"""
+        if self.medianas_treino is None:
+            if self.df_train is not None:
+                return float(restaurar_dataframe(self.df_train[[col]], [col])[col].median())
+            with open(self.config.CAMINHO_MEDIANAS, encoding='utf-8') as f:
+                self.medianas_treino = json.load(f)['medianas']
+        return self.medianas_treino[col]
+    
+    def salvar_medianas_treino(self, caminho=None):
+        """Salvar as medianas de treino usadas para preencher valores faltantes na predição"""
+        if not self.medianas_treino:
+            return
         
-        axes[5].axis('off')
-        plt.tight_layout()
-        plt.savefig('visualizations/confusion_matrices.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        caminho = caminho or self.config.CAMINHO_MEDIANAS
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump({'medianas': self.medianas_treino, 'features': self.features,
+                       'alvos': self.target_cols}, f, indent=2, ensure_ascii=False)
+        print(f"Medianas de treino salvas em '{caminho}'")
     
-    def gerar_predicoes(self, caminho_test="data/bootcamp_test.csv"):
+    def gerar_predicoes(self, caminho_test="data/bootcamp_test.csv", tamanho_bloco=None, n_workers=None):
         """Gerar predições para o conjunto de teste"""
         if self.best_model is None:
             print("Erro: Modelo não treinado!")
             return
         
+        tamanho_bloco = tamanho_bloco or self.config.TAMANHO_BLOCO_PREDICAO
+        if tamanho_bloco:
+            return self._gerar_predicoes_em_blocos(caminho_test, tamanho_bloco,
+                                                   n_workers or self.config.N_WORKERS_PREDICAO)
+        
         if self.df_test is None:
             if os.path.exists(caminho_test):
-                self.df_test = pd.read_csv(caminho_test)
+                self.df_test, _ = self._ler_csv(caminho_test)
             else:
                 print(f"Arquivo de teste não encontrado: {caminho_test}")
                 return
         
         print("Gerando predições para o conjunto de teste...")
         
-        # Limpar dados de teste
-        df_test_clean = self.df_test.copy()
-        for col in self.numerical_features:
-            if col in df_test_clean.columns:
-                mediana = self.df_train[col].median()  # Usar mediana do treino
-                df_test_clean[col].fillna(mediana, inplace=True)
-        
-        # Fazer predições
-        X_test = df_test_clean[self.features]
-        test_probabilities = self.best_model.predict_proba(X_test)
-        
-        # Criar DataFrame de submissão
-        submission_df = pd.DataFrame()
-        submission_df['id'] = df_test_clean['id']
-        
-        probabilities_submission = []
-        for p in test_probabilities:
-            if p.shape[1] == 2:
-                probabilities_submission.append(p[:, 1])
-            else:
-                probabilities_submission.append(np.zeros(p.shape[0]))
+        # Limpar dados de teste (só as features são copiadas, preenchidas com as medianas do treino)
+        medianas = {col: self._mediana_treino(col) for col in self.numerical_features}
+        X_test = restaurar_dataframe(self.df_test[self.features + self._colunas_extras_segmento()],
+                                     self.numerical_features)
+        X_test = X_test.fillna(medianas)
         
-        for i, col in enumerate(self.target_cols):
-            submission_df[col] = probabilities_submission[i]
+        # Fazer predições (modelos por segmento, se habilitados, ou o modelo global)
+        pontuar = self._pontuador_predicao()
+        with self.rastreador.etapa('predict_proba', 'predicao', linhas=len(X_test)):
+            test_probabilities = pontuar(X_test)
+        self._imprimir_estatisticas_predicao()
+        
+        # Criar DataFrame de submissão (matriz de probabilidades inteira, sem laço por alvo)
+        submission_df = pd.DataFrame(test_probabilities, columns=self.target_cols, index=self.df_test.index)
+        submission_df.insert(0, 'id', self.df_test['id'])
         
         # Salvar arquivo
-        submission_df.to_csv('outputs/submission.csv', index=False)
-        print("Arquivo 'outputs/submission.csv' gerado com sucesso!")
+        submission_df.to_csv(self.config.CAMINHO_SUBMISSION, index=False)
+        print(f"Arquivo '{self.config.CAMINHO_SUBMISSION}' gerado com sucesso!")
         
         return submission_df
     
-    def executar_pipeline_completo(self, otimizar_modelo=True):
-        """Executar todo o pipeline do projeto"""
-        print("=== EXECUTANDO PIPELINE COMPLETO ===")
+    def _gerar_predicoes_em_blocos(self, caminho_test, tamanho_bloco, n_workers):
+        """Pontuar o arquivo de teste em blocos, com memória constante, escrevendo a submissão aos poucos
+
+        Com n_workers > 1 os blocos são pontuados em threads que compartilham o rastreador, o registro
+        de modelos (cache LRU) e o cache de predições; cada um protege o próprio estado com uma trava.
+        """
+        if not os.path.exists(caminho_test):
+            print(f"Arquivo de teste não encontrado: {caminho_test}")
+            return
         
-        # 1. Carregar dados
-        self.carregar_dados()
+        print(f"Gerando predições em blocos de {tamanho_bloco} linhas ({n_workers} worker(s))...")
         
-        # 2. Diagnóstico
-        self.diagnostico_dados()
+        medianas = {col: self._mediana_treino(col) for col in self.numerical_features}
+        pontuar_modelo = self._pontuador_predicao()
         
-        # 3. Limpeza
-        self.limpar_dados()
+        def pontuar(X):
+            with self.rastreador.etapa('predict_proba (bloco)', 'predicao', linhas=len(X)):
+                return pontuar_modelo(X)
+        
+        estatisticas = pontuar_csv_em_blocos(
+            pontuar, caminho_test, self.config.CAMINHO_SUBMISSION, self.features + self._colunas_extras_segmento(),
+            self.target_cols, medianas, tamanho_bloco, n_workers
+        )
+        self._imprimir_estatisticas_predicao()
+        
+        print(f"{estatisticas['linhas']} linhas em {estatisticas['blocos']} blocos, "
+              f"{estatisticas['tempo_s']:.1f} s ({estatisticas['linhas_por_s']:.0f} linhas/s)")
+        print(f"Arquivo '{self.config.CAMINHO_SUBMISSION}' gerado com sucesso!")
+        
+        return estatisticas
+    
+    def _estagios_pipeline(self, otimizar_modelo=True):
+        """Estágios do pipeline completo como grafo de dependências, com o que entra na chave de cada checkpoint
+        
+        O código de cada chave é o da função do estágio e de tudo o que ela alcança no projeto, e as
+        configurações são os campos que esse código lê (ver dag_pipeline.dependencias_codigo e
+        campos_lidos); aqui ficam só as entradas externas e os arquivos gerados.
+        """
+        config = self.config
         
-        # 4. Análise exploratória
-        self.analise_exploratoria()
+        def restaurar_atributos(saida):
+            for atributo, valor in saida.items():
+                setattr(self, atributo, valor)
         
-        # 5. Preparação
-        X_train, X_val, y_train, y_val, preprocessor = self.preparar_dados()
+        def hash_se_existir(caminho):
+            return calcular_hash_arquivo(caminho) if os.path.exists(caminho) else None
         
-        # 6. Treinamento
-        self.treinar_modelo(X_train, y_train, preprocessor, otimizar=otimizar_modelo)
+        # 1. Carregar dados
+        def carregar(saidas):
+            self.carregar_dados(config.CAMINHO_DADOS_TREINO)
+            return {'df_train': self.df_train, 'hash_dados_treino': self.hash_dados_treino,
+                    'snapshot_dados': self.snapshot_dados}
+        
+        # 3. Limpeza
+        def limpar(saidas):
+            self.limpar_dados()
+            return {'df_train': self.df_train, 'medianas_treino': self.medianas_treino}
+        
+        # 6. Treinamento (com versionamento, só o necessário para a versão atual dos dados)
+        def treinar(saidas):
+            X_train, X_val, y_train, _, preprocessor = saidas['preparar_dados']
+            if config.VERSIONAR_DADOS and otimizar_modelo:
+                self.treinar_com_versionamento(X_train, y_train, preprocessor, X_val)
+            else:
+                self.treinar_modelo(X_train, y_train, preprocessor, otimizar=otimizar_modelo)
+            return {'best_model': self.best_model, 'resultado_busca': self.resultado_busca,
+                    'medianas_treino': self.medianas_treino}
+        
+        # Compressão (opcional): modelo menor salvo ao lado do original
+        def comprimir(saidas):
+            _, X_val, _, y_val, _ = saidas['preparar_dados']
+            return self.comprimir_modelo(X_val, y_val)
+        
+        # Modelos por segmento (opcional): registro gravado ao lado do modelo global
+        def treinar_segmentos(saidas):
+            X_train, X_val, y_train, y_val, _ = saidas['preparar_dados']
+            return self.treinar_modelos_segmento(X_train, y_train, X_val, y_val)
         
         # 7. Avaliação
-        self.avaliar_modelo(X_val, y_val)
+        def avaliar(saidas):
+            _, X_val, _, y_val, _ = saidas['preparar_dados']
+            return self.avaliar_modelo(X_val, y_val)
+        
+        versionar = config.VERSIONAR_DADOS and otimizar_modelo
+        arquivos_modelo = [config.CAMINHO_MODELO if otimizar_modelo else 'models/modelo_basico.pkl']
+        if config.EXPORTAR_MODELO_COMPILADO:
+            arquivos_modelo.append(config.CAMINHO_MODELO_COMPILADO)
+        
+        estagios = [
+            Estagio('carregar_dados', carregar, restaurar=restaurar_atributos,
+                    entradas={'treino': hash_se_existir(config.CAMINHO_DADOS_TREINO)},
+                    linhas=lambda saida: len(saida['df_train'])),
+            # 2. Diagnóstico
+            Estagio('diagnostico_dados', lambda saidas: self.diagnostico_dados(), ['carregar_dados'],
+                    linhas=lambda saida: saida['linhas'] if saida else None),
+            Estagio('limpar_dados', limpar, ['carregar_dados'], restaurar=restaurar_atributos,
+                    linhas=lambda saida: len(saida['df_train'])),
+            # 4. Análise exploratória (a saída é o gráfico)
+            Estagio('analise_exploratoria', lambda saidas: self.analise_exploratoria(), ['limpar_dados'],
+                    arquivos=['visualizations/analise_exploratoria.png'] if self.visualizacoes.ativo else []),
+            # 5. Preparação
+            # Com versionamento, a divisão reaproveita a validação gravada da última versão dos dados
+            Estagio('preparar_dados', lambda saidas: self.preparar_dados(),
+                    ['limpar_dados'] + (['carregar_dados'] if versionar else []),
+                    linhas=lambda saida: len(saida[0]) + len(saida[1])),
+            # O versionamento compara o snapshot dos dados brutos, criado ao carregar
+            Estagio('treinar_modelo', treinar, ['preparar_dados'] + (['carregar_dados'] if versionar else []),
+                    restaurar=restaurar_atributos,
+                    entradas={'otimizar': otimizar_modelo}, arquivos=arquivos_modelo),
+        ]
+        
+        if config.COMPRIMIR_MODELO:
+            estagios.append(Estagio(
+                'comprimir_modelo', comprimir, ['treinar_modelo', 'preparar_dados'],
+                arquivos=[config.CAMINHO_MODELO_COMPRIMIDO, config.CAMINHO_RELATORIO_COMPRESSAO]
+            ))
+        
+        if config.MODELOS_POR_SEGMENTO:
+            estagios.append(Estagio(
+                'treinar_segmentos', treinar_segmentos, ['treinar_modelo', 'preparar_dados', 'limpar_dados'],
+                arquivos=[str(Path(config.DIR_REGISTRO_MODELOS) / ARQUIVO_REGISTRO)]
+            ))
+        
+        estagios += [
+            Estagio('avaliar_modelo', avaliar, ['treinar_modelo', 'preparar_dados'],
+                    arquivos=(['visualizations/confusion_matrices.png'] if self.visualizacoes.ativo else [])
+                    + ([config.CAMINHO_LIMIARES] if config.AJUSTAR_LIMIARES else []),
+                    linhas=lambda saida: len(saida['predicoes'])),
+        ]
         
         # 8. Predições (se arquivo de teste existir)
-        if os.path.exists('data/bootcamp_test.csv'):
-            self.gerar_predicoes()
+        if os.path.exists(config.CAMINHO_DADOS_TESTE):
+            estagios.append(Estagio(
+                'gerar_predicoes', lambda saidas: self.gerar_predicoes(config.CAMINHO_DADOS_TESTE),
+                ['treinar_modelo'] + (['treinar_segmentos'] if config.MODELOS_POR_SEGMENTO else []),
+                entradas={'teste': hash_se_existir(config.CAMINHO_DADOS_TESTE)},
+                arquivos=[config.CAMINHO_SUBMISSION],
+                linhas=lambda saida: saida['linhas'] if isinstance(saida, dict) else len(saida)
+            ))
+        
+        return estagios
+    
+    def executar_pipeline_completo(self, otimizar_modelo=True, a_partir_de=None, apenas=None):
+        """Executar todo o pipeline do projeto
+        
+        Com USAR_CHECKPOINTS, estágios cujo checkpoint está atualizado não são reexecutados;
+        a_partir_de reexecuta um estágio e os seguintes, apenas reexecuta um único estágio.
+        """
+        print("=== EXECUTANDO PIPELINE COMPLETO ===")
+        dir_checkpoints = self.config.DIR_CHECKPOINTS if self.config.USAR_CHECKPOINTS else None
+        
+        with self.rastreador.etapa('pipeline_completo', 'pipeline'):
+            dag = PipelineDAG(self._estagios_pipeline(otimizar_modelo), self.config, dir_checkpoints,
+                              self.rastreador)
+            dag.executar(a_partir_de=a_partir_de, apenas=apenas)
+            
+            # Gráficos renderizados em segundo plano (modo 'deferred')
+            with self.rastreador.etapa('aguardar_visualizacoes'):
+                self.visualizacoes.aguardar()
+        
+        if self.rastreador.ativo:
+            self.salvar_rastreamento()
         
         print("\n=== PIPELINE COMPLETO EXECUTADO ===")
+    
+    def salvar_rastreamento(self, caminho=None):
+        """Imprimir o resumo por etapa, gravar o trace (Chrome/Perfetto) e o resumo em CAMINHO_METRICAS"""
+        caminho = caminho or self.config.CAMINHO_TRACE
+        self.rastreador.imprimir_resumo()
+        self.rastreador.exportar_chrome_trace(caminho)
+        salvar_metricas(self.config.CAMINHO_METRICAS, 'rastreamento',
+                        {'trace': caminho, 'etapas': self.rastreador.resumo()})
+        print(f"Trace da execução salvo em '{caminho}' (abrir em chrome://tracing ou ui.perfetto.dev)")
 
 
-def main():
+def main(argv=None):
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Executar o pipeline completo (estágios com checkpoint)")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument('--from-stage', choices=ESTAGIOS_PIPELINE, default=None,
+                       help="Reexecutar este estágio e os que dependem dele, ignorando seus checkpoints")
+    grupo.add_argument('--only-stage', choices=ESTAGIOS_PIPELINE, default=None,
+                       help="Reexecutar apenas este estágio (dependências restauradas dos checkpoints)")
+    args = parser.parse_args(argv)
+    
     print("Sistema de Manutenção Preditiva - Bootcamp CDIA")
     print("=" * 50)
     
@@ -445,7 +1048,7 @@ def main():
     sistema = ManutencaoPreditiva()
     
     # Executar pipeline completo
-    sistema.executar_pipeline_completo(otimizar_modelo=True)
+    sistema.executar_pipeline_completo(otimizar_modelo=True, a_partir_de=args.from_stage, apenas=args.only_stage)
 
 
 if __name__ == "__main__":
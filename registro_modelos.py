@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Registro de Modelos por Segmento do Sistema de Manutenção Preditiva
+Um modelo compilado (artefato mapeado em memória) por segmento, ex.: por 'tipo' de máquina ou por
+tipo e site; na predição as linhas são agrupadas pela chave do segmento e cada grupo é pontuado de
+uma vez pelo seu modelo, carregado sob demanda num cache LRU com limite de memória
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from artefato_modelo import carregar_artefato, salvar_artefato
+from inferencia_compilada import FlorestaCompilada
+
+ARQUIVO_REGISTRO = 'registro.json'
+
+# Separador das colunas na chave de um segmento com mais de uma coluna (ex.: 'L|site_2')
+SEPARADOR_CHAVE = '|'
+
+
+def chaves_segmento(X, colunas: List[str]) -> np.ndarray:
+    """Chave do segmento de cada linha (valores das colunas como texto, unidos por SEPARADOR_CHAVE)
+
+    X pode ser um DataFrame ou um dicionário coluna -> array.
+    """
+    valores = [np.asarray(X[col]).astype(str) for col in colunas]
+    chaves = valores[0].astype(object)
+    for coluna in valores[1:]:
+        chaves = chaves + SEPARADOR_CHAVE + coluna.astype(object)
+    return chaves
+
+
+def agrupar_por_chave(chaves: np.ndarray) -> List[Tuple[str, np.ndarray]]:
+    """(chave, índices das linhas) de cada segmento presente, com uma única ordenação"""
+    if len(chaves) == 0:
+        return []
+    unicas, inverso, contagens = np.unique(chaves, return_inverse=True, return_counts=True)
+    ordem = np.argsort(inverso, kind='stable')
+    return list(zip(unicas.tolist(), np.split(ordem, np.cumsum(contagens)[:-1])))
+
+
+def selecionar_linhas(X, indices: np.ndarray):
+    """Subconjunto das linhas de um DataFrame ou dicionário coluna -> array"""
+    if hasattr(X, 'iloc'):
+        return X.iloc[indices]
+    return {col: np.asarray(valores)[indices] for col, valores in X.items()}
+
+
+def _nome_diretorio(colunas: List[str], chave: str) -> str:
+    """Nome do diretório de um segmento, ex.: 'tipo=L' ou 'tipo=L__site=A'"""
+    partes = [f"{col}={valor}" for col, valor in zip(colunas, chave.split(SEPARADOR_CHAVE))]
+    return re.sub(r'[^A-Za-z0-9_.=-]', '_', '__'.join(partes))
+
+
+def salvar_segmento(diretorio: str, colunas: List[str], chave: str, modelo: FlorestaCompilada,
+                    features: List[str], alvos: List[str], hash_dados: Optional[str] = None) -> Dict:
+    """Gravar o artefato de um segmento e devolver sua entrada no registro"""
+    nome = _nome_diretorio(colunas, chave)
+    manifesto = salvar_artefato(modelo, str(Path(diretorio) / nome), features, alvos, hash_dados)
+    return {
+        'diretorio': nome,
+        'bytes': sum(info['bytes'] for info in manifesto['arquivos'].values()),
+        'arvores': int(len(modelo.raizes)),
+        'nos': int(len(modelo.esquerda)),
+        'criado_em': manifesto['criado_em'],
+    }
+
+
+def salvar_registro(diretorio: str, colunas: List[str], segmentos: Dict[str, Dict]) -> str:
+    """Gravar o índice do registro (troca atômica do arquivo) e remover artefatos fora dele"""
+    caminho = Path(diretorio) / ARQUIVO_REGISTRO
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    temporario = caminho.with_suffix('.tmp')
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump({'colunas': list(colunas), 'criado_em': datetime.now().isoformat(timespec='seconds'),
+                   'segmentos': segmentos}, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+    em_uso = {info['diretorio'] for info in segmentos.values()}
+    for item in Path(diretorio).iterdir():
+        if item.is_dir() and item.name not in em_uso:
+            shutil.rmtree(item, ignore_errors=True)
+    return str(caminho)
+
+
+def registro_existe(diretorio: str) -> bool:
+    return (Path(diretorio) / ARQUIVO_REGISTRO).exists()
+
+
+class CacheModelos:
+    """Cache LRU de modelos carregados, limitado pela soma dos tamanhos dos artefatos
+
+    Ao passar de max_mb, os modelos usados há mais tempo são descartados (o modelo recém-carregado
+    sempre fica, mesmo que sozinho passe do limite). Seguro para uso por vários threads.
+    """
+
+    def __init__(self, carregar: Callable[[str], Tuple[object, int]], max_mb: float):
+        self.carregar = carregar
+        self.max_bytes = max_mb * 2 ** 20
+        self._modelos: 'OrderedDict[str, Tuple[object, int]]' = OrderedDict()
+        self._bytes = 0
+        self._trava = threading.Lock()
+        # Chaves sendo carregadas -> evento sinalizado ao fim da carga
+        self._em_carga: Dict[str, threading.Event] = {}
+
+        self.acertos = 0
+        self.carregamentos = 0
+        self.despejos = 0
+        self.tempo_carga = 0.0
+
+    def obter(self, chave: str):
+        """Modelo da chave, carregando (e descartando os menos recentes) quando não está no cache
+
+        A carga (com a verificação de checksum) roda fora da trava: acertos de outros threads não
+        esperam por ela, e quem pede a mesma chave durante a carga aguarda a que já está em andamento.
+        """
+        while True:
+            with self._trava:
+                if chave in self._modelos:
+                    self._modelos.move_to_end(chave)
+                    self.acertos += 1
+                    return self._modelos[chave][0]
+                evento = self._em_carga.get(chave)
+                if evento is None:
+                    evento = self._em_carga[chave] = threading.Event()
+                    break
+            # Outro thread está carregando a chave; se a carga falhar (ou o modelo já tiver sido
+            # descartado), a próxima volta tenta de novo
+            evento.wait()
+
+        try:
+            inicio = time.perf_counter()
+            modelo, tamanho = self.carregar(chave)
+            duracao = time.perf_counter() - inicio
+        except BaseException:
+            with self._trava:
+                del self._em_carga[chave]
+            evento.set()
+            raise
+
+        with self._trava:
+            self.tempo_carga += duracao
+            self.carregamentos += 1
+            self._modelos[chave] = (modelo, tamanho)
+            self._bytes += tamanho
+            while self._bytes > self.max_bytes and len(self._modelos) > 1:
+                _, (_, tamanho_despejado) = self._modelos.popitem(last=False)
+                self._bytes -= tamanho_despejado
+                self.despejos += 1
+            del self._em_carga[chave]
+        evento.set()
+        return modelo
+
+    def estatisticas(self) -> Dict:
+        with self._trava:
+            modelos, carregados = len(self._modelos), self._bytes
+            acertos, carregamentos, despejos, tempo_carga = (self.acertos, self.carregamentos, self.despejos,
+                                                             self.tempo_carga)
+        consultas = acertos + carregamentos
+        return {
+            'modelos_carregados': modelos,
+            'mb_carregados': carregados / 2 ** 20,
+            'max_mb': self.max_bytes / 2 ** 20,
+            'acertos': acertos,
+            'carregamentos': carregamentos,
+            'taxa_acerto': acertos / consultas if consultas else 0.0,
+            'despejos': despejos,
+            'tempo_carga_s': round(tempo_carga, 4),
+        }
+
+
+class RegistroModelos:
+    """Roteia as linhas para o modelo do seu segmento; segmentos sem modelo vão para pontuar_padrao"""
+
+    def __init__(self, diretorio: str, features: List[str], alvos: List[str], max_mb: float = 256,
+                 pontuar_padrao: Optional[Callable] = None, verificar_checksum: bool = True):
+        caminho = Path(diretorio) / ARQUIVO_REGISTRO
+        if not caminho.exists():
+            raise ValueError(f"Registro de modelos não encontrado em '{diretorio}'")
+        with open(caminho, encoding='utf-8') as f:
+            indice = json.load(f)
+
+        self.diretorio = Path(diretorio)
+        self.colunas: List[str] = indice['colunas']
+        self.segmentos: Dict[str, Dict] = indice['segmentos']
+        self.features = features
+        self.alvos = alvos
+        self.pontuar_padrao = pontuar_padrao
+        self.verificar_checksum = verificar_checksum
+        self.cache = CacheModelos(self._carregar, max_mb)
+
+        self.linhas_por_segmento: Dict[str, int] = {}
+        self.linhas_padrao = 0
+        self._trava_contadores = threading.Lock()
+
+    def _carregar(self, chave: str) -> Tuple[FlorestaCompilada, int]:
+        info = self.segmentos[chave]
+        modelo = carregar_artefato(str(self.diretorio / info['diretorio']), self.features, self.alvos,
+                                   verificar_checksum=self.verificar_checksum)
+        return modelo, info['bytes']
+
+    def prever_proba(self, X) -> np.ndarray:
+        """Matriz (n, n_alvos) pontuando cada grupo de linhas com o modelo do seu segmento"""
+        chaves = chaves_segmento(X, self.colunas)
+        resultado = np.zeros((len(chaves), len(self.alvos)))
+
+        sem_modelo = []
+        for chave, indices in agrupar_por_chave(chaves):
+            if chave not in self.segmentos:
+                sem_modelo.append(indices)
+                continue
+            resultado[indices] = self.cache.obter(chave).prever_proba(selecionar_linhas(X, indices))
+            with self._trava_contadores:
+                self.linhas_por_segmento[chave] = self.linhas_por_segmento.get(chave, 0) + len(indices)
+
+        if sem_modelo:
+            indices = np.concatenate(sem_modelo)
+            if self.pontuar_padrao is None:
+                desconhecidos = sorted(set(chaves[indices].tolist()))
+                raise ValueError(f"Segmentos sem modelo no registro: {desconhecidos[:10]}")
+            resultado[indices] = self.pontuar_padrao(selecionar_linhas(X, indices))
+            with self._trava_contadores:
+                self.linhas_padrao += len(indices)
+
+        return resultado
+
+    def estatisticas(self) -> Dict:
+        """Métricas do cache e linhas pontuadas por segmento"""
+        with self._trava_contadores:
+            linhas_por_segmento, linhas_padrao = dict(self.linhas_por_segmento), self.linhas_padrao
+        return {
+            'segmentos_registrados': len(self.segmentos),
+            'linhas_por_segmento': linhas_por_segmento,
+            'linhas_modelo_padrao': linhas_padrao,
+            'cache': self.cache.estatisticas(),
+        }
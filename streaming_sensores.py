@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Streaming de Sensores do Sistema de Manutenção Preditiva
+Consumidor asyncio de leituras em JSON por linha (socket TCP ou FIFO local): janelas circulares
+por máquina com atributos móveis calculados de forma incremental, fila limitada (contrapressão)
+e pontuação em micro-lotes pelo pipeline, com métricas de eventos/s e latência ponta a ponta
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from config_file import obter_configuracao
+from inferencia import criar_pontuador
+from instrumentacao import memoria_atual_kb
+
+# Atributos móveis devolvidos para cada leitura pontuada
+ATRIBUTOS_JANELA = ('delta_temperatura', 'potencia_w', 'media_delta_temperatura', 'media_potencia_w',
+                    'taxa_desgaste_por_s', 'leituras_janela')
+
+# Latências guardadas para os percentis (as mais recentes)
+MAX_LATENCIAS = 100_000
+
+
+class JanelasMaquinas:
+    """Janelas circulares por máquina em arrays colunares (uma linha por máquina)
+
+    Cada máquina ocupa uma linha de arrays (n_maquinas, janela) com diferença de temperatura,
+    potência, desgaste e instante das últimas leituras; as somas móveis são atualizadas somando o
+    valor novo e subtraindo o que sai da janela. A capacidade dobra até max_maquinas e, cheia,
+    as máquinas vistas há mais tempo são descartadas.
+    """
+
+    def __init__(self, janela: int = 16, max_maquinas: int = 200_000, capacidade_inicial: int = 1024):
+        self.janela = janela
+        self.max_maquinas = max_maquinas
+        self.linhas: Dict[str, int] = {}
+        self.descartes = 0
+        self._ids: List[Optional[str]] = []
+        self._livres: List[int] = []
+        self._em_uso = 0
+        self._alocar(min(capacidade_inicial, max_maquinas))
+
+    def _alocar(self, capacidade: int):
+        """Criar ou aumentar os arrays, preservando o conteúdo das linhas existentes"""
+        anterior = len(self._ids)
+        novos = {
+            'delta': np.zeros((capacidade, self.janela), dtype=np.float32),
+            'potencia': np.zeros((capacidade, self.janela), dtype=np.float32),
+            'desgaste': np.zeros((capacidade, self.janela), dtype=np.float32),
+            'instante': np.zeros((capacidade, self.janela), dtype=np.float64),
+            'soma_delta': np.zeros(capacidade), 'soma_potencia': np.zeros(capacidade),
+            'posicao': np.zeros(capacidade, dtype=np.int32), 'contagem': np.zeros(capacidade, dtype=np.int32),
+            'ultimo_visto': np.zeros(capacidade),
+        }
+        for nome, array in novos.items():
+            if anterior:
+                array[:anterior] = getattr(self, nome)
+            setattr(self, nome, array)
+        self._ids.extend([None] * (capacidade - anterior))
+
+    def _reservar(self, quantidade: int, em_uso: np.ndarray) -> List[int]:
+        """Linhas livres para máquinas novas: descartadas, crescimento e, no limite, as menos recentes"""
+        linhas = [self._livres.pop() for _ in range(min(quantidade, len(self._livres)))]
+
+        faltam = quantidade - len(linhas)
+        if faltam and self._em_uso + faltam > len(self._ids) and len(self._ids) < self.max_maquinas:
+            self._alocar(min(self.max_maquinas, max(2 * len(self._ids), self._em_uso + faltam)))
+        novas = min(faltam, len(self._ids) - self._em_uso)
+        linhas.extend(range(self._em_uso, self._em_uso + novas))
+        self._em_uso += novas
+
+        faltam = quantidade - len(linhas)
+        if faltam:
+            if faltam > self._em_uso - len(em_uso):
+                raise ValueError(f"Lote com mais máquinas distintas que o limite de {self.max_maquinas}")
+            ultimo = self.ultimo_visto[:self._em_uso].copy()
+            ultimo[em_uso] = np.inf
+            vitimas = np.argpartition(ultimo, faltam - 1)[:faltam]
+            for linha in vitimas:
+                del self.linhas[self._ids[linha]]
+            self.contagem[vitimas] = self.posicao[vitimas] = 0
+            self.soma_delta[vitimas] = self.soma_potencia[vitimas] = 0.0
+            self.descartes += faltam
+            linhas.extend(vitimas.tolist())
+
+        return linhas
+
+    def linhas_para(self, ids: Sequence[str], agora: float) -> np.ndarray:
+        """Linha de cada leitura, reservando linhas para as máquinas ainda não vistas"""
+        linhas = np.fromiter((self.linhas.get(i, -1) for i in ids), dtype=np.int64, count=len(ids))
+        desconhecidas = np.flatnonzero(linhas < 0)
+        if desconhecidas.size:
+            novas = list(dict.fromkeys(ids[j] for j in desconhecidas))
+            for id_maquina, linha in zip(novas, self._reservar(len(novas), np.unique(linhas[linhas >= 0]))):
+                self.linhas[id_maquina] = linha
+                self._ids[linha] = id_maquina
+            linhas[desconhecidas] = [self.linhas[ids[j]] for j in desconhecidas]
+        self.ultimo_visto[linhas] = agora
+        return linhas
+
+    def atualizar(self, linhas: np.ndarray, delta: np.ndarray, potencia: np.ndarray, desgaste: np.ndarray,
+                  instante: np.ndarray) -> Dict[str, np.ndarray]:
+        """Inserir as leituras nas janelas e devolver os atributos móveis de cada uma
+
+        Leituras da mesma máquina no lote são aplicadas em rodadas, na ordem de chegada (a k-ésima
+        leitura de cada máquina entra na rodada k); cada rodada é vetorizada.
+        """
+        n = len(linhas)
+        saida = {nome: np.zeros(n) for nome in ATRIBUTOS_JANELA}
+        saida['delta_temperatura'] = np.asarray(delta, dtype=np.float64)
+        saida['potencia_w'] = np.asarray(potencia, dtype=np.float64)
+        delta, potencia, desgaste = (np.asarray(v, dtype=np.float32) for v in (delta, potencia, desgaste))
+
+        ordem = np.argsort(linhas, kind='stable')
+        ordenadas = linhas[ordem]
+        inicio_grupo = np.r_[True, ordenadas[1:] != ordenadas[:-1]]
+        posicao_ordenada = np.arange(n) - np.maximum.accumulate(np.where(inicio_grupo, np.arange(n), 0))
+        rodada = np.empty(n, dtype=np.int64)
+        rodada[ordem] = posicao_ordenada
+
+        for r in range(int(rodada.max()) + 1 if n else 0):
+            sel = np.flatnonzero(rodada == r)
+            m = linhas[sel]
+            pos = self.posicao[m]
+            cheia = self.contagem[m] == self.janela
+
+            self.soma_delta[m] += delta[sel] - np.where(cheia, self.delta[m, pos], 0.0)
+            self.soma_potencia[m] += potencia[sel] - np.where(cheia, self.potencia[m, pos], 0.0)
+            self.delta[m, pos] = delta[sel]
+            self.potencia[m, pos] = potencia[sel]
+            self.desgaste[m, pos] = desgaste[sel]
+            self.instante[m, pos] = instante[sel]
+
+            self.posicao[m] = (pos + 1) % self.janela
+            contagem = np.minimum(self.contagem[m] + 1, self.janela)
+            self.contagem[m] = contagem
+
+            # Leitura mais antiga ainda na janela: a próxima a ser sobrescrita (janela cheia) ou a primeira
+            mais_antiga = np.where(contagem == self.janela, self.posicao[m], 0)
+            intervalo = instante[sel] - self.instante[m, mais_antiga]
+            variacao = desgaste[sel].astype(np.float64) - self.desgaste[m, mais_antiga]
+            saida['taxa_desgaste_por_s'][sel] = np.divide(variacao, intervalo, out=np.zeros(len(sel)),
+                                                          where=intervalo > 0)
+            saida['media_delta_temperatura'][sel] = self.soma_delta[m] / contagem
+            saida['media_potencia_w'][sel] = self.soma_potencia[m] / contagem
+            saida['leituras_janela'][sel] = contagem
+
+        return saida
+
+    @property
+    def maquinas(self) -> int:
+        return len(self.linhas)
+
+    def memoria_mb(self) -> float:
+        """Memória dos arrays das janelas (MB)"""
+        return sum(getattr(self, nome).nbytes for nome in
+                   ('delta', 'potencia', 'desgaste', 'instante', 'soma_delta', 'soma_potencia',
+                    'posicao', 'contagem', 'ultimo_visto')) / 2 ** 20
+
+
+class MetricasStreaming:
+    """Contadores do consumidor: eventos/s, latência ponta a ponta, lotes e contrapressão"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.eventos = 0
+        self.invalidos = 0
+        self.lotes = 0
+        self.esperas_contrapressao = 0
+        self.fila_maxima = 0
+        self.tempo_pontuacao = 0.0
+        self.latencias = deque(maxlen=MAX_LATENCIAS)
+        self._ultimo_relatorio = (self.inicio, 0)
+
+    def registrar_lote(self, latencias: np.ndarray, tempo_pontuacao: float):
+        self.eventos += len(latencias)
+        self.lotes += 1
+        self.tempo_pontuacao += tempo_pontuacao
+        self.latencias.extend(latencias.tolist())
+
+    def resumo(self, janelas: Optional[JanelasMaquinas] = None) -> Dict:
+        """Totais, taxa média e desde o último resumo, percentis de latência e memória"""
+        agora = time.perf_counter()
+        instante_anterior, eventos_anteriores = self._ultimo_relatorio
+        self._ultimo_relatorio = (agora, self.eventos)
+
+        latencias = np.fromiter(self.latencias, dtype=np.float64) * 1000
+        p50, p95, p99 = np.percentile(latencias, [50, 95, 99]) if latencias.size else (0.0, 0.0, 0.0)
+        resumo = {
+            'eventos': self.eventos,
+            'invalidos': self.invalidos,
+            'eventos_por_s': self.eventos / max(agora - self.inicio, 1e-9),
+            'eventos_por_s_recente': (self.eventos - eventos_anteriores) / max(agora - instante_anterior, 1e-9),
+            'latencia_p50_ms': float(p50),
+            'latencia_p95_ms': float(p95),
+            'latencia_p99_ms': float(p99),
+            'lotes': self.lotes,
+            'tamanho_medio_lote': self.eventos / self.lotes if self.lotes else 0.0,
+            'tempo_pontuacao_s': round(self.tempo_pontuacao, 3),
+            'esperas_contrapressao': self.esperas_contrapressao,
+            'fila_maxima': self.fila_maxima,
+            'rss_mb': (memoria_atual_kb() or 0) / 1024,
+        }
+        if janelas is not None:
+            resumo.update({'maquinas': janelas.maquinas, 'descartes_maquinas': janelas.descartes,
+                           'memoria_janelas_mb': janelas.memoria_mb()})
+        return resumo
+
+
+class ConsumidorStreaming:
+    """Lê leituras em JSON por linha, agrupa em micro-lotes e pontua com as janelas por máquina
+
+    A fila entre a leitura e a pontuação é limitada: cheia, a leitura do socket/FIFO é suspensa
+    até haver espaço, e o produtor é freado pelo controle de fluxo do TCP (ou do pipe).
+    """
+
+    def __init__(self, pontuar: Callable[[Dict[str, np.ndarray]], np.ndarray], config,
+                 janela: Optional[int] = None, max_maquinas: Optional[int] = None,
+                 fila_max: Optional[int] = None, max_lote: Optional[int] = None,
+                 espera_max_ms: Optional[float] = None, limiares: Optional[np.ndarray] = None,
+                 saida=None):
+        self.pontuar = pontuar
+        self.config = config
+        self.janelas = JanelasMaquinas(janela or config.STREAM_JANELA, max_maquinas or config.STREAM_MAX_MAQUINAS)
+        self.fila_max = fila_max or config.STREAM_FILA_MAX
+        self.max_lote = max_lote or config.STREAM_MAX_LOTE
+        self.espera_max_s = (espera_max_ms if espera_max_ms is not None else config.STREAM_ESPERA_MAX_MS) / 1000
+        self.limiares = limiares
+        self.saida = saida
+        self.metricas = MetricasStreaming()
+
+        self._fila = None
+        self._tarefa = None
+        # Um único thread de pontuação: lotes aplicados às janelas na ordem de chegada
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    def iniciar(self):
+        """Criar a fila e a tarefa de pontuação no loop de eventos atual"""
+        self._fila = asyncio.Queue(maxsize=self.fila_max)
+        self._tarefa = asyncio.get_running_loop().create_task(self._processar())
+
+    async def parar(self):
+        """Pontuar o que restou na fila e encerrar"""
+        await self._fila.join()
+        self._tarefa.cancel()
+        try:
+            await self._tarefa
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown(wait=True)
+
+    def _interpretar(self, linha: bytes) -> Optional[tuple]:
+        """(id_produto, tipo, numéricas..., instante de emissão, instante de recebimento) ou None se inválida"""
+        try:
+            dados = json.loads(linha)
+            numericas = tuple(float(dados[c]) for c in self.config.FEATURES_NUMERICAS)
+            if not all(map(math.isfinite, numericas)):
+                return None
+            recebido = time.time()
+            return (str(dados['id_produto']), str(dados['tipo'])) + numericas + \
+                (float(dados.get('instante', recebido)), recebido)
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    async def consumir(self, reader: asyncio.StreamReader):
+        """Ler uma fonte até o fim, enfileirando as leituras válidas (aguarda quando a fila está cheia)"""
+        fila, metricas = self._fila, self.metricas
+        while True:
+            linha = await reader.readline()
+            if not linha:
+                break
+            if not linha.strip():
+                continue
+
+            leitura = self._interpretar(linha)
+            if leitura is None:
+                metricas.invalidos += 1
+                continue
+
+            if fila.full():
+                metricas.esperas_contrapressao += 1
+            await fila.put(leitura)
+            metricas.fila_maxima = max(metricas.fila_maxima, fila.qsize())
+
+    async def consumir_conexao(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atender uma conexão TCP de um produtor"""
+        try:
+            await self.consumir(reader)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _coletar_lote(self) -> list:
+        """Aguardar a primeira leitura e completar o lote até o tamanho ou tempo máximo"""
+        loop = asyncio.get_running_loop()
+        fila = self._fila
+        lote = [await fila.get()]
+        limite = loop.time() + self.espera_max_s
+
+        while len(lote) < self.max_lote:
+            if not fila.empty():
+                lote.append(fila.get_nowait())
+                continue
+            restante = limite - loop.time()
+            if restante <= 0:
+                break
+            try:
+                lote.append(await asyncio.wait_for(fila.get(), restante))
+            except asyncio.TimeoutError:
+                break
+        return lote
+
+    async def _processar(self):
+        """Laço de pontuação: formar lotes e pontuá-los fora do loop de eventos"""
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = await self._coletar_lote()
+            try:
+                await loop.run_in_executor(self._executor, self.pontuar_lote, lote)
+            except Exception as e:
+                print(f"Falha ao pontuar lote de {len(lote)} leituras: {e}", file=sys.stderr)
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+
+    def pontuar_lote(self, lote: list) -> Dict[str, np.ndarray]:
+        """Atualizar as janelas e pontuar um micro-lote (executado no thread de pontuação)"""
+        inicio = time.perf_counter()
+        numericas = self.config.FEATURES_NUMERICAS
+        colunas_lote = list(zip(*lote))
+        ids, tipos = colunas_lote[0], colunas_lote[1]
+        colunas = {col: np.asarray(valores, dtype=np.float64)
+                   for col, valores in zip(numericas, colunas_lote[2:2 + len(numericas)])}
+        colunas['tipo'] = np.asarray(tipos, dtype=object)
+        instante = np.asarray(colunas_lote[-2], dtype=np.float64)
+
+        linhas = self.janelas.linhas_para(ids, time.time())
+        atributos = self.janelas.atualizar(
+            linhas,
+            colunas['temperatura_processo'] - colunas['temperatura_ar'],
+            colunas['torque'] * colunas['velocidade_rotacional'] * (2 * math.pi / 60),
+            colunas['desgaste_da_ferramenta'],
+            instante,
+        )
+        probabilidades = self.pontuar(colunas)
+
+        fim = time.time()
+        self.metricas.registrar_lote(fim - instante, time.perf_counter() - inicio)
+
+        if self.saida is not None:
+            self._escrever(ids, instante, probabilidades, atributos)
+        return {'probabilidades': probabilidades, **atributos}
+
+    def _escrever(self, ids, instante, probabilidades, atributos):
+        """Gravar o resultado de cada leitura em JSON por linha"""
+        alvos = self.config.COLUNAS_TARGET
+        falhas = probabilidades > self.limiares if self.limiares is not None else None
+        linhas = []
+        for i, id_maquina in enumerate(ids):
+            registro = {'id_produto': id_maquina, 'instante': instante[i],
+                        'probabilidades': dict(zip(alvos, probabilidades[i].tolist())),
+                        **{nome: float(valores[i]) for nome, valores in atributos.items()}}
+            if falhas is not None:
+                registro['falhas'] = dict(zip(alvos, falhas[i].tolist()))
+            linhas.append(json.dumps(registro, ensure_ascii=False))
+        self.saida.write('\n'.join(linhas) + '\n')
+
+
+async def _relatar_periodicamente(consumidor: ConsumidorStreaming, intervalo_s: float):
+    """Imprimir as métricas a cada intervalo"""
+    while True:
+        await asyncio.sleep(intervalo_s)
+        r = consumidor.metricas.resumo(consumidor.janelas)
+        print(f"[stream] {r['eventos']} eventos ({r['eventos_por_s_recente']:.0f}/s) | latência p50 "
+              f"{r['latencia_p50_ms']:.1f} ms p99 {r['latencia_p99_ms']:.1f} ms | lote médio "
+              f"{r['tamanho_medio_lote']:.0f} | fila máx. {r['fila_maxima']} | {r['maquinas']} máquinas | "
+              f"RSS {r['rss_mb']:.0f} MB", flush=True)
+
+
+async def abrir_fifo(caminho: str) -> asyncio.StreamReader:
+    """StreamReader de um FIFO (ou '-' para a entrada padrão); abrir o FIFO espera pelo produtor"""
+    loop = asyncio.get_running_loop()
+    if caminho == '-':
+        arquivo = sys.stdin.buffer
+    else:
+        arquivo = await loop.run_in_executor(None, open, caminho, 'rb', 0)
+    reader = asyncio.StreamReader(limit=2 ** 20)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), arquivo)
+    return reader
+
+
+async def executar_consumidor(consumidor: ConsumidorStreaming, host: Optional[str] = None,
+                              porta: Optional[int] = None, fifo: Optional[str] = None,
+                              intervalo_relatorio_s: float = 5.0) -> Dict:
+    """Consumir do FIFO até o fim ou atender conexões TCP até ser interrompido; devolve o resumo final"""
+    consumidor.iniciar()
+    relatorio = asyncio.get_running_loop().create_task(_relatar_periodicamente(consumidor, intervalo_relatorio_s))
+    try:
+        if fifo is not None:
+            print(f"Consumindo leituras de '{fifo}'...")
+            await consumidor.consumir(await abrir_fifo(fifo))
+        else:
+            servidor = await asyncio.start_server(consumidor.consumir_conexao, host, porta, limit=2 ** 20)
+            print(f"Consumidor de leituras em tcp://{host}:{porta} (JSON por linha)")
+            async with servidor:
+                await servidor.serve_forever()
+    finally:
+        relatorio.cancel()
+        await consumidor.parar()
+    return consumidor.metricas.resumo(consumidor.janelas)
+
+
+def main():
+    """Função principal do consumidor de streaming"""
+    import joblib
+
+    from artefato_modelo import carregar_artefato
+    from avaliacao import carregar_limiares
+    from cache_predicoes import CachePredicoes, versao_modelo
+    from registro_modelos import RegistroModelos, registro_existe
+
+    config = obter_configuracao()
+
+    parser = argparse.ArgumentParser(description="Pontuar leituras de sensores em streaming (JSON por linha)")
+    origem = parser.add_mutually_exclusive_group()
+    origem.add_argument('--porta', type=int, default=config.STREAM_PORT, help="Porta TCP dos produtores")
+    origem.add_argument('--fifo', default=None, help="FIFO (mkfifo) ou '-' para a entrada padrão")
+    parser.add_argument('--host', default=config.API_HOST)
+    parser.add_argument('--modelo', default=config.CAMINHO_MODELO)
+    parser.add_argument('--artefato', default=None, help="Diretório do artefato compilado em vez do --modelo")
+    parser.add_argument('--registro', default=config.DIR_REGISTRO_MODELOS if config.MODELOS_POR_SEGMENTO else None,
+                        help="Registro de modelos por segmento (segmentos definidos só por features, ex.: 'tipo')")
+    parser.add_argument('--saida', default=None, help="Arquivo JSON por linha com os resultados ('-' = stdout)")
+    parser.add_argument('--janela', type=int, default=config.STREAM_JANELA)
+    parser.add_argument('--max-lote', type=int, default=config.STREAM_MAX_LOTE)
+    parser.add_argument('--espera-ms', type=float, default=config.STREAM_ESPERA_MAX_MS)
+    parser.add_argument('--fila-max', type=int, default=config.STREAM_FILA_MAX)
+    parser.add_argument('--intervalo-relatorio', type=float, default=5.0)
+    parser.add_argument('--cache-predicoes', action=argparse.BooleanOptionalAction, default=config.CACHE_PREDICOES,
+                        help="Memorizar as probabilidades de leituras repetidas (máquinas paradas)")
+    parser.add_argument('--casas-decimais', type=int, default=config.CACHE_PREDICOES_CASAS,
+                        help="Arredondamento das features na chave do cache (ausente = valores exatos)")
+    args = parser.parse_args()
+
+    if args.artefato:
+        modelo = carregar_artefato(args.artefato, config.FEATURES, config.COLUNAS_TARGET)
+    else:
+        modelo = joblib.load(args.modelo)
+    if args.registro and registro_existe(args.registro):
+        modelo = RegistroModelos(args.registro, config.FEATURES, config.COLUNAS_TARGET, config.CACHE_MODELOS_MB,
+                                 pontuar_padrao=criar_pontuador(modelo, config.FEATURES))
+        if not set(modelo.colunas) <= set(config.FEATURES):
+            parser.error(f"As leituras só trazem as features; segmentos por {modelo.colunas} não são suportados")
+    limiares = carregar_limiares(config.CAMINHO_LIMIARES, config.COLUNAS_TARGET) \
+        if os.path.exists(config.CAMINHO_LIMIARES) else None
+
+    saida = None
+    if args.saida:
+        saida = sys.stdout if args.saida == '-' else open(args.saida, 'w', encoding='utf-8')
+
+    pontuar, cache = criar_pontuador(modelo, config.FEATURES), None
+    if args.cache_predicoes:
+        versao = versao_modelo(caminho=args.artefato or args.modelo)
+        if isinstance(modelo, RegistroModelos):
+            versao += versao_modelo(caminho=args.registro)
+        cache = CachePredicoes(pontuar, config.FEATURES_NUMERICAS, config.FEATURES_CATEGORICAS,
+                               len(config.COLUNAS_TARGET), versao, config.CACHE_PREDICOES_MAX, args.casas_decimais)
+        pontuar = cache.prever
+
+    consumidor = ConsumidorStreaming(pontuar, config, janela=args.janela,
+                                     fila_max=args.fila_max, max_lote=args.max_lote,
+                                     espera_max_ms=args.espera_ms, limiares=limiares, saida=saida)
+    try:
+        resumo = asyncio.run(executar_consumidor(consumidor, args.host, args.porta, args.fifo,
+                                                 args.intervalo_relatorio))
+        if cache is not None:
+            resumo['cache_predicoes'] = cache.estatisticas()
+        print(json.dumps(resumo, indent=2, ensure_ascii=False))
+    except KeyboardInterrupt:
+        print("\nConsumidor encerrado.")
+    finally:
+        if saida not in (None, sys.stdout):
+            saida.close()
+
+
+if __name__ == "__main__":
+    main()
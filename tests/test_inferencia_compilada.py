@@ -0,0 +1,98 @@
+"""
+Paridade do motor compilado com o pipeline scikit-learn em uma floresta pequena
+Inclui linhas com valores faltantes (preenchidos com as medianas) e 'tipo' não visto no treino
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.multioutput import MultiOutputClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from inferencia import probabilidades_positivas
+from inferencia_compilada import FlorestaCompilada, compilar_pipeline
+from predicao_rapida import pontuar_compilado, pontuar_sklearn
+
+NUMERICAS = ['temperatura_ar', 'torque']
+CATEGORICAS = ['tipo']
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    """Floresta de brinquedo com dois alvos binários e um alvo constante (uma só classe)"""
+    rng = np.random.default_rng(0)
+    n = 300
+    X = pd.DataFrame({
+        'temperatura_ar': rng.normal(300, 2, n),
+        'torque': rng.normal(40, 10, n),
+        'tipo': rng.choice(['L', 'M', 'H'], n),
+    })
+    y = np.column_stack([
+        (X['torque'] > 50).astype(int),
+        ((X['temperatura_ar'] > 301) & (X['tipo'] == 'L')).astype(int),
+        np.zeros(n, dtype=int),
+    ])
+    modelo = Pipeline([
+        ('preprocessor', ColumnTransformer([
+            ('num', StandardScaler(), NUMERICAS),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAS),
+        ])),
+        ('classifier', MultiOutputClassifier(RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0))),
+    ])
+    return modelo.fit(X, y)
+
+
+@pytest.fixture
+def linhas():
+    """Linhas a pontuar: normais, com 'tipo' não visto no treino e já preenchidas após faltantes"""
+    return pd.DataFrame({
+        'temperatura_ar': [298.0, 303.5, 300.0, 301.2, 299.1],
+        'torque': [20.0, 65.0, 48.0, 40.0, 52.5],
+        'tipo': ['L', 'H', 'X', 'M', 'desconhecido'],
+    })
+
+
+def test_paridade_com_sklearn(pipeline, linhas):
+    esperado = probabilidades_positivas(pipeline.predict_proba(linhas))
+    obtido = compilar_pipeline(pipeline).prever_proba(linhas)
+    np.testing.assert_allclose(obtido, esperado, atol=1e-9)
+    # Alvo com uma só classe no treino vale zero, como em probabilidades_positivas
+    assert np.all(obtido[:, 2] == 0)
+
+
+def test_paridade_apos_salvar_e_carregar(pipeline, linhas, tmp_path):
+    caminho = tmp_path / 'modelo.npz'
+    compilar_pipeline(pipeline).salvar(str(caminho))
+    esperado = probabilidades_positivas(pipeline.predict_proba(linhas))
+    np.testing.assert_allclose(FlorestaCompilada.carregar(str(caminho)).prever_proba(linhas), esperado, atol=1e-9)
+
+
+def test_pontuacao_de_arquivo_com_faltantes(pipeline, linhas, tmp_path):
+    """CSV com células vazias: os dois motores preenchem com as medianas e devem concordar"""
+    import joblib
+
+    entrada = linhas.copy()
+    entrada.insert(0, 'id', range(len(entrada)))
+    entrada.loc[[0, 2], 'torque'] = np.nan
+    entrada.loc[[1, 2], 'temperatura_ar'] = np.nan
+    caminho_csv = tmp_path / 'entrada.csv'
+    entrada.to_csv(caminho_csv, index=False)
+
+    caminho_pkl, caminho_npz = tmp_path / 'modelo.pkl', tmp_path / 'modelo.npz'
+    joblib.dump(pipeline, caminho_pkl)
+    compilar_pipeline(pipeline).salvar(str(caminho_npz))
+    medianas = {'temperatura_ar': 300.0, 'torque': 40.0}
+
+    ids_sklearn, esperado = pontuar_sklearn(str(caminho_csv), str(caminho_pkl), medianas, NUMERICAS + CATEGORICAS)
+    ids_compilado, obtido = pontuar_compilado(str(caminho_csv), str(caminho_npz), medianas)
+
+    assert [int(i) for i in ids_compilado] == ids_sklearn
+    np.testing.assert_allclose(obtido, esperado, atol=1e-9)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Versionamento de Dados do Sistema de Manutenção Preditiva
+Snapshots dos dados de treino identificados pelo hash de cada linha; decide entre pular o
+retreinamento (dados inalterados), atualizar o modelo de forma incremental (apenas linhas novas
+anexadas) ou refazer a busca completa (agenda vencida, drift ou dados alterados)
+"""
+
+import hashlib
+import json
+import math
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import train_test_split
+from sklearn.multioutput import MultiOutputClassifier
+
+from estatisticas_dados import perfilar_dataframe
+
+ACOES = ('pular', 'incremental', 'busca_completa')
+
+ARQUIVO_REGISTRO = 'registro.json'
+ARQUIVO_DECISOES = 'decisoes.jsonl'
+
+
+@dataclass
+class SnapshotDados:
+    """Identidade de uma versão dos dados brutos de treino"""
+    hash_dados: str
+    hashes_linhas: np.ndarray
+    numericas: pd.DataFrame = field(repr=False)
+
+    @property
+    def linhas(self) -> int:
+        return len(self.hashes_linhas)
+
+
+@dataclass
+class DecisaoRetreinamento:
+    """Ação escolhida para uma versão dos dados e seu motivo"""
+    acao: str
+    motivo: str
+    linhas_novas: int = 0
+    drift: Optional[float] = None
+
+
+def criar_snapshot(df: pd.DataFrame, colunas_numericas: List[str]) -> SnapshotDados:
+    """Hash de cada linha (dados brutos, antes da limpeza) e hash do conjunto, sensível à ordem
+
+    O dtype inferido pelo pandas muda com o conteúdo do arquivo (int/float com ausentes, bool/object
+    com tokens de rótulo), então as colunas são normalizadas para float64 ou texto antes do hash.
+    """
+    normalizado = pd.DataFrame({
+        col: serie.astype(np.float64)
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie)
+        else serie.astype(str)
+        for col, serie in df.items()
+    })
+    hashes_linhas = pd.util.hash_pandas_object(normalizado, index=False).to_numpy()
+    hash_dados = hashlib.sha256(hashes_linhas.tobytes()).hexdigest()
+    return SnapshotDados(hash_dados, hashes_linhas, df[colunas_numericas].copy())
+
+
+def resumo_numerico(df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """Média e desvio de cada coluna numérica (referência para medir drift)"""
+    colunas = perfilar_dataframe(df).resultado()['colunas']
+    return {col: {'media': info['media'], 'desvio': info['desvio']} for col, info in colunas.items()}
+
+
+def medir_drift(referencia: Dict[str, Dict[str, float]], novas: Dict[str, Dict[str, float]]) -> float:
+    """Maior deslocamento da média, em desvios-padrão da referência, entre as colunas numéricas"""
+    deslocamentos = [
+        abs(novas[col]['media'] - ref['media']) / ref['desvio']
+        for col, ref in referencia.items()
+        if col in novas and novas[col]['media'] is not None and ref['desvio']
+    ]
+    return max(deslocamentos, default=0.0)
+
+
+class RegistroVersoes:
+    """Histórico das versões de dados treinadas e log das decisões de retreinamento"""
+
+    def __init__(self, diretorio: str):
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+        caminho = self.diretorio / ARQUIVO_REGISTRO
+        self.versoes: List[Dict] = []
+        if caminho.exists():
+            with open(caminho, encoding='utf-8') as f:
+                self.versoes = json.load(f)['versoes']
+
+    @property
+    def ultima(self) -> Optional[Dict]:
+        return self.versoes[-1] if self.versoes else None
+
+    def hashes_linhas(self, versao: Dict) -> Optional[np.ndarray]:
+        """Hashes de linha salvos de uma versão (apenas a última versão é mantida em disco)"""
+        caminho = self.diretorio / versao['arquivo_hashes']
+        return np.load(caminho) if caminho.exists() else None
+
+    def linhas_validacao(self, versao: Dict) -> Optional[np.ndarray]:
+        """Posições (nos dados brutos) das linhas de validação de uma versão, se gravadas"""
+        if versao.get('arquivo_validacao') is None:
+            return None
+        caminho = self.diretorio / versao['arquivo_validacao']
+        return np.load(caminho) if caminho.exists() else None
+
+    def prefixo_preservado(self, snapshot: SnapshotDados) -> bool:
+        """As linhas da última versão continuam no início dos dados, inalteradas (iguais ou só com anexos)"""
+        ultima = self.ultima
+        if ultima is None or snapshot.linhas < ultima['linhas']:
+            return False
+        anteriores = self.hashes_linhas(ultima)
+        return anteriores is not None and np.array_equal(snapshot.hashes_linhas[:ultima['linhas']], anteriores)
+
+    def registrar(self, snapshot: SnapshotDados, decisao: DecisaoRetreinamento, tempo_s: float,
+                  melhores_parametros: Optional[Dict], modo_modelo: str,
+                  linhas_validacao: Optional[np.ndarray] = None) -> Dict:
+        """Gravar a versão treinada (ou confirmada) e a decisão tomada, com o tempo economizado
+
+        linhas_validacao (posições nos dados brutos) fixa a divisão treino/validação da versão: as
+        próximas versões anexadas mantêm essas linhas na validação e só sorteiam as linhas novas.
+        """
+        anterior = self.ultima or {}
+        agora = datetime.now().isoformat(timespec='seconds')
+
+        # Referência de custo: duração da última busca completa
+        tempo_referencia = tempo_s if decisao.acao == 'busca_completa' else anterior.get('tempo_busca_completa_s')
+        economia = max(0.0, tempo_referencia - tempo_s) if tempo_referencia is not None else None
+
+        if decisao.acao != 'pular':
+            arquivo_hashes = f"linhas-{snapshot.hash_dados[:16]}.npy"
+            np.save(self.diretorio / arquivo_hashes, snapshot.hashes_linhas)
+            if anterior.get('arquivo_hashes') not in (None, arquivo_hashes):
+                (self.diretorio / anterior['arquivo_hashes']).unlink(missing_ok=True)
+
+            arquivo_validacao = None
+            if linhas_validacao is not None:
+                arquivo_validacao = f"validacao-{snapshot.hash_dados[:16]}.npy"
+                np.save(self.diretorio / arquivo_validacao, np.sort(np.asarray(linhas_validacao, dtype=np.int64)))
+            if anterior.get('arquivo_validacao') not in (None, arquivo_validacao):
+                (self.diretorio / anterior['arquivo_validacao']).unlink(missing_ok=True)
+
+            self.versoes.append({
+                'hash_dados': snapshot.hash_dados,
+                'linhas': snapshot.linhas,
+                'criado_em': agora,
+                'acao': decisao.acao,
+                'modo_modelo': modo_modelo,
+                'melhores_parametros': melhores_parametros,
+                'ultima_busca_completa': agora if decisao.acao == 'busca_completa'
+                else anterior.get('ultima_busca_completa'),
+                'tempo_busca_completa_s': tempo_referencia,
+                'estatisticas': resumo_numerico(snapshot.numericas),
+                'arquivo_hashes': arquivo_hashes,
+                'arquivo_validacao': arquivo_validacao,
+            })
+            temporario = self.diretorio / f"{ARQUIVO_REGISTRO}.tmp"
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump({'versoes': self.versoes}, f, indent=2, ensure_ascii=False)
+            os.replace(temporario, self.diretorio / ARQUIVO_REGISTRO)
+
+        entrada = {
+            'data': agora,
+            'hash_dados': snapshot.hash_dados,
+            'linhas': snapshot.linhas,
+            'acao': decisao.acao,
+            'motivo': decisao.motivo,
+            'linhas_novas': decisao.linhas_novas,
+            'drift': decisao.drift,
+            'tempo_s': round(tempo_s, 3),
+            'tempo_economizado_s': round(economia, 3) if economia is not None else None,
+        }
+        with open(self.diretorio / ARQUIVO_DECISOES, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entrada, ensure_ascii=False) + '\n')
+        return entrada
+
+
+def decidir_retreinamento(snapshot: SnapshotDados, registro: RegistroVersoes, config,
+                          modelo_existe: bool, modo_modelo: str) -> DecisaoRetreinamento:
+    """Escolher entre pular, atualização incremental e busca completa"""
+    ultima = registro.ultima
+    if ultima is None or not modelo_existe:
+        return DecisaoRetreinamento('busca_completa', "nenhum modelo versionado encontrado")
+    if ultima['modo_modelo'] != modo_modelo:
+        return DecisaoRetreinamento('busca_completa', f"modo do modelo mudou ({ultima['modo_modelo']} -> {modo_modelo})")
+
+    if snapshot.hash_dados == ultima['hash_dados']:
+        return DecisaoRetreinamento('pular', "dados inalterados")
+
+    n_anteriores = ultima['linhas']
+    if snapshot.linhas <= n_anteriores or not registro.prefixo_preservado(snapshot):
+        return DecisaoRetreinamento('busca_completa', "linhas existentes alteradas ou removidas")
+
+    linhas_novas = snapshot.linhas - n_anteriores
+    drift = medir_drift(ultima['estatisticas'], resumo_numerico(snapshot.numericas.iloc[n_anteriores:]))
+
+    ultima_busca = ultima.get('ultima_busca_completa')
+    if ultima_busca is None or ultima.get('melhores_parametros') is None:
+        return DecisaoRetreinamento('busca_completa', "sem hiperparâmetros de uma busca anterior",
+                                    linhas_novas, drift)
+
+    dias = (datetime.now() - datetime.fromisoformat(ultima_busca)).total_seconds() / 86400
+    if dias >= config.DIAS_ENTRE_BUSCAS:
+        return DecisaoRetreinamento('busca_completa', f"última busca completa há {dias:.1f} dias",
+                                    linhas_novas, drift)
+    if drift > config.LIMIAR_DRIFT:
+        return DecisaoRetreinamento('busca_completa', f"drift {drift:.3f} acima do limiar {config.LIMIAR_DRIFT}",
+                                    linhas_novas, drift)
+
+    return DecisaoRetreinamento('incremental', f"{linhas_novas} linhas anexadas (drift {drift:.3f})",
+                                linhas_novas, drift)
+
+
+def sortear_validacao_novas(indices: np.ndarray, estratos: np.ndarray, fracao: float = 0.2,
+                            semente: int = 42) -> np.ndarray:
+    """Sortear a parte de validação só entre as linhas novas (estratificada quando possível)"""
+    if len(indices) < 2:
+        return np.array([], dtype=np.int64)
+    try:
+        _, validacao = train_test_split(indices, test_size=fracao, random_state=semente, stratify=estratos)
+    except ValueError:
+        # Poucas linhas novas para estratificar (classe com uma linha ou menos linhas que classes)
+        _, validacao = train_test_split(indices, test_size=fracao, random_state=semente)
+    return np.asarray(validacao, dtype=np.int64)
+
+
+def adicionar_arvores(pipeline, X_novo: pd.DataFrame, y_novo: pd.DataFrame, fracao: float) -> int:
+    """Acrescentar às florestas árvores treinadas só com as linhas novas
+
+    Cada floresta ganha ceil(n_arvores * fracao) árvores, mantendo o peso das linhas novas
+    proporcional ao seu volume. Retorna 0 (modelo intocado) se algum alvo não tiver as duas
+    classes nas linhas novas, caso em que a atualização deve ser um reajuste completo.
+    """
+    y = np.asarray(y_novo)
+    if any(len(np.unique(y[:, j])) < 2 for j in range(y.shape[1])):
+        return 0
+
+    Xt = pipeline.named_steps['preprocessor'].transform(X_novo)
+    classificador = pipeline.named_steps['classifier']
+    if isinstance(classificador, MultiOutputClassifier):
+        pares = [(floresta, y[:, j]) for j, floresta in enumerate(classificador.estimators_)]
+    else:
+        pares = [(classificador, y)]
+
+    # Treinar tudo antes de alterar qualquer floresta
+    novas = []
+    for floresta, alvo in pares:
+        n_novas = max(1, math.ceil(len(floresta.estimators_) * fracao))
+        semente = (floresta.random_state or 0) + len(floresta.estimators_)
+        nova = clone(floresta).set_params(n_estimators=n_novas, warm_start=False, random_state=semente)
+        novas.append(nova.fit(Xt, alvo))
+
+    for (floresta, _), nova in zip(pares, novas):
+        floresta.estimators_ += nova.estimators_
+        floresta.n_estimators = len(floresta.estimators_)
+
+    return sum(len(nova.estimators_) for nova in novas)
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Visualizações do Sistema de Manutenção Preditiva
+Renderiza os gráficos a partir de agregados já calculados, no próprio processo (inline)
+ou em um processo em segundo plano (deferred); matplotlib/seaborn só são importados aqui
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+MODOS_VISUALIZACAO = ('off', 'deferred', 'inline')
+
+
+def _importar_plotagem(mostrar: bool):
+    """Importar matplotlib/seaborn sob demanda (backend sem janela quando não há exibição)"""
+    import matplotlib
+    if not mostrar:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
+
+def agregados_analise_exploratoria(df, numerical_features: List[str], target_cols: List[str]) -> Dict:
+    """Calcular os dados (pequenos) necessários para o gráfico da análise exploratória"""
+    falha_counts = df['falha_maquina'].value_counts()
+    falhas_especificas = df[target_cols].sum().sort_values(ascending=False)
+
+    histogramas = {}
+    for col in numerical_features:
+        valores = df[col].dropna().to_numpy()
+        contagens, bordas = np.histogram(valores, bins=20)
+        histogramas[col] = (contagens, bordas)
+
+    cols_for_corr = numerical_features + ['falha_maquina']
+    correlation_matrix = df[cols_for_corr].corr()
+
+    return {
+        'falha_counts': (falha_counts.index.to_numpy(), falha_counts.to_numpy()),
+        'falhas_especificas': (list(falhas_especificas.index), falhas_especificas.to_numpy()),
+        'histogramas': histogramas,
+        'correlacao': (list(correlation_matrix.columns), correlation_matrix.to_numpy()),
+    }
+
+
+def renderizar_analise_exploratoria(agregados: Dict, caminho: str, mostrar: bool = False):
+    """Desenhar e salvar o painel da análise exploratória"""
+    plt, sns = _importar_plotagem(mostrar)
+
+    # 1. Distribuição da falha geral
+    fig = plt.figure(figsize=(12, 10))
+    grade = fig.add_gridspec(2, 2)
+
+    fig.add_subplot(grade[0, 0])
+    indices, valores = agregados['falha_counts']
+    sns.barplot(x=indices, y=valores, palette='viridis')
+    plt.title('Distribuição da Falha Geral da Máquina')
+    plt.xticks([0, 1], ['Sem Falha', 'Com Falha'])
+
+    # 2. Contagem por tipo específico de falha
+    fig.add_subplot(grade[0, 1])
+    nomes, contagens = agregados['falhas_especificas']
+    sns.barplot(x=list(range(len(nomes))), y=contagens, palette='crest')
+    plt.title('Contagem de Cada Tipo de Falha Específica')
+    plt.xticks(range(len(nomes)), nomes, rotation=45, ha='right')
+
+    # 3. Distribuição das variáveis numéricas: um histograma por variável (escalas diferentes)
+    histogramas = agregados['histogramas']
+    n_colunas = min(3, max(1, len(histogramas)))
+    celulas = grade[1, 0].subgridspec(-(-len(histogramas) // n_colunas), n_colunas)
+    for i, (col, (contagens_hist, bordas)) in enumerate(histogramas.items()):
+        ax = fig.add_subplot(celulas[i // n_colunas, i % n_colunas])
+        ax.stairs(contagens_hist, bordas, fill=True)
+        ax.set_title(col, fontsize='small')
+        ax.tick_params(labelsize='x-small')
+
+    # 4. Matriz de correlação
+    fig.add_subplot(grade[1, 1])
+    colunas, correlacao = agregados['correlacao']
+    sns.heatmap(correlacao, annot=True, cmap='coolwarm', fmt='.2f', cbar=True,
+                xticklabels=colunas, yticklabels=colunas)
+    plt.title('Matriz de Correlação')
+
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=300, bbox_inches='tight')
+    if mostrar:
+        plt.show()
+    plt.close('all')
+
+
+def renderizar_matrizes_confusao(matrizes: List[Tuple[str, np.ndarray]], caminho: str, mostrar: bool = False):
+    """Desenhar e salvar as matrizes de confusão de cada alvo"""
+    plt, sns = _importar_plotagem(mostrar)
+
+    fig, axes = plt.subplots(2, 3, figsize=(15, 8))
+    axes = axes.flatten()
+
+    for i, (col, cm) in enumerate(matrizes):
+        labels = [
+            ['Verdadeiro Negativo\n'+str(cm[0,0]), 'Falso Positivo\n'+str(cm[0,1])],
+            ['Falso Negativo\n'+str(cm[1,0]), 'Verdadeiro Positivo\n'+str(cm[1,1])]
+        ]
+
+        label_text = np.asarray(labels).reshape(2,2)
+        sns.heatmap(cm, annot=label_text, fmt='', cmap='Blues', ax=axes[i], cbar=False)
+
+        axes[i].set_title(col)
+        axes[i].set_ylabel('Rótulo Verdadeiro')
+        axes[i].set_xlabel('Rótulo Previsto')
+
+    for ax in axes[len(matrizes):]:
+        ax.axis('off')
+    plt.tight_layout()
+    plt.savefig(caminho, dpi=300, bbox_inches='tight')
+    if mostrar:
+        plt.show()
+    plt.close('all')
+
+
+class GerenciadorVisualizacoes:
+    """Despacha a renderização conforme o modo: 'off', 'deferred' ou 'inline'"""
+
+    def __init__(self, modo: str = 'inline'):
+        if modo not in MODOS_VISUALIZACAO:
+            raise ValueError(f"Modo de visualização desconhecido: '{modo}' (opções: {MODOS_VISUALIZACAO})")
+        self.modo = modo
+        self._executor = None
+        self._pendentes = []
+
+    @property
+    def ativo(self) -> bool:
+        return self.modo != 'off'
+
+    def submeter(self, funcao, *args):
+        """Renderizar agora (inline) ou em segundo plano (deferred)"""
+        if self.modo == 'off':
+            return
+
+        if self.modo == 'inline':
+            funcao(*args, mostrar=True)
+            return
+
+        if self._executor is None:
+            # 'spawn': o processo de plotagem não herda threads/pools do treinamento
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=get_context('spawn'))
+        self._pendentes.append((funcao.__name__, self._executor.submit(funcao, *args)))
+
+    def aguardar(self):
+        """Esperar os gráficos pendentes e encerrar o processo de plotagem"""
+        if self._executor is None:
+            return
+
+        for nome, futuro in self._pendentes:
+            try:
+                futuro.result()
+            except Exception as e:
+                print(f"Falha ao gerar visualização ({nome}): {e}")
+
+        print(f"{len(self._pendentes)} visualização(ões) concluída(s) em segundo plano.")
+        self._executor.shutdown()
+        self._executor = None
+        self._pendentes = []